@@ -0,0 +1,210 @@
+"""
+Backend DB Concurrency Benchmark
+Requests/sec of dashboard/backend under concurrent clients, comparing the
+previous blocking-session pattern (sync Session inside ``async def``) with
+the async engine the routes now use.
+
+Runs in-process against a throwaway SQLite database (the test stand-in for
+PostgreSQL), driven through httpx's ASGI transport so no server or network
+is involved. The principal cache is disabled, so every authenticated
+request reaches the database.
+
+Endpoints measured:
+    legacy   - user lookup on a sync Session (the old get_db pattern)
+    async    - the same lookup on an AsyncSession (get_async_db)
+    auth/me  - the real authenticated route (async session path)
+
+At high concurrency the legacy pattern can stall outright: sessions hold
+their pooled connection until the dependency closes them on the threadpool,
+and a request waiting for a connection blocks the very event loop those
+closes need. Its engine therefore uses a short pool timeout
+(LEGACY_POOL_TIMEOUT), and such stalls show up as errors.
+
+``--query-ms`` adds a CPU-bound SQLite query of roughly that cost to the
+legacy and async lookups, standing in for a slower query or database round
+trip. SQLite releases the GIL while it runs, so only the blocking pattern
+stalls the event loop on it.
+
+Usage:
+    python benchmarks/bench_backend_db_concurrency.py [--clients 100] [--duration 10] [--query-ms 2]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = BASE_DIR / "dashboard" / "backend"
+
+LEGACY_POOL_TIMEOUT = 1.0
+
+# Recursive CTE whose cost scales with :n (calibrated to --query-ms below)
+SLOW_QUERY = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT count(*) FROM c"
+)
+
+
+def configure(db_path: Path) -> None:
+    """Point the backend settings at the throwaway database before it is imported"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["DEBUG"] = "True"
+    os.environ["PRINCIPAL_CACHE_TTL_SECONDS"] = "0"
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def calibrate(engine, target_ms: float) -> int:
+    """Rows the slow query must generate to take about ``target_ms``"""
+    if target_ms <= 0:
+        return 0
+    from sqlalchemy import text
+
+    n = 10_000
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        conn.execute(text(SLOW_QUERY), {"n": n}).scalar()
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return max(int(n * target_ms / max(elapsed_ms, 0.001)), 1)
+
+
+def build_app(slow_rows: int):
+    from fastapi import Depends, HTTPException
+    from sqlalchemy import create_engine, select, text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from app.config import settings
+    from app.database import get_async_db
+    from app.main import app
+    from app.models import User
+
+    # Same pool sizing as the app's sync engine
+    legacy_engine = create_engine(
+        settings.DATABASE_URL, pool_size=10, max_overflow=20, pool_timeout=LEGACY_POOL_TIMEOUT
+    )
+    LegacySession = sessionmaker(autocommit=False, autoflush=False, bind=legacy_engine)
+
+    def get_legacy_db():
+        db = LegacySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/bench/legacy/{username}")
+    async def legacy_lookup(username: str, db: Session = Depends(get_legacy_db)):
+        if slow_rows:
+            db.execute(text(SLOW_QUERY), {"n": slow_rows}).scalar()
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            raise HTTPException(status_code=404)
+        return {"id": user.id}
+
+    @app.get("/bench/async/{username}")
+    async def async_lookup(username: str, db: AsyncSession = Depends(get_async_db)):
+        if slow_rows:
+            (await db.execute(text(SLOW_QUERY), {"n": slow_rows})).scalar()
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise HTTPException(status_code=404)
+        return {"id": user.id}
+
+    return app
+
+
+async def seed(username: str) -> str:
+    from app.database import AsyncSessionLocal, init_db
+    from app.models import User
+    from app.security import create_token_pair
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        # Never logs in, so no bcrypt hash is needed
+        user = User(username=username, password_hash="!", role="user")
+        db.add(user)
+        await db.commit()
+        return create_token_pair(user.username, user.id, user.role)["access_token"]
+
+
+async def run(app, path: str, headers: dict, clients: int, duration: float) -> dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+
+    async def client_loop(client, deadline):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.get(path, headers=headers)  # warm up pools
+        start = time.perf_counter()
+        # The app's error handler prints each failure; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            await asyncio.gather(*(client_loop(client, start + duration) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": (len(latencies) - errors) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "errors": errors,
+    }
+
+
+async def main_async(args) -> None:
+    from app.database import ASYNC_DATABASE_URL, async_engine, engine
+
+    username = "bench-user"
+    token = await seed(username)
+    slow_rows = calibrate(engine, args.query_ms)
+    app = build_app(slow_rows)
+    auth = {"Authorization": f"Bearer {token}"}
+
+    print(f"Async URL: {ASYNC_DATABASE_URL}")
+    print(f"Clients: {args.clients}, {args.duration:g} s per endpoint, "
+          f"extra query: ~{args.query_ms} ms ({slow_rows} rows)\n")
+    print(f"{'endpoint':<10}{'ok req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+
+    for name, path, headers in (
+        ("legacy", f"/bench/legacy/{username}", {}),
+        ("async", f"/bench/async/{username}", {}),
+        ("auth/me", "/auth/me", auth),
+    ):
+        r = await run(app, path, headers, args.clients, args.duration)
+        print(f"{name:<10}{r['rps']:>10.0f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['errors']:>8}")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    parser.add_argument("--query-ms", type=float, default=2.0,
+                        help="Cost of the extra query on the lookup endpoints (0 to disable)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(Path(tmp) / "bench.db")
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
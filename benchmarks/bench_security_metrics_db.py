@@ -0,0 +1,164 @@
+"""
+Security Metrics DB Benchmark
+Write and read throughput of dashboard/simple_backend/security_metrics_db.py
+against the previous connect-per-call implementation.
+
+Both run against throwaway databases in a temp directory; the tracked
+security_metrics.db is never touched.
+
+Usage:
+    python benchmarks/bench_security_metrics_db.py [--ops 2000] [--threads 4]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SIMPLE_BACKEND_DIR = BASE_DIR / "dashboard" / "simple_backend"
+
+THREAT_TYPES = ["DAN Attacks", "Jailbreak", "Prompt Injection", "PII Extraction", "Data Exfiltration"]
+
+
+class LegacyMetricsDB:
+    """The pre-pool access pattern: open, run one statement, commit, close."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.executescript('''
+            CREATE TABLE request_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                total_requests INTEGER NOT NULL DEFAULT 0,
+                threats_blocked INTEGER NOT NULL DEFAULT 0,
+                threats_flagged INTEGER NOT NULL DEFAULT 0,
+                last_updated TIMESTAMP NOT NULL
+            );
+            CREATE TABLE threat_vectors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                threat_type VARCHAR(100) NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                last_detected TIMESTAMP,
+                severity VARCHAR(20) DEFAULT 'medium',
+                UNIQUE(threat_type)
+            );
+            CREATE INDEX idx_threat_vectors_count ON threat_vectors(count DESC);
+        ''')
+        conn.execute("INSERT INTO request_metrics (last_updated) VALUES (?)", (datetime.now().isoformat(),))
+        conn.commit()
+        conn.close()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute(sql, params)
+        conn.commit()
+        conn.close()
+
+    def record_threat_detection(self, threat_type: str, severity: str = "medium", blocked: bool = True):
+        now = datetime.now().isoformat()
+        self._write('''
+            INSERT INTO threat_vectors (threat_type, count, severity, last_detected)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT(threat_type) DO UPDATE SET
+                count = count + 1, last_detected = ?, severity = ?
+        ''', (threat_type, severity, now, now, severity))
+        self._write('''
+            UPDATE request_metrics SET total_requests = total_requests + 1, last_updated = ?
+            WHERE id = (SELECT id FROM request_metrics ORDER BY id DESC LIMIT 1)
+        ''', (now,))
+        if blocked:
+            self._write('''
+                UPDATE request_metrics SET threats_blocked = threats_blocked + 1, last_updated = ?
+                WHERE id = (SELECT id FROM request_metrics ORDER BY id DESC LIMIT 1)
+            ''', (now,))
+
+    def get_security_metrics_summary(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        cursor.execute("SELECT total_requests, threats_blocked FROM request_metrics ORDER BY id DESC LIMIT 1")
+        totals = cursor.fetchone()
+        cursor.execute("SELECT threat_type, count, severity FROM threat_vectors ORDER BY count DESC LIMIT 10")
+        vectors = cursor.fetchall()
+        conn.close()
+        return totals, vectors
+
+
+def load_pooled_module(db_path: Path):
+    """Import security_metrics_db bound to ``db_path``."""
+    os.environ["SECURITY_METRICS_DB"] = str(db_path)
+    sys.path.insert(0, str(SIMPLE_BACKEND_DIR))
+    import security_metrics_db
+    return security_metrics_db
+
+
+def timed(label: str, ops: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = ops / elapsed if elapsed else float("inf")
+    print(f"  {label:<28} {ops:>7} ops  {elapsed * 1000:>9.1f} ms  {rate:>10.0f} ops/s")
+    return rate
+
+
+def run_threads(threads: int, target) -> None:
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+
+def bench(db, name: str, ops: int, threads: int) -> dict:
+    print(f"\n{name}")
+
+    def writes():
+        for i in range(ops):
+            db.record_threat_detection(THREAT_TYPES[i % len(THREAT_TYPES)], "high", blocked=i % 3 != 0)
+        # Write-behind implementations: include the cost of persisting
+        flush = getattr(db, "flush_pending_metrics", None)
+        if flush is not None:
+            flush()
+
+    def reads():
+        for _ in range(ops):
+            db.get_security_metrics_summary()
+
+    def mixed():
+        # Dashboard polling (readers) concurrent with record-threat traffic (one writer)
+        writer = threading.Thread(target=writes)
+        writer.start()
+        run_threads(threads, reads)
+        writer.join()
+
+    return {
+        "write": timed("record_threat_detection", ops, writes),
+        "read": timed("get_security_metrics_summary", ops, reads),
+        "mixed": timed(f"mixed (1 writer, {threads} readers)", ops * (threads + 1), mixed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the security metrics database")
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per phase")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent readers in the mixed phase")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = bench(LegacyMetricsDB(Path(tmp) / "legacy.db"), "Before: connect per call, rollback journal",
+                       args.ops, args.threads)
+        pooled_db = load_pooled_module(Path(tmp) / "pooled.db")
+        pooled = bench(pooled_db, "After: persistent connections, WAL", args.ops, args.threads)
+        pooled_db.get_connection_manager().close_all()
+
+    print("\nSpeedup")
+    for phase in ("write", "read", "mixed"):
+        print(f"  {phase:<6} {pooled[phase] / legacy[phase]:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
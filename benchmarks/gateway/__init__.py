@@ -0,0 +1,9 @@
+"""
+Gateway Micro-Benchmarks
+Latency, throughput and memory of the src/server.py scan pipelines over
+fixed, seeded corpora (see corpora.py).
+
+Usage:
+    python -m benchmarks.gateway [--samples 40] [--corpora benign,pii] [--tools input,output]
+    python -m benchmarks.gateway --update-baseline   # record benchmarks/gateway/baseline.json
+"""
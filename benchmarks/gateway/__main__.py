@@ -0,0 +1,234 @@
+"""
+Gateway benchmark runner.
+
+Drives the bodies of the two MCP tools in src/server.py over every corpus:
+    input   _execute_security_pipeline (secure_prompt_gateway)
+    output  _execute_output_scan (secure_output_scanner)
+
+Reports end-to-end and per-layer p50/p95/p99, sequential throughput and
+peak RSS per (corpus, tool), and compares them with the stored baseline.
+Security events from the run go to a temp directory, never to logs/.
+
+Exit status is 1 when a metric regressed by more than --tolerance against
+a comparable baseline run (same corpus fingerprint and sample count).
+
+Usage:
+    python -m benchmarks.gateway [--samples 40] [--corpora benign,pii] [--tools input]
+    python -m benchmarks.gateway --update-baseline
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from .corpora import CORPORA, DEFAULT_SEED, build, fingerprint
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.15
+QUANTILES = ("p50", "p95", "p99")
+
+# tool -> (pipeline entry point, scan function whose verdict carries layer timings)
+TOOLS = {
+    "input": ("_execute_security_pipeline", "run_input_scan"),
+    "output": ("_execute_output_scan", "run_output_scan"),
+}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB on Linux
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    n = len(values)
+    return {
+        "p50": round(values[n // 2], 3),
+        "p95": round(values[min(int(n * 0.95), n - 1)], 3),
+        "p99": round(values[min(int(n * 0.99), n - 1)], 3),
+        "mean": round(sum(values) / n, 3),
+        "max": round(values[-1], 3),
+    }
+
+
+def load_gateway(tmp: Path):
+    """Import src.server (loads every scanner model) with events logged under ``tmp``."""
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    from src.utils import logger
+    logger.EVENT_STORE_DIR = tmp / "events"
+    logger.SECURITY_METRICS_DB = tmp / "security_metrics.db"  # Absent, so no metrics sink
+
+    stdout = sys.stdout
+    from src import server
+    # src.server points stdout at stderr to keep the MCP stream clean
+    sys.stdout = stdout
+    return server
+
+
+def bench_tool(server, tool: str, texts: List[str], warmup: int) -> dict:
+    entry_name, scan_name = TOOLS[tool]
+    entry = getattr(server, entry_name)
+    scan = getattr(server, scan_name)
+    layer_timings = []
+
+    def recording_scan(text):
+        verdict = scan(text)
+        layer_timings.append(verdict["latency_ms"])
+        return verdict
+
+    # The pipeline looks the scan function up at call time
+    setattr(server, scan_name, recording_scan)
+    try:
+        for text in texts[:warmup]:
+            entry(text)
+        layer_timings.clear()
+
+        end_to_end = []
+        statuses = Counter()
+        start = time.perf_counter()
+        for text in texts:
+            t0 = time.perf_counter()
+            result = entry(text)
+            end_to_end.append((time.perf_counter() - t0) * 1000.0)
+            statuses[result["status"]] += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        setattr(server, scan_name, scan)
+
+    layers: Dict[str, List[float]] = {}
+    for timings in layer_timings:
+        for layer, ms in timings.items():
+            if layer != "total":
+                layers.setdefault(layer, []).append(ms)
+
+    return {
+        "samples": len(texts),
+        "end_to_end_ms": summarize(end_to_end),
+        "layers_ms": {layer: summarize(values) for layer, values in layers.items()},
+        "throughput_per_s": round(len(texts) / elapsed, 2),
+        "statuses": dict(statuses),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(runs: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Regressions beyond ``tolerance`` against comparable baseline runs."""
+    regressions = []
+    for key, current in runs.items():
+        base = baseline.get("runs", {}).get(key)
+        if base is None or base["fingerprint"] != current["fingerprint"]:
+            print(f"  {key}: no comparable baseline run")
+            continue
+
+        checks = [
+            (f"end-to-end {q}", base["end_to_end_ms"][q], current["end_to_end_ms"][q], "ms")
+            for q in QUANTILES
+        ]
+        for layer, stats in current["layers_ms"].items():
+            if layer in base["layers_ms"]:
+                checks.append((f"{layer} p95", base["layers_ms"][layer]["p95"], stats["p95"], "ms"))
+        checks.append(("peak RSS", base["peak_rss_mb"], current["peak_rss_mb"], "MB"))
+        for label, before, after, unit in checks:
+            if before and after > before * (1 + tolerance):
+                regressions.append(f"{key} {label}: {before} -> {after} {unit} (+{(after / before - 1) * 100:.0f}%)")
+
+        before, after = base["throughput_per_s"], current["throughput_per_s"]
+        if after < before * (1 - tolerance):
+            regressions.append(f"{key} throughput: {before} -> {after}/s ({(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_report(runs: Dict[str, dict]) -> None:
+    print(f"\n{'corpus/tool':<22}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'RSS MB':>9}  statuses")
+    for key, r in runs.items():
+        e2e = r["end_to_end_ms"]
+        statuses = ", ".join(f"{s}={c}" for s, c in sorted(r["statuses"].items()))
+        print(f"{key:<22}{r['samples']:>5}{e2e['p50']:>10.1f}{e2e['p95']:>10.1f}{e2e['p99']:>10.1f}"
+              f"{r['throughput_per_s']:>9.1f}{r['peak_rss_mb']:>9.0f}  {statuses}")
+
+    print(f"\n{'corpus/tool':<22}{'layer':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for key, r in runs.items():
+        for layer, stats in r["layers_ms"].items():
+            print(f"{key:<22}{layer:<12}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gateway pipeline micro-benchmarks")
+    parser.add_argument("--samples", type=int, default=40, help="Texts per corpus")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs before each measurement")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--corpora", default=",".join(CORPORA), help="Comma-separated corpus names")
+    parser.add_argument("--tools", default=",".join(TOOLS), help="Comma-separated: input, output")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown before a metric counts as regressed")
+    parser.add_argument("--output", type=Path, help="Also write the results JSON here")
+    args = parser.parse_args()
+
+    corpus_names = [name.strip() for name in args.corpora.split(",") if name.strip()]
+    tools = [tool.strip() for tool in args.tools.split(",") if tool.strip()]
+    unknown = [n for n in corpus_names if n not in CORPORA] + [t for t in tools if t not in TOOLS]
+    if unknown:
+        parser.error(f"unknown corpus/tool: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        load_start = time.perf_counter()
+        server = load_gateway(Path(tmp))
+        print(f"Gateway loaded in {time.perf_counter() - load_start:.1f} s, peak RSS {peak_rss_mb():.0f} MB")
+
+        runs = {}
+        for name in corpus_names:
+            texts = build(name, args.samples, args.seed)
+            for tool in tools:
+                key = f"{name}/{tool}"
+                print(f"  running {key} ...", flush=True)
+                runs[key] = {"fingerprint": fingerprint(texts), **bench_tool(server, tool, texts, args.warmup)}
+
+    results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seed": args.seed,
+            "samples": args.samples,
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+        },
+        "runs": runs,
+    }
+    print_report(runs)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    regressions = []
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        print(f"\nAgainst baseline {args.baseline} ({baseline['meta']['created']}, "
+              f"{baseline['meta']['machine']}), tolerance {args.tolerance:.0%}:")
+        regressions = compare(runs, baseline, args.tolerance)
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        if not regressions:
+            print("  no regressions")
+    elif not args.update_baseline:
+        print(f"\nNo baseline at {args.baseline}; record one with --update-baseline")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
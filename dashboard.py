@@ -1,7 +1,7 @@
 
 import streamlit as st
 import pandas as pd
-import json
+import sys
 import time
 from pathlib import Path
 
@@ -17,40 +17,83 @@ st.title("🛡️ Aegis: Anti Gen-AI Defense Dashboard")
 st.caption("Real-time monitoring of the Aegis Generic Security Middleware.")
 
 # --- Helper Functions ---
-LOG_FILE = Path("security_events.json")
-
-def load_data():
-    """Loads and processes security events from the JSON log file."""
-    if not LOG_FILE.exists() or LOG_FILE.stat().st_size < 5:  # Check for empty or near-empty file
-        return pd.DataFrame()
-
-    try:
-        # Load the entire list of JSON objects from the file
-        with open(LOG_FILE, "r") as f:
-            data = json.load(f)
-        
-        if not data:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(data)
-
-        # Normalize the 'details' column which contains nested JSON objects
-        # This will create new columns like 'details.reason', 'details.original_content', etc.
-        details_normalized = pd.json_normalize(df['details'], max_level=1).add_prefix('details.')
-        
-        # Drop the original 'details' column and join the new flattened columns
-        df = df.drop('details', axis=1).join(details_normalized)
-
-        # Convert timestamp to datetime and format it
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        return df
-    
-    except (json.JSONDecodeError, ValueError, FileNotFoundError) as e:
-        # Display an error in the dashboard if the log file is corrupt
-        st.error(f"Error loading or parsing log file: {e}")
-        return pd.DataFrame()
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+from src.utils.logger import get_event_store
+
+REFRESH_INTERVAL_S = 2
+MAX_TABLE_ROWS = 5000  # The audit log shows the newest rows; KPIs cover every event
+
+# KPI -> actions it counts (current gateway actions plus the legacy names)
+KPI_ACTIONS = {
+    "injections_blocked": {"BLOCKED", "BLOCKED_INPUT"},
+    "pii_leaks_prevented": {"REDACTED", "REDACTED_OUTPUT"},
+    "access_denials": {"DENIED_ACCESS"},
+}
+
+def events_to_frame(events):
+    """Flattens stored events into rows, with 'details' keys as 'details.<key>' columns."""
+    rows = []
+    for e in events:
+        row = {k: v for k, v in e.items() if k not in ("details", "latency_ms")}
+        for key, value in (e.get("details") or {}).items():
+            row[f"details.{key}"] = value
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms").dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+class IncrementalEventLoader:
+    """
+    Tails the gateway's event store from a saved cursor (segment + byte
+    offset), so each refresh parses only the JSONL lines appended since the
+    last one. New rows are appended to a cached DataFrame and the KPI
+    counts are updated in place, keeping refresh cost flat as the log grows.
+    """
+
+    def __init__(self, store, max_rows=MAX_TABLE_ROWS):
+        self.store = store
+        self.max_rows = max_rows
+        self.cursor = None
+        self.df = pd.DataFrame()
+        self.total_events = 0
+        self.kpis = dict.fromkeys(KPI_ACTIONS, 0)
+
+    def refresh(self):
+        """Loads newly appended events; returns how many there were."""
+        previous = self.cursor
+        try:
+            events, self.cursor = self.store.tail(self.cursor)
+        except (OSError, ValueError) as e:
+            # Display an error in the dashboard if the store can't be read
+            st.error(f"Error reading security events: {e}")
+            return 0
+        if previous is not None and self.cursor.resets != previous.resets:
+            # The store was reset (e.g. from the SOC dashboard); start over
+            self.df = pd.DataFrame()
+            self.total_events = 0
+            self.kpis = dict.fromkeys(KPI_ACTIONS, 0)
+        if not events:
+            return 0
+
+        self.total_events += len(events)
+        for e in events:
+            action = e.get("action", "")
+            for kpi, actions in KPI_ACTIONS.items():
+                if action in actions:
+                    self.kpis[kpi] += 1
+
+        new_rows = events_to_frame(events[-self.max_rows:])
+        self.df = new_rows if self.df.empty else pd.concat([self.df, new_rows], ignore_index=True)
+        if len(self.df) > self.max_rows:
+            self.df = self.df.iloc[-self.max_rows:].reset_index(drop=True)
+        return len(events)
+
+# One loader per browser session, kept across Streamlit reruns
+if "event_loader" not in st.session_state:
+    st.session_state.event_loader = IncrementalEventLoader(get_event_store())
+loader = st.session_state.event_loader
 
 def style_rows(row):
     """Applies color coding to rows based on the action taken."""
@@ -74,23 +117,16 @@ placeholder = st.empty()
 
 # --- Auto-Refresh Loop ---
 while True:
-    df = load_data()
+    loader.refresh()
+    df = loader.df
 
     with placeholder.container():
         # --- KPI Metrics ---
-        if not df.empty and "action" in df.columns:
-            total_events = len(df)
-            injections_blocked = df[df["action"] == "BLOCKED_INPUT"].shape[0]
-            pii_leaks_prevented = df[df["action"] == "REDACTED_OUTPUT"].shape[0]
-            access_denials = df[df["action"] == "DENIED_ACCESS"].shape[0]
-        else:
-            total_events, injections_blocked, pii_leaks_prevented, access_denials = 0, 0, 0, 0
-
         kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-        kpi1.metric(label="🛡️ Total Events", value=total_events)
-        kpi2.metric(label="🚨 Injections Blocked", value=injections_blocked)
-        kpi3.metric(label="🔒 PII Leaks Prevented", value=pii_leaks_prevented)
-        kpi4.metric(label="❌ Access Denied", value=access_denials)
+        kpi1.metric(label="🛡️ Total Events", value=loader.total_events)
+        kpi2.metric(label="🚨 Injections Blocked", value=loader.kpis["injections_blocked"])
+        kpi3.metric(label="🔒 PII Leaks Prevented", value=loader.kpis["pii_leaks_prevented"])
+        kpi4.metric(label="❌ Access Denied", value=loader.kpis["access_denials"])
 
         st.markdown("---")
 
@@ -100,18 +136,20 @@ while True:
             # Define which columns to display for a cleaner look
             # The full, detailed log is still available if needed
             display_columns = [
-                "timestamp", "event_type", "action", "risk_score", 
-                "details.reason", "details.original_content", "details.redacted_data"
+                "timestamp", "event_type", "action", "risk_score",
+                "details.reason", "details.original", "details.sanitized",
+                "details.original_content", "details.redacted_data"
             ]
             # Filter down to only the columns that actually exist in the dataframe
             existing_display_columns = [col for col in display_columns if col in df.columns]
 
+            # Newest first
             st.dataframe(
-                df[existing_display_columns].style.apply(style_rows, axis=1),
+                df[existing_display_columns].iloc[::-1].style.apply(style_rows, axis=1),
                 use_container_width=True,
                 height=500
             )
         else:
             st.info("No security events logged yet. Start the MCP server and interact with the agent.")
 
-    time.sleep(2)
+    time.sleep(REFRESH_INTERVAL_S)
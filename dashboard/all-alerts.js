@@ -3,29 +3,124 @@
  * Handles filtering, search, pagination, and modal display
  */
 
+const ALERTS_API_URL = '/api/security/alerts';
+const ALERTS_FETCH_SIZE = 100;
+const ALERTS_POLL_INTERVAL_MS = 5000;
+
 let allAlerts = [];
 let currentPage = 1;
 const alertsPerPage = 10;
 let filteredAlerts = [];
 
-// Fetch alerts from backend
-async function fetchAlerts() {
+// Cursors: older history (before_id) and newest alert seen (since_id)
+let nextBeforeId = null;
+let latestId = null;
+
+const TIME_FILTER_MS = {
+    '1h': 60 * 60 * 1000,
+    '24h': 24 * 60 * 60 * 1000,
+    '7d': 7 * 24 * 60 * 60 * 1000,
+    '30d': 30 * 24 * 60 * 60 * 1000
+};
+
+// Build query string from cursors and the server-side filters
+function buildAlertsQuery(cursor) {
+    const params = new URLSearchParams({ limit: ALERTS_FETCH_SIZE, ...cursor });
+
+    const severityFilter = document.getElementById('severityFilter').value;
+    const statusFilter = document.getElementById('statusFilter').value;
+    const timeFilter = document.getElementById('timeFilter').value;
+
+    if (severityFilter) params.set('severity', severityFilter);
+    if (statusFilter) params.set('action', statusFilter);
+    if (TIME_FILTER_MS[timeFilter]) params.set('start', Date.now() - TIME_FILTER_MS[timeFilter]);
+
+    return params.toString();
+}
+
+// Fetch one page of alerts from backend
+async function fetchAlerts(cursor = {}) {
     try {
-        const response = await fetch('/api/security/alerts');
-        if (!response.ok) throw new Error('Failed to fetch alerts');
-        const data = await response.json();
-        return data; // Backend returns nicely formatted alerts
+        // { alerts, next_before_id, latest_id }; a 304 reuses the last page
+        return await ConditionalFetch.json(`${ALERTS_API_URL}?${buildAlertsQuery(cursor)}`);
     } catch (error) {
         console.error('Error loading alerts:', error);
-        return [];
+        return null;
+    }
+}
+
+// (Re)load the newest page with the current server-side filters
+async function loadAlerts() {
+    const page = await fetchAlerts();
+    if (!page) return;
+
+    allAlerts = page.alerts;
+    nextBeforeId = page.next_before_id;
+    latestId = page.latest_id;
+    applyFilters();
+}
+
+// Fetch the next page of older alerts
+async function loadOlderAlerts() {
+    if (!nextBeforeId) return false;
+
+    const page = await fetchAlerts({ before_id: nextBeforeId });
+    if (!page) return false;
+
+    allAlerts = allAlerts.concat(page.alerts);
+    nextBeforeId = page.next_before_id;
+    return true;
+}
+
+// Fetch only alerts newer than the latest one already shown
+async function pollNewAlerts() {
+    if (latestId === null) return;
+
+    const page = await fetchAlerts({ since_id: latestId });
+    if (!page) return;
+
+    latestId = page.latest_id;
+    if (page.alerts.length > 0) {
+        allAlerts = page.alerts.concat(allAlerts);
+        refreshFilteredAlerts();
+        renderAlerts();
+    }
+}
+
+// Does a pushed alert pass the server-side filters currently selected?
+// (The time filter is relative to now, so fresh alerts always pass it.)
+function matchesServerFilters(alert) {
+    const severityFilter = document.getElementById('severityFilter').value;
+    const statusFilter = document.getElementById('statusFilter').value;
+    return (!severityFilter || alert.severity === severityFilter)
+        && (!statusFilter || alert.status === statusFilter);
+}
+
+// Apply alerts pushed by the live stream (newest first)
+function applyLiveAlerts(data) {
+    if (latestId === null) return; // Initial page not loaded yet
+
+    const seenId = latestId;
+    latestId = Math.max(latestId, data.latest_id);
+    const fresh = data.alerts.filter(alert =>
+        parseInt(alert.id.replace('ALT-', ''), 10) > seenId && matchesServerFilters(alert));
+    if (fresh.length > 0) {
+        allAlerts = fresh.concat(allAlerts);
+        refreshFilteredAlerts();
+        renderAlerts();
     }
 }
 
 // Initialize
 (async () => {
-    allAlerts = await fetchAlerts();
-    filteredAlerts = [...allAlerts];
-    renderAlerts();
+    await loadAlerts();
+    LiveStream.subscribe({
+        snapshot: applyLiveAlerts,
+        delta: applyLiveAlerts,
+        reset: loadAlerts,
+        resync: pollNewAlerts,
+        unavailable: () => setInterval(pollNewAlerts, ALERTS_POLL_INTERVAL_MS)
+    });
 })();
 
 // Format timestamp
@@ -76,24 +171,30 @@ function renderAlerts() {
 
 // Update pagination
 function updatePagination() {
-    const totalPages = Math.ceil(filteredAlerts.length / alertsPerPage);
-    document.getElementById('pageInfo').textContent = `Page ${currentPage} of ${totalPages}`;
+    const totalPages = Math.max(Math.ceil(filteredAlerts.length / alertsPerPage), 1);
+    const moreOnServer = nextBeforeId !== null;
+    document.getElementById('pageInfo').textContent =
+        `Page ${currentPage} of ${totalPages}${moreOnServer ? '+' : ''}`;
     document.getElementById('prevBtn').disabled = currentPage === 1;
-    document.getElementById('nextBtn').disabled = currentPage === totalPages;
+    document.getElementById('nextBtn').disabled = currentPage >= totalPages && !moreOnServer;
 }
 
-// Change page
-function changePage(delta) {
-    currentPage += delta;
+// Change page, fetching older alerts when paging past what is loaded
+async function changePage(delta) {
+    const target = currentPage + delta;
+    while (target * alertsPerPage > filteredAlerts.length && nextBeforeId) {
+        if (!await loadOlderAlerts()) break;
+        refreshFilteredAlerts();
+    }
+    currentPage = Math.min(target, Math.max(Math.ceil(filteredAlerts.length / alertsPerPage), 1));
     renderAlerts();
 }
 
-// Apply filters
-function applyFilters() {
+// Client-side filters (search and attack type) over the loaded alerts;
+// severity, status and time are applied by the server
+function refreshFilteredAlerts() {
     const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-    const severityFilter = document.getElementById('severityFilter').value;
     const typeFilter = document.getElementById('typeFilter').value;
-    const statusFilter = document.getElementById('statusFilter').value;
 
     filteredAlerts = allAlerts.filter(alert => {
         const matchesSearch = !searchTerm ||
@@ -102,21 +203,38 @@ function applyFilters() {
             alert.attackType.toLowerCase().includes(searchTerm) ||
             alert.id.toLowerCase().includes(searchTerm);
 
-        const matchesSeverity = !severityFilter || alert.severity === severityFilter;
         const matchesType = !typeFilter || alert.attackType === typeFilter;
-        const matchesStatus = !statusFilter || alert.status === statusFilter;
 
-        return matchesSearch && matchesSeverity && matchesType && matchesStatus;
+        return matchesSearch && matchesType;
     });
+}
 
+// Apply filters
+function applyFilters() {
+    refreshFilteredAlerts();
     currentPage = 1;
     renderAlerts();
 }
 
+// Fetch the full alert (complete prompt); list pages only carry previews
+async function fetchAlertDetail(alertId) {
+    try {
+        const response = await fetch(`${ALERTS_API_URL}/${encodeURIComponent(alertId)}`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return await response.json();
+    } catch (error) {
+        console.error('Error loading alert detail:', error);
+        return null;
+    }
+}
+
 // View alert details
-function viewAlertDetails(alertId) {
-    const alert = allAlerts.find(a => a.id === alertId);
-    if (!alert) return;
+async function viewAlertDetails(alertId) {
+    const summary = allAlerts.find(a => a.id === alertId);
+    if (!summary) return;
+
+    const detail = await fetchAlertDetail(alertId);
+    const alert = detail || { ...summary, fullPrompt: summary.prompt, userAgent: 'N/A' };
 
     const modal = document.getElementById('alertModal');
     const modalBody = document.getElementById('modalBody');
@@ -212,10 +330,10 @@ function downloadFile(content, filename, mimeType) {
 
 // Event listeners
 document.getElementById('searchInput').addEventListener('input', applyFilters);
-document.getElementById('severityFilter').addEventListener('change', applyFilters);
+document.getElementById('severityFilter').addEventListener('change', loadAlerts);
 document.getElementById('typeFilter').addEventListener('change', applyFilters);
-document.getElementById('statusFilter').addEventListener('change', applyFilters);
-document.getElementById('timeFilter').addEventListener('change', applyFilters);
+document.getElementById('statusFilter').addEventListener('change', loadAlerts);
+document.getElementById('timeFilter').addEventListener('change', loadAlerts);
 
 // Close modal when clicking outside
 document.getElementById('alertModal').addEventListener('click', function (e) {
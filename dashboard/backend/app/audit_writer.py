@@ -0,0 +1,206 @@
+"""
+GenAI Sentinel - Audit Writer
+Batched background writer for login audit rows and security events
+
+Request handlers hand rows to the writer instead of committing their own.
+A single worker thread bulk-inserts whatever has accumulated (up to
+AUDIT_BATCH_SIZE rows, grouped by table) in one transaction. Timestamps
+are set when a row is queued, so batching never shifts when an event
+happened.
+
+AUDIT_DURABILITY picks what a request waits for:
+    async  - nothing: rows are queued and the request returns at once;
+             up to AUDIT_FLUSH_INTERVAL_SECONDS of rows can be lost on a
+             crash, and rows are dropped (and counted) if the queue is full
+    group  - its batch to commit (group commit): durable on return, and
+             concurrent requests share one commit instead of one each
+    sync   - its own commit, on a worker thread (the previous behaviour,
+             without blocking the event loop)
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from app.config import settings
+from app.database import Base, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("async", "group", "sync")
+
+# (model, row, future resolved once committed or None)
+QueuedRow = Tuple[Type[Base], Dict[str, Any], Optional[Future]]
+
+
+class AuditWriter:
+    """
+    Queue of rows drained in bulk inserts
+
+    Args:
+        session_factory: Creates the writer's database sessions
+        durability: One of DURABILITY_MODES
+        batch_size: Maximum rows per transaction
+        flush_interval: Seconds an async-mode batch may wait to fill up
+        max_queue: Rows held in memory
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        durability: str = settings.AUDIT_DURABILITY,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        max_queue: int = settings.AUDIT_QUEUE_SIZE
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"AUDIT_DURABILITY must be one of {DURABILITY_MODES}, got '{durability}'")
+        self.session_factory = session_factory
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[QueuedRow]" = queue.Queue(max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Counted from the event loop, to_thread workers and the writer thread
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "dropped": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for key, n in increments.items():
+                self._stats[key] += n
+
+    async def write(self, model: Type[Base], row: Dict[str, Any]) -> None:
+        """
+        Record one row in ``model``'s table according to the durability mode
+
+        Raises:
+            Exception: In group/sync mode, if the row could not be committed
+        """
+        if self.durability == "sync":
+            await asyncio.to_thread(self._write, [(model, row, None)])
+            self._count(written=1, batches=1)
+            return
+
+        future = Future() if self.durability == "group" else None
+        if self.submit(model, row, future):
+            if future is not None:
+                await asyncio.wrap_future(future)
+        elif future is not None:
+            # Queue full: durable modes fall back to a direct write rather than drop
+            await asyncio.to_thread(self._write, [(model, row, None)])
+            self._count(written=1)
+
+    def submit(self, model: Type[Base], row: Dict[str, Any], future: Optional[Future] = None) -> bool:
+        """
+        Queue one row without waiting (``future`` completes once it is committed)
+
+        Returns:
+            False if the queue was full and the row was not queued
+        """
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((model, row, future))
+        except queue.Full:
+            self._count(dropped=1)
+            logger.error(f"Audit queue full, dropped {model.__tablename__} row")
+            return False
+        self._count(queued=1)
+        return True
+
+    def _next_batch(self) -> List[QueuedRow]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        # Fire-and-forget rows may wait a little to share a transaction;
+        # waiting callers are flushed with whatever is already queued
+        linger_until = time.monotonic() + (self.flush_interval if self.durability == "async" else 0)
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(linger_until - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[QueuedRow]) -> None:
+        by_model: Dict[Type[Base], List[Dict[str, Any]]] = {}
+        for model, row, _ in batch:
+            by_model.setdefault(model, []).append(row)
+
+        db = self.session_factory()
+        try:
+            for model, rows in by_model.items():
+                db.bulk_insert_mappings(model, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+                self._count(written=len(batch), batches=1)
+                for _, _, future in batch:
+                    if future is not None:
+                        future.set_result(None)
+            except Exception as e:
+                self._count(errors=1)
+                logger.error(f"Audit writer failed on {len(batch)} rows: {e}")
+                for _, _, future in batch:
+                    if future is not None:
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued row has been written (True on success)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain the queue and stop the worker"""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = dict(self._stats)
+        return {
+            **counters,
+            "durability": self.durability,
+            "pending": self._queue.unfinished_tasks
+        }
+
+
+# Singleton instance
+audit_writer = AuditWriter()
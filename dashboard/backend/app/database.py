@@ -1,13 +1,48 @@
 """
 GenAI Sentinel - Database Connection Management
 SQLAlchemy setup with connection pooling and session management
+
+Routes use the async engine (get_async_db) so queries never block the
+event loop. The async URL is derived from DATABASE_URL by swapping in an
+async driver (asyncpg for PostgreSQL, aiosqlite for SQLite) unless
+ASYNC_DATABASE_URL is set. The sync engine (get_db / SessionLocal) remains
+for scripts and background threads such as the audit writer.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from app.config import settings
 
+# Async driver per backend, used when DATABASE_URL names a sync driver
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+ASYNC_DRIVER_NAMES = {"asyncpg", "aiosqlite", "psycopg", "psycopg_async", "aiomysql", "asyncmy"}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Rewrite a database URL to use an async driver
+    
+    Args:
+        url: SQLAlchemy URL, e.g. postgresql://... or sqlite:///./app.db
+        
+    Returns:
+        The same URL with an async driver (unchanged if it already has one)
+    """
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ASYNC_DRIVER_NAMES:
+        return url
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
 # Create SQLAlchemy engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
@@ -24,17 +59,33 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine for request handling (same pool sizing as the sync engine)
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.DB_ECHO,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+)
+
+# Async session factory; objects stay usable after commit (no implicit lazy reloads)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for ORM models
 Base = declarative_base()
 
 
 def get_db() -> Generator[Session, None, None]:
     """
-    Database session dependency for FastAPI
+    Synchronous database session (scripts and background threads)
     
-    Usage in routes:
-        @app.get("/endpoint")
-        def my_endpoint(db: Session = Depends(get_db)):
+    Usage:
+        for db in get_db():
             ...
     """
     db = SessionLocal()
@@ -44,23 +95,37 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def init_db():
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database session dependency for FastAPI
+    
+    Usage in routes:
+        @app.get("/endpoint")
+        async def my_endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(User))
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def init_db():
     """
     Initialize database tables
     Call this on application startup if needed
     """
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
 
-def check_db_connection() -> bool:
+async def check_db_connection() -> bool:
     """
     Check if database connection is alive
     Returns True if connected, False otherwise
     """
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
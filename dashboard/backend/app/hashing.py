@@ -0,0 +1,34 @@
+"""
+GenAI Sentinel - Password Hashing Pool
+Password verification on the bounded bcrypt pool
+
+The pool itself is shared with the simple backend and lives in
+src/utils/hashing_pool.py at the repository root; this module sizes it from
+HASH_POOL_WORKERS and HASH_POOL_MAX_WAITING.
+"""
+import sys
+from pathlib import Path
+
+from app.config import settings
+from app.security import verify_password
+
+# Make the repository root importable (shared gateway utilities live in src/)
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.utils.hashing_pool import HashingPool, HashingPoolFull
+
+
+async def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash without blocking the event loop
+
+    Raises:
+        HashingPoolFull: If the pool is at capacity
+    """
+    return await hashing_pool.run("verify", verify_password, plain_password, hashed_password)
+
+
+# Singleton instance
+hashing_pool = HashingPool(settings.HASH_POOL_WORKERS, settings.HASH_POOL_MAX_WAITING)
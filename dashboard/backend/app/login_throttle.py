@@ -0,0 +1,190 @@
+"""
+GenAI Sentinel - Login Throttle
+In-process brute-force detection and lockout for the login path
+
+Failed logins are counted per username and per client IP over a sliding
+window, without touching the database. Counts live in count-min sketches
+(one per time slot), so memory is fixed however many distinct usernames or
+IPs an attacker cycles through. A sketch can only overestimate, and with
+the default width the error stays around one attempt even at tens of
+thousands of failures per window.
+
+Keys that reach their limit are locked out for LOCKOUT_DURATION_MINUTES.
+Lockouts are kept in a bounded LRU.
+"""
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+SKETCH_WIDTH = 16384
+SKETCH_DEPTH = 4
+WINDOW_SLOTS = 5
+MAX_LOCKOUTS = 100_000
+
+
+class SlidingWindowCounter:
+    """
+    Approximate per-key event counts over the last ``window_seconds``
+
+    The window is split into ``slots`` count-min sketches. Expired slots
+    are cleared lazily, and an estimate sums the live slots.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        slots: int = WINDOW_SLOTS,
+        width: int = SKETCH_WIDTH,
+        depth: int = SKETCH_DEPTH
+    ):
+        self.slot_seconds = window_seconds / slots
+        self.slots = slots
+        self.width = width
+        self.depth = depth
+        self._tables = [self._empty() for _ in range(slots)]
+        self._epochs = [-1] * slots
+        self._lock = threading.Lock()
+
+    def _empty(self) -> array:
+        return array("I", bytes(4 * self.width * self.depth))
+
+    def _cells(self, key: str) -> Tuple[int, ...]:
+        # Double hashing: one 128-bit digest gives every row's column
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return tuple(row * self.width + (h1 + row * h2) % self.width for row in range(self.depth))
+
+    def _live_slots(self, now: float):
+        epoch = int(now // self.slot_seconds)
+        return [
+            i for i in range(self.slots)
+            if epoch - self.slots < self._epochs[i] <= epoch
+        ]
+
+    def add(self, key: str, now: Optional[float] = None) -> int:
+        """Count one event for ``key``; returns the new windowed estimate"""
+        now = time.monotonic() if now is None else now
+        epoch = int(now // self.slot_seconds)
+        slot = epoch % self.slots
+        cells = self._cells(key)
+        with self._lock:
+            if self._epochs[slot] != epoch:
+                self._tables[slot] = self._empty()
+                self._epochs[slot] = epoch
+            table = self._tables[slot]
+            for cell in cells:
+                table[cell] += 1
+            return self._estimate(cells, now)
+
+    def estimate(self, key: str, now: Optional[float] = None) -> int:
+        """Approximate number of events for ``key`` in the window (never under)"""
+        now = time.monotonic() if now is None else now
+        cells = self._cells(key)
+        with self._lock:
+            return self._estimate(cells, now)
+
+    def _estimate(self, cells: Tuple[int, ...], now: float) -> int:
+        live = [self._tables[i] for i in self._live_slots(now)]
+        return min(sum(table[cell] for table in live) for cell in cells)
+
+
+class LoginThrottle:
+    """
+    Sliding-window failure counters and lockouts for usernames and IPs
+
+    Args:
+        window_seconds: How far back failures are counted
+        max_user_failures: Failures per username that trigger a lockout
+        max_ip_failures: Failures per client IP that trigger a lockout
+        lockout_seconds: How long a locked username/IP is refused
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        max_user_failures: int,
+        max_ip_failures: int,
+        lockout_seconds: float
+    ):
+        self.max_user_failures = max_user_failures
+        self.max_ip_failures = max_ip_failures
+        self.lockout_seconds = lockout_seconds
+        self._user_failures = SlidingWindowCounter(window_seconds)
+        self._ip_failures = SlidingWindowCounter(window_seconds)
+        self._lockouts: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"failures": 0, "lockouts": 0, "rejected": 0}
+
+    def locked_for(self, username: str, ip_address: str) -> float:
+        """
+        Seconds left on a lockout of this username or IP (0 if not locked)
+        """
+        now = time.monotonic()
+        remaining = 0.0
+        with self._lock:
+            for key in (f"user:{username}", f"ip:{ip_address}"):
+                until = self._lockouts.get(key)
+                if until is None:
+                    continue
+                if until <= now:
+                    del self._lockouts[key]
+                else:
+                    remaining = max(remaining, until - now)
+            if remaining:
+                self._stats["rejected"] += 1
+        return remaining
+
+    def _lock_out(self, key: str, now: float) -> None:
+        with self._lock:
+            self._lockouts[key] = now + self.lockout_seconds
+            self._lockouts.move_to_end(key)
+            while len(self._lockouts) > MAX_LOCKOUTS:
+                self._lockouts.popitem(last=False)
+            self._stats["lockouts"] += 1
+
+    def record_failure(self, username: str, ip_address: str) -> Dict[str, object]:
+        """
+        Count a failed login
+
+        Returns:
+            Dictionary with the windowed failure counts for the username and
+            IP, and whether this failure triggered a lockout
+        """
+        now = time.monotonic()
+        user_failures = self._user_failures.add(username, now)
+        ip_failures = self._ip_failures.add(ip_address, now)
+        with self._lock:
+            self._stats["failures"] += 1
+
+        locked = False
+        if user_failures >= self.max_user_failures:
+            self._lock_out(f"user:{username}", now)
+            locked = True
+        if ip_failures >= self.max_ip_failures:
+            self._lock_out(f"ip:{ip_address}", now)
+            locked = True
+
+        return {
+            "user_failures": user_failures,
+            "ip_failures": ip_failures,
+            "locked_out": locked
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "active_lockouts": len(self._lockouts)}
+
+
+# Singleton instance
+login_throttle = LoginThrottle(
+    window_seconds=settings.LOGIN_FAILURE_WINDOW_MINUTES * 60,
+    max_user_failures=settings.MAX_LOGIN_ATTEMPTS,
+    max_ip_failures=settings.MAX_LOGIN_ATTEMPTS_PER_IP,
+    lockout_seconds=settings.LOCKOUT_DURATION_MINUTES * 60
+)
@@ -2,13 +2,20 @@
 GenAI Sentinel - FastAPI Main Application
 Entry point with CORS, middleware, and route registration
 """
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import check_db_connection, init_db
+from app.database import async_engine, check_db_connection, init_db
+from app.audit_writer import audit_writer
+from app.hashing import hashing_pool
+from app.login_throttle import login_throttle
+from app.principal_cache import principal_cache
+from app.token_revocation import run_revocation_sync, sync_revocations, token_revocations
+from app.rate_limit import RATE_LIMIT_EXEMPT_PATHS, RateLimitMiddleware, rate_limit_key, rate_limiter
 from app.routers import auth
 
 # Lifespan context manager for startup/shutdown events
@@ -22,17 +29,28 @@ async def lifespan(app: FastAPI):
     print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     
     # Check database connection
-    if check_db_connection():
+    if await check_db_connection():
         print("✅ Database connection successful")
     else:
         print("❌ Database connection failed - check your DATABASE_URL")
     
     # Initialize database tables (optional - use Alembic in production)
-    # init_db()
+    # await init_db()
+    
+    # Load live token revocations, then follow other workers' logouts
+    try:
+        await sync_revocations()
+    except Exception as e:
+        print(f"❌ Could not load token revocations: {e}")
+    revocation_sync = asyncio.create_task(run_revocation_sync())
     
     yield
     
     # Shutdown
+    revocation_sync.cancel()
+    audit_writer.stop()
+    hashing_pool.shutdown()
+    await async_engine.dispose()
     print("👋 Shutting down GenAI Sentinel")
 
 
@@ -47,6 +65,15 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+# Per-client rate limit, answered before routing (so before bcrypt or the DB);
+# added first so the CORS headers still wrap its 429s
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    key_func=rate_limit_key,
+    exempt_paths=RATE_LIMIT_EXEMPT_PATHS
+)
+
 # CORS Middleware Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -89,12 +116,18 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
-    db_status = check_db_connection()
+    db_status = await check_db_connection()
     
     return {
         "status": "healthy" if db_status else "degraded",
         "database": "connected" if db_status else "disconnected",
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        "password_hashing": hashing_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "login_throttle": login_throttle.stats(),
+        "audit_writer": audit_writer.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "token_revocation": token_revocations.stats()
     }
 
 # Global exception handler
@@ -1,6 +1,6 @@
 """
 GenAI Sentinel - SQLAlchemy ORM Models
-Database models for users, audit logs, and security events
+Database models for users, audit logs, security events and revoked tokens
 """
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON
 from sqlalchemy.orm import relationship
@@ -91,7 +91,8 @@ class SecurityEvent(Base):
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
-    metadata = Column(JSON, nullable=True)  # Flexible JSONB field
+    # "metadata" is reserved on declarative models, so the attribute is renamed
+    event_metadata = Column("metadata", JSON, nullable=True)  # Flexible JSONB field
     
     # Relationships
     user = relationship("User", back_populates="security_events", foreign_keys=[triggered_by])
@@ -110,5 +111,20 @@ class SecurityEvent(Base):
             "ip_address": self.ip_address,
             "user_agent": self.user_agent,
             "timestamp": self.timestamp.isoformat() if self.timestamp else None,
-            "metadata": self.metadata
+            "metadata": self.event_metadata
         }
+
+
+class RevokedToken(Base):
+    """JWT ids revoked before expiry (logout); rows are useless once expires_at passes"""
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    token_type = Column(String(10), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<RevokedToken(jti='{self.jti}', type='{self.token_type}')>"
@@ -0,0 +1,166 @@
+"""
+GenAI Sentinel - Principal Cache
+TTL caches for decoded token claims and the users they resolve to
+
+Every authenticated request used to decode its JWT and load the user row.
+Dashboards poll several endpoints every few seconds, so that was a
+database round trip per poll. Claims are cached by token hash (never the
+raw token) until the TTL or the token's own expiry, whichever comes first.
+Users are cached by id as immutable Principal snapshots, not ORM
+instances, so they are safe to share across sessions.
+
+Any ORM update or delete of a User (deactivation, role change, login)
+evicts that user straight away through SQLAlchemy mapper events. The TTL
+bounds staleness for changes made outside the ORM or by another process.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated user (same fields as UserResponse)"""
+    id: int
+    username: str
+    role: str
+    is_active: bool
+    created_at: datetime
+    last_login: Optional[datetime] = None
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            email=user.email,
+            full_name=user.full_name
+        )
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a per-entry TTL
+
+    Args:
+        ttl_seconds: Default lifetime of an entry
+        max_entries: Least recently used entries are evicted beyond this
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
+
+
+class PrincipalCache:
+    """Token-hash -> claims and user-id -> Principal caches"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.claims = TTLCache(ttl_seconds, max_entries)
+        self.users = TTLCache(ttl_seconds, max_entries)
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get_claims(self, token: str) -> Optional[Dict[str, Any]]:
+        return self.claims.get(self.token_key(token))
+
+    def put_claims(self, token: str, payload: Dict[str, Any]) -> None:
+        """Cache decoded claims, never past the token's own expiry"""
+        expires_in = None
+        if "exp" in payload:
+            expires_in = float(payload["exp"]) - time.time()
+        self.claims.set(self.token_key(token), payload, expires_in)
+
+    def forget_token(self, token: str) -> None:
+        self.claims.pop(self.token_key(token))
+
+    def get_user(self, user_id: int) -> Optional[Principal]:
+        return self.users.get(user_id)
+
+    def put_user(self, principal: Principal) -> None:
+        self.users.set(principal.id, principal)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop a cached user (deactivation, role change, deletion)"""
+        self.users.pop(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"claims": self.claims.stats(), "users": self.users.stats()}
+
+
+# Singleton instance
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,47 @@
+"""
+GenAI Sentinel - Rate Limiting
+Per-client token buckets enforcing RATE_LIMIT_PER_MINUTE
+
+The limiter itself is shared with the MCP gateway and lives in
+src/utils/rate_limit.py at the repository root. Clients are keyed by IP:
+the socket address, or the X-Forwarded-For client when the request came
+through one of TRUSTED_PROXIES (the same address get_client_info reports).
+Each worker keeps its own buckets unless RATE_LIMIT_STORE points them at a
+shared store.
+"""
+import sys
+from pathlib import Path
+
+from app.config import settings
+
+# Make the repository root importable (shared gateway utilities live in src/)
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.utils.rate_limit import (
+    RateLimiter,
+    RateLimitMiddleware,
+    client_ip,
+    create_store,
+    resolve_client_ip,
+    trusted_networks
+)
+
+# Monitoring and docs are never limited
+RATE_LIMIT_EXEMPT_PATHS = ("/health", "/api/docs", "/api/redoc", "/api/openapi.json")
+
+TRUSTED_PROXIES = trusted_networks(settings.TRUSTED_PROXIES)
+
+
+def rate_limit_key(scope) -> str:
+    """Bucket key of an ASGI request: the client IP behind any trusted proxies"""
+    return client_ip(scope, TRUSTED_PROXIES)
+
+
+# Singleton instance
+rate_limiter = RateLimiter(
+    settings.RATE_LIMIT_PER_MINUTE,
+    burst=settings.RATE_LIMIT_BURST or None,
+    store=create_store(settings.RATE_LIMIT_STORE, settings.RATE_LIMIT_MAX_CLIENTS)
+)
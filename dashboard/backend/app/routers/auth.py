@@ -3,20 +3,28 @@ GenAI Sentinel - Authentication Routes
 Login, logout, token refresh, and user management endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, LoginAuditLog, SecurityEvent
 from app.schemas import UserLogin, Token, UserResponse, MessageResponse, TokenRefresh
+from app.audit_writer import audit_writer
+from app.hashing import HashingPoolFull, verify_password_pooled
+from app.login_throttle import login_throttle
+from app.principal_cache import Principal, principal_cache
+from app.rate_limit import TRUSTED_PROXIES, resolve_client_ip
 from app.security import (
-    verify_password,
     create_token_pair,
     get_current_user,
     decode_token,
-    create_access_token
+    create_access_token,
+    security_scheme
 )
+from app.token_revocation import revoke_token, token_revocations
 from app.config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -24,12 +32,13 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 def get_client_info(request: Request) -> dict:
     """Extract client IP and user agent from request"""
-    # Try to get real IP from X-Forwarded-For header (if behind proxy)
-    forwarded_for = request.headers.get("X-Forwarded-For")
-    if forwarded_for:
-        ip_address = forwarded_for.split(",")[0].strip()
-    else:
-        ip_address = request.client.host if request.client else "unknown"
+    # X-Forwarded-For only counts when set by one of TRUSTED_PROXIES; anyone
+    # else could pick a new IP per attempt and dodge the per-IP lockout
+    ip_address = resolve_client_ip(
+        request.client.host if request.client else None,
+        ", ".join(request.headers.getlist("X-Forwarded-For")),
+        TRUSTED_PROXIES
+    )
     
     user_agent = request.headers.get("User-Agent", "unknown")
     
@@ -39,8 +48,7 @@ def get_client_info(request: Request) -> dict:
     }
 
 
-def log_login_attempt(
-    db: Session,
+async def log_login_attempt(
     username: str,
     success: bool,
     ip_address: str,
@@ -49,10 +57,10 @@ def log_login_attempt(
     failure_reason: Optional[str] = None
 ):
     """
-    Log a login attempt to the audit table
+    Record a login attempt in the audit table through the batched audit
+    writer (what the request waits for depends on AUDIT_DURABILITY)
     
     Args:
-        db: Database session
         username: Username attempted
         success: Whether login succeeded
         ip_address: Client IP address
@@ -60,20 +68,18 @@ def log_login_attempt(
         user_id: User ID if login succeeded
         failure_reason: Reason for failure if applicable
     """
-    audit_log = LoginAuditLog(
-        user_id=user_id,
-        username=username,
-        success=success,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        failure_reason=failure_reason
-    )
-    db.add(audit_log)
-    db.commit()
+    await audit_writer.write(LoginAuditLog, {
+        "user_id": user_id,
+        "username": username,
+        "login_time": datetime.now(timezone.utc),
+        "success": success,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "failure_reason": failure_reason
+    })
 
 
-def create_security_event(
-    db: Session,
+async def create_security_event(
     event_type: str,
     severity: str,
     description: str,
@@ -83,10 +89,9 @@ def create_security_event(
     metadata: Optional[dict] = None
 ):
     """
-    Create a security event record
+    Create a security event record through the batched audit writer
     
     Args:
-        db: Database session
         event_type: Type of security event
         severity: low, medium, high, or critical
         description: Event description
@@ -95,24 +100,23 @@ def create_security_event(
         triggered_by: User ID if applicable
         metadata: Additional context as JSON
     """
-    event = SecurityEvent(
-        event_type=event_type,
-        severity=severity,
-        description=description,
-        triggered_by=triggered_by,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        metadata=metadata
-    )
-    db.add(event)
-    db.commit()
+    await audit_writer.write(SecurityEvent, {
+        "event_type": event_type,
+        "severity": severity,
+        "description": description,
+        "triggered_by": triggered_by,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "timestamp": datetime.now(timezone.utc),
+        "event_metadata": metadata
+    })
 
 
 @router.post("/login", response_model=Token, status_code=status.HTTP_200_OK)
 async def login(
     credentials: UserLogin,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     User login endpoint
@@ -121,6 +125,8 @@ async def login(
     - Generates JWT access and refresh tokens
     - Logs all login attempts (success and failure)
     - Updates last_login timestamp on success
+    - Locks out usernames/IPs with too many recent failures (429)
+    - Verifies the password on the bounded bcrypt pool (503 when saturated)
     - Creates security events for suspicious activity
     
     Returns JWT tokens on successful authentication
@@ -129,20 +135,34 @@ async def login(
     ip_address = client_info["ip_address"]
     user_agent = client_info["user_agent"]
     
+    # Refuse locked-out usernames/IPs before touching the database or bcrypt
+    retry_after = login_throttle.locked_for(credentials.username, ip_address)
+    if retry_after:
+        await log_login_attempt(
+            credentials.username, False, ip_address, user_agent,
+            failure_reason="Locked out"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
+    
     # Query user from database
-    user = db.query(User).filter(User.username == credentials.username).first()
+    result = await db.execute(select(User).where(User.username == credentials.username))
+    user = result.scalar_one_or_none()
     
     # Check if user exists
     if not user:
-        # Log failed attempt with non-existent user
-        log_login_attempt(
-            db, credentials.username, False, ip_address, user_agent,
+        # Log failed attempt with non-existent user (counts towards the IP's limit)
+        login_throttle.record_failure(credentials.username, ip_address)
+        await log_login_attempt(
+            credentials.username, False, ip_address, user_agent,
             failure_reason="User not found"
         )
         
         # Create security event for potential reconnaissance
-        create_security_event(
-            db,
+        await create_security_event(
             event_type="suspicious_login",
             severity="low",
             description=f"Login attempt for non-existent user: {credentials.username}",
@@ -159,13 +179,12 @@ async def login(
     
     # Check if account is active
     if not user.is_active:
-        log_login_attempt(
-            db, credentials.username, False, ip_address, user_agent,
+        await log_login_attempt(
+            credentials.username, False, ip_address, user_agent,
             user_id=user.id, failure_reason="Account inactive"
         )
         
-        create_security_event(
-            db,
+        await create_security_event(
             event_type="suspicious_login",
             severity="medium",
             description=f"Login attempt for inactive account: {credentials.username}",
@@ -179,30 +198,38 @@ async def login(
             detail="Account is inactive"
         )
     
-    # Verify password
-    if not verify_password(credentials.password, user.password_hash):
-        log_login_attempt(
-            db, credentials.username, False, ip_address, user_agent,
+    # Verify password on the bounded bcrypt pool (keeps the event loop free)
+    try:
+        password_ok = await verify_password_pooled(credentials.password, user.password_hash)
+    except HashingPoolFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    
+    if not password_ok:
+        await log_login_attempt(
+            credentials.username, False, ip_address, user_agent,
             user_id=user.id, failure_reason="Invalid password"
         )
         
-        # Check for multiple failed attempts (brute force detection)
-        recent_failures = db.query(LoginAuditLog).filter(
-            LoginAuditLog.username == credentials.username,
-            LoginAuditLog.success == False,
-            LoginAuditLog.login_time >= datetime.utcnow().replace(hour=0, minute=0, second=0)
-        ).count()
+        # Brute force detection: in-memory sliding-window counts, no query
+        failures = login_throttle.record_failure(credentials.username, ip_address)
         
-        if recent_failures >= settings.MAX_LOGIN_ATTEMPTS:
-            create_security_event(
-                db,
+        if failures["locked_out"]:
+            await create_security_event(
                 event_type="brute_force_attempt",
                 severity="high",
                 description=f"Multiple failed login attempts detected for user: {credentials.username}",
                 ip_address=ip_address,
                 user_agent=user_agent,
                 triggered_by=user.id,
-                metadata={"failed_attempts": recent_failures + 1}
+                metadata={
+                    "failed_attempts": failures["user_failures"],
+                    "failed_attempts_from_ip": failures["ip_failures"],
+                    "lockout_minutes": settings.LOCKOUT_DURATION_MINUTES
+                }
             )
         
         raise HTTPException(
@@ -216,11 +243,11 @@ async def login(
     
     # Update last login time
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Log successful login
-    log_login_attempt(
-        db, credentials.username, True, ip_address, user_agent,
+    await log_login_attempt(
+        credentials.username, True, ip_address, user_agent,
         user_id=user.id
     )
     
@@ -237,7 +264,7 @@ async def login(
 async def refresh_token(
     token_data: TokenRefresh,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh access token using a valid refresh token
@@ -257,12 +284,19 @@ async def refresh_token(
                 detail="Invalid token type"
             )
         
+        # Refresh tokens handed in at logout are revoked
+        if token_revocations.is_revoked(payload.get("jti")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        
         username = payload.get("sub")
         user_id = payload.get("user_id")
         role = payload.get("role")
         
         # Verify user still exists and is active
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -281,8 +315,7 @@ async def refresh_token(
         
     except HTTPException:
         # Log invalid token attempt
-        create_security_event(
-            db,
+        await create_security_event(
             event_type="invalid_token",
             severity="medium",
             description="Invalid refresh token used",
@@ -294,7 +327,7 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current authenticated user information
@@ -307,22 +340,31 @@ async def get_current_user_info(
 @router.post("/logout", response_model=MessageResponse)
 async def logout(
     request: Request,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    token_data: Optional[TokenRefresh] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Logout endpoint
     
-    Note: JWT tokens are stateless, so we can't invalidate them server-side
-    without a token blacklist. For production, implement token blacklist in Redis.
+    Revokes the access token (by jti, until it expires) and, when the body
+    carries it, the matching refresh token. Revoked tokens are rejected by
+    get_current_user and /auth/refresh.
     
-    This endpoint logs the logout event for audit purposes.
+    This endpoint also logs the logout event for audit purposes.
     """
     client_info = get_client_info(request)
     
+    await revoke_token(db, decode_token(credentials.credentials))
+    principal_cache.forget_token(credentials.credentials)
+    if token_data is not None:
+        refresh_payload = decode_token(token_data.refresh_token)
+        if refresh_payload.get("type") == "refresh" and refresh_payload.get("user_id") == current_user.id:
+            await revoke_token(db, refresh_payload)
+    
     # Log logout event as a security event
-    create_security_event(
-        db,
+    await create_security_event(
         event_type="unusual_activity",
         severity="low",
         description=f"User logged out: {current_user.username}",
@@ -333,5 +375,5 @@ async def logout(
     
     return MessageResponse(
         message="Logged out successfully",
-        detail="Clear the token from client storage"
+        detail="Tokens revoked; clear them from client storage"
     )
@@ -2,17 +2,21 @@
 GenAI Sentinel - Security Utilities
 Password hashing, JWT token management, and authentication helpers
 """
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
+from app.principal_cache import Principal, principal_cache
+from app.token_revocation import token_revocations
 
 # Password hashing context with bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -73,6 +77,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
+        "jti": uuid.uuid4().hex,
         "type": "access"
     })
     
@@ -101,6 +106,7 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
+        "jti": uuid.uuid4().hex,
         "type": "refresh"
     })
     
@@ -143,32 +149,40 @@ def decode_token(token: str) -> Dict[str, Any]:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """
     Dependency to get the current authenticated user from JWT token
     
+    Decoded claims (by token hash) and users (by id) come from the
+    principal cache when possible, so repeat requests skip the database.
+    The session is only used on a cache miss. Revoked (logged-out) tokens
+    are rejected.
+    
     Args:
         credentials: HTTP Authorization header with Bearer token
-        db: Database session
+        db: Async database session
         
     Returns:
-        User object
+        Principal snapshot of the user
         
     Raises:
         HTTPException: If authentication fails
     """
     token = credentials.credentials
     
-    # Decode token
-    try:
-        payload = decode_token(token)
-    except HTTPException:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Decode token (cached until the TTL or the token's expiry)
+    payload = principal_cache.get_claims(token)
+    if payload is None:
+        try:
+            payload = decode_token(token)
+        except HTTPException:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal_cache.put_claims(token, payload)
     
     # Extract user identifier
     username: str = payload.get("sub")
@@ -181,16 +195,32 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Fetch user from database
-    user = db.query(User).filter(User.username == username).first()
-    
-    if user is None:
+    # Logged-out tokens (in-memory Bloom filter check, no database query)
+    if token_revocations.is_revoked(payload.get("jti")):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Resolve the user, from the cache when possible
+    user_id = payload.get("user_id")
+    user = principal_cache.get_user(user_id) if user_id is not None else None
+    
+    if user is None or user.username != username:
+        result = await db.execute(select(User).where(User.username == username))
+        db_user = result.scalar_one_or_none()
+        
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        user = Principal.from_user(db_user)
+        principal_cache.put_user(user)
+    
     # Check if user is active
     if not user.is_active:
         raise HTTPException(
@@ -202,8 +232,8 @@ async def get_current_user(
 
 
 async def get_current_active_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Dependency to require admin role
     
@@ -211,7 +241,7 @@ async def get_current_active_admin(
         current_user: Current authenticated user
         
     Returns:
-        User object if admin
+        Principal if admin
         
     Raises:
         HTTPException: If user is not an admin
@@ -0,0 +1,238 @@
+"""
+GenAI Sentinel - Token Revocation
+Revoked JWT ids (jti) checked on every authenticated request
+
+Logout revokes the caller's tokens. A revocation only matters until the
+token would have expired anyway, so every entry carries the token's exp and
+is pruned after it: memory is bounded by the number of revoked tokens that
+are still live.
+
+Almost every check is for a token that was never revoked. A Bloom filter
+over the revoked ids answers those with a few bit lookups and no lock; only
+filter hits (revoked tokens and rare false positives) consult the exact
+jti -> exp table. Nothing touches the database per request.
+
+Revocations are persisted in the revoked_tokens table. Each worker loads the
+live ones at startup and then polls every REVOCATION_SYNC_SECONDS for rows
+revoked since its last sync, so a logout on one worker reaches the others
+within that interval. Polling is by revoked_at rather than by id: ids are
+handed out when a row is inserted, not when it commits, so a later id can
+become visible first. Each poll re-reads REVOCATION_SYNC_OVERLAP before the
+newest revoked_at seen, and every REVOCATION_FULL_SYNC_SECONDS all live rows
+are reloaded as a backstop (re-applying a revocation is a no-op).
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 1024
+
+# Commit delay tolerated between a row's revoked_at and its visibility
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (no deletes; rebuild to shrink)
+
+    Args:
+        capacity: Items it holds at ``error_rate`` false positives
+        error_rate: Target false positive rate at capacity
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.bits = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hashes = max(round(self.bits / self.capacity * math.log(2)), 1)
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        # Double hashing: one 128-bit digest gives every probe position
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class TokenRevocationList:
+    """
+    Revoked jti -> expiry (unix time), fronted by a Bloom filter
+
+    Args:
+        min_capacity: Smallest Bloom filter built; it is rebuilt at twice the
+            live entry count whenever it fills up or entries are pruned
+    """
+
+    def __init__(self, min_capacity: int = BLOOM_MIN_CAPACITY):
+        self.min_capacity = min_capacity
+        self._expiry: Dict[str, float] = {}
+        self._bloom = BloomFilter(min_capacity)
+        self._lock = threading.Lock()
+        self.last_revoked_at: Optional[datetime] = None  # Newest revoked_at synced (database clock)
+        self._stats = {"checks": 0, "bloom_negative": 0, "false_positive": 0, "revoked_hits": 0}
+
+    def _rebuild(self) -> None:
+        bloom = BloomFilter(max(self.min_capacity, 2 * len(self._expiry)))
+        for jti in self._expiry:
+            bloom.add(jti)
+        self._bloom = bloom  # Readers see either filter whole
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke ``jti`` until ``expires_at`` (no-op if already expired)"""
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            if jti in self._expiry:
+                self._expiry[jti] = max(self._expiry[jti], expires_at)
+                return
+            self._expiry[jti] = expires_at
+            if self._bloom.count >= self._bloom.capacity:
+                self.prune(locked=True)
+                self._rebuild()
+            else:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """True if ``jti`` was revoked and has not expired yet"""
+        self._stats["checks"] += 1
+        if not jti or jti not in self._bloom:
+            self._stats["bloom_negative"] += 1
+            return False
+        expires_at = self._expiry.get(jti)
+        if expires_at is None or expires_at <= time.time():
+            self._stats["false_positive"] += 1
+            return False
+        self._stats["revoked_hits"] += 1
+        return True
+
+    def prune(self, locked: bool = False) -> int:
+        """Drop expired entries (and shrink the filter); returns how many were dropped"""
+        if not locked:
+            with self._lock:
+                return self.prune(locked=True)
+        now = time.time()
+        expired = [jti for jti, expires_at in self._expiry.items() if expires_at <= now]
+        for jti in expired:
+            del self._expiry[jti]
+        if expired:
+            self._rebuild()
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "revoked": len(self._expiry),
+            "bloom_capacity": self._bloom.capacity,
+            "bloom_bytes": len(self._bloom._array),
+            "last_revoked_at": self.last_revoked_at.isoformat() if self.last_revoked_at else None
+        }
+
+
+def _unix(value: datetime) -> float:
+    # SQLite hands back naive datetimes; they are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def revoke_token(db: AsyncSession, payload: Dict[str, Any]) -> bool:
+    """
+    Revoke a decoded token locally and persist it for the other workers
+
+    Returns:
+        False if the token has no jti (issued before revocation support)
+    """
+    jti = payload.get("jti")
+    if not jti:
+        return False
+    expires_at = float(payload["exp"])
+    token_revocations.revoke(jti, expires_at)
+
+    db.add(RevokedToken(
+        jti=jti,
+        user_id=payload.get("user_id"),
+        token_type=payload.get("type", "access"),
+        expires_at=datetime.fromtimestamp(expires_at, timezone.utc)
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()  # Already revoked (e.g. repeated logout)
+    return True
+
+
+async def sync_revocations(full: bool = False) -> int:
+    """
+    Load revocations persisted since the last sync and prune expired ones
+
+    Args:
+        full: Reload every live revocation instead of only recent ones
+
+    Returns:
+        Number of revocation rows read (re-read overlap included)
+    """
+    revocations = token_revocations
+    async with AsyncSessionLocal() as db:
+        query = (
+            select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .where(RevokedToken.expires_at > datetime.now(timezone.utc))
+        )
+        if not full and revocations.last_revoked_at is not None:
+            query = query.where(RevokedToken.revoked_at >= revocations.last_revoked_at - REVOCATION_SYNC_OVERLAP)
+        rows = (await db.execute(query)).all()
+        for jti, expires_at, revoked_at in rows:
+            revocations.revoke(jti, _unix(expires_at))
+            if revocations.last_revoked_at is None or revoked_at > revocations.last_revoked_at:
+                revocations.last_revoked_at = revoked_at
+
+        if revocations.prune():
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+            await db.commit()
+    return len(rows)
+
+
+async def run_revocation_sync(
+    interval: float = settings.REVOCATION_SYNC_SECONDS,
+    full_interval: float = settings.REVOCATION_FULL_SYNC_SECONDS
+) -> None:
+    """Background task: keep this worker's list in step with the database"""
+    last_full = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        full = time.monotonic() - last_full >= full_interval
+        try:
+            await sync_revocations(full=full)
+            if full:
+                last_full = time.monotonic()
+        except Exception as e:
+            logger.error(f"Token revocation sync failed: {e}")
+
+
+# Singleton instance
+token_revocations = TokenRevocationList()
@@ -109,6 +109,19 @@ CREATE INDEX idx_prompt_injection_source_ip ON prompt_injection_attempts(source_
 CREATE INDEX idx_prompt_injection_user_id ON prompt_injection_attempts(user_id);
 CREATE INDEX idx_prompt_injection_endpoint ON prompt_injection_attempts(endpoint);
 
+-- Revoked JWT ids (logout); rows can be deleted once expires_at has passed
+CREATE TABLE revoked_tokens (
+    id SERIAL PRIMARY KEY,
+    jti VARCHAR(64) UNIQUE NOT NULL,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    token_type VARCHAR(10) NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    revoked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens(expires_at);
+CREATE INDEX idx_revoked_tokens_revoked_at ON revoked_tokens(revoked_at);
+
 -- Create a view for recent security dashboard
 CREATE VIEW recent_security_summary AS
 SELECT 
@@ -0,0 +1,39 @@
+/**
+ * Conditional Fetch - JavaScript
+ * Polls JSON endpoints with If-None-Match. While nothing has changed the
+ * server answers 304 with no body, and the last payload is reused.
+ */
+
+const ConditionalFetch = (() => {
+    const cache = new Map(); // url -> { etag, data }
+
+    /**
+     * Fetch JSON from `url`, revalidating against the last response.
+     * Throws on HTTP errors like fetch + response.ok checks would.
+     */
+    async function json(url) {
+        const cached = cache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+
+        // no-store: this helper is the cache, the browser's would only duplicate it
+        const response = await fetch(url, { headers, cache: 'no-store' });
+
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            cache.set(url, { etag, data });
+        } else {
+            cache.delete(url);
+        }
+        return data;
+    }
+
+    return { json };
+})();
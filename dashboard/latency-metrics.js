@@ -11,14 +11,8 @@ const UPDATE_INTERVAL_MS = 5000; // Update every 5 seconds
  */
 async function fetchLatencyMetrics() {
     try {
-        const response = await fetch(METRICS_API_URL);
-
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-
-        const data = await response.json();
-        return data;
+        // Conditional request: unchanged metrics come back as a bodiless 304
+        return await ConditionalFetch.json(METRICS_API_URL);
 
     } catch (error) {
         console.error('Error fetching latency metrics:', error);
@@ -115,13 +109,9 @@ function animateNumberChange(element, startValue, endValue) {
 }
 
 /**
- * Start periodic metric updates
+ * Fall back to periodic polling when the live stream is unavailable
  */
-function startMetricsUpdates() {
-    // Initial fetch
-    fetchLatencyMetrics().then(updateLatencyCard);
-
-    // Set up periodic updates
+function pollLatencyMetrics() {
     setInterval(async () => {
         const metrics = await fetchLatencyMetrics();
         updateLatencyCard(metrics);
@@ -130,6 +120,23 @@ function startMetricsUpdates() {
     console.log(`✅ Latency metrics auto-update started (every ${UPDATE_INTERVAL_MS / 1000}s)`);
 }
 
+/**
+ * Start live metric updates (pushed by the server)
+ */
+function startMetricsUpdates() {
+    // Initial fetch
+    fetchLatencyMetrics().then(updateLatencyCard);
+
+    const applyLatency = (data) => updateLatencyCard(data.latency);
+    LiveStream.subscribe({
+        snapshot: applyLatency,
+        delta: applyLatency,
+        reset: applyLatency,
+        resync: () => fetchLatencyMetrics().then(updateLatencyCard),
+        unavailable: pollLatencyMetrics
+    });
+}
+
 /**
  * Generate sample security scan requests to populate metrics
  * (For demo purposes - remove in production)
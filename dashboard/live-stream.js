@@ -0,0 +1,85 @@
+/**
+ * Live Stream - JavaScript
+ * One shared server-sent event connection per page. Dashboard scripts
+ * subscribe to it and apply the pushed deltas instead of polling.
+ */
+
+const LIVE_STREAM_URL = '/api/stream';
+
+const LiveStream = (() => {
+    const handlers = { snapshot: [], delta: [], reset: [], resync: [], unavailable: [] };
+    let source = null;
+    let latestId = null;
+    let unavailable = false;
+
+    function dispatch(type, data) {
+        handlers[type].forEach(handler => {
+            try {
+                handler(data);
+            } catch (error) {
+                console.error(`Live stream ${type} handler failed:`, error);
+            }
+        });
+    }
+
+    // Subscribers fall back to polling once; later calls must not start a second poller
+    function markUnavailable() {
+        if (unavailable) return;
+        unavailable = true;
+        dispatch('unavailable', null);
+    }
+
+    function connect() {
+        if (source || unavailable) return;
+        if (typeof EventSource === 'undefined') {
+            markUnavailable();
+            return;
+        }
+
+        source = new EventSource(LIVE_STREAM_URL);
+
+        ['snapshot', 'delta', 'reset'].forEach(type => {
+            source.addEventListener(type, (event) => {
+                const data = JSON.parse(event.data);
+                // Drop alerts already delivered (the stream may overlap on connect)
+                if (data.alerts && latestId !== null && type !== 'reset') {
+                    data.alerts = data.alerts.filter(a => parseInt(a.id.replace('ALT-', ''), 10) > latestId);
+                }
+                latestId = data.latest_id;
+                dispatch(type, data);
+            });
+        });
+
+        source.addEventListener('resync', () => dispatch('resync', null));
+
+        source.onerror = () => {
+            // EventSource reconnects on its own (sending Last-Event-ID);
+            // CLOSED means the server refused the stream altogether.
+            if (source.readyState === EventSource.CLOSED) {
+                console.warn('Live stream unavailable, falling back to polling');
+                source = null;
+                markUnavailable();
+            }
+        };
+
+        console.log('✅ Live stream connected');
+    }
+
+    return {
+        /**
+         * Register handlers: { snapshot, delta, reset, resync, unavailable }.
+         * Each receives the decoded event payload.
+         */
+        subscribe(subscriber) {
+            Object.entries(subscriber).forEach(([type, handler]) => {
+                if (handlers[type]) handlers[type].push(handler);
+            });
+            if (unavailable) {
+                // Already fell back: only this subscriber still needs to start polling
+                if (subscriber.unavailable) subscriber.unavailable(null);
+                return;
+            }
+            connect();
+        }
+    };
+})();
@@ -105,20 +105,16 @@ async function initLatencyChart() {
     const ctx = document.getElementById('latencyChart');
     if (!ctx) return;
 
-    // Fetch data
-    let chartData = {
-        labels: ['00:00', '04:00', '08:00', '12:00', '16:00', '20:00'],
-        native: [20, 25, 22, 30, 28, 25],
-        secured: [120, 130, 125, 140, 135, 130]
-    };
+    // Fetch data (last 24h in 4-hour buckets, aggregated server-side)
+    let chartData = { labels: [], avg: [], p95: [] };
 
     try {
-        const response = await fetch('/metrics/latency');
+        const response = await fetch('/metrics/latency?range=24h');
         const data = await response.json();
         if (data.history) {
             chartData.labels = data.history.labels;
-            chartData.native = data.history.native;
-            chartData.secured = data.history.secured;
+            chartData.avg = data.history.avg_latency_ms;
+            chartData.p95 = data.history.p95_latency_ms;
         }
     } catch (e) {
         console.error("Failed to load latency history", e);
@@ -130,15 +126,15 @@ async function initLatencyChart() {
             labels: chartData.labels,
             datasets: [
                 {
-                    label: 'Native',
-                    data: chartData.native,
+                    label: 'Avg Overhead',
+                    data: chartData.avg,
                     backgroundColor: '#1E293B',
                     borderRadius: 4,
                     barThickness: 30
                 },
                 {
-                    label: 'Secured',
-                    data: chartData.secured,
+                    label: 'P95 Overhead',
+                    data: chartData.p95,
                     backgroundColor: '#3B82F6',
                     borderRadius: 4,
                     barThickness: 30
@@ -170,52 +166,77 @@ async function initLatencyChart() {
 
 // ... (Heatmap code omitted/unchanged) ...
 
+const INCIDENTS_SHOWN = 7;
+
+// Build one incidents-table row from a dashboard alert
+function createIncidentRow(alert) {
+    const row = document.createElement('tr');
+    row.style.opacity = '0';
+    row.style.transform = 'translateX(-20px)';
+
+    // Format timestamp slightly differently if needed, or use as is
+    const displayTime = new Date(alert.timestamp).toLocaleString();
+
+    row.innerHTML = `
+        <td><span class="severity-badge severity-${alert.severity}">${alert.severity}</span></td>
+        <td>${alert.attackType}</td>
+        <td>${displayTime}</td>
+        <td><span class="action-badge action-${alert.status}">${alert.status.toUpperCase()}</span></td>
+    `;
+    return row;
+}
+
+// Animate row appearance
+function revealIncidentRow(row, index) {
+    setTimeout(() => {
+        row.style.transition = 'all 0.4s ease';
+        row.style.opacity = '1';
+        row.style.transform = 'translateX(0)';
+    }, index * 100);
+}
+
+// Prepend alerts pushed by the live stream, keeping the newest few
+function prependIncidents(alerts) {
+    const incidentsBody = document.getElementById('incidentsBody');
+    if (!incidentsBody || !alerts || alerts.length === 0) return;
+
+    alerts.slice(0, INCIDENTS_SHOWN).reverse().forEach((alert, index) => {
+        const row = createIncidentRow(alert);
+        incidentsBody.insertBefore(row, incidentsBody.firstChild);
+        revealIncidentRow(row, index);
+    });
+    while (incidentsBody.children.length > INCIDENTS_SHOWN) {
+        incidentsBody.removeChild(incidentsBody.lastChild);
+    }
+}
+
 // Initialize incidents table with Real Data
 async function initIncidentsTable() {
     const incidentsBody = document.getElementById('incidentsBody');
     if (!incidentsBody) return;
 
     try {
-        // Reuse the alerts endpoint
-        const response = await fetch('/api/security/alerts');
-        const alerts = await response.json();
-
-        // Take top 7
-        const incidents = alerts.slice(0, 7).map(a => ({
-            severity: a.severity,
-            type: a.attackType,
-            timestamp: a.timestamp, // Already formatted or raw string
-            action: a.status
-        }));
-
-        incidents.forEach((incident, index) => {
-            const row = document.createElement('tr');
-            row.style.opacity = '0';
-            row.style.transform = 'translateX(-20px)';
-
-            // Format timestamp slightly differently if needed, or use as is
-            const displayTime = new Date(incident.timestamp).toLocaleString();
-
-            row.innerHTML = `
-                <td><span class="severity-badge severity-${incident.severity}">${incident.severity}</span></td>
-                <td>${incident.type}</td>
-                <td>${displayTime}</td>
-                <td><span class="action-badge action-${incident.action}">${incident.action.toUpperCase()}</span></td>
-            `;
+        // Reuse the alerts endpoint, asking only for the newest few
+        const response = await fetch(`/api/security/alerts?limit=${INCIDENTS_SHOWN}`);
+        const { alerts } = await response.json();
 
+        alerts.forEach((alert, index) => {
+            const row = createIncidentRow(alert);
             incidentsBody.appendChild(row);
-
-            // Animate row appearance
-            setTimeout(() => {
-                row.style.transition = 'all 0.4s ease';
-                row.style.opacity = '1';
-                row.style.transform = 'translateX(0)';
-            }, index * 100);
+            revealIncidentRow(row, index);
         });
 
     } catch (e) {
         console.error("Failed to load incidents", e);
     }
+
+    // New incidents arrive over the live stream
+    if (typeof LiveStream !== 'undefined') {
+        LiveStream.subscribe({
+            delta: (data) => prependIncidents(data.alerts),
+            reset: () => { incidentsBody.innerHTML = ''; }
+        });
+    }
 }
 
 // Login functionality
@@ -1,15 +1,38 @@
 """
 MCP server with scan_content (PromptInjection) and get_sensitive_data (Anonymize) tools.
+
+Taint is tracked per MCP session (see taint_store.py): a malicious prompt
+restricts only the session that sent it, until the taint decays. Callers
+without a session (or client id) cannot be told apart, so they are never
+served sensitive data.
+
+Records are redacted when they are written (put_records), not on every
+read: get_sensitive_data serves the cached redaction for the record's
+current content version and only falls back to Anonymize if the record was
+changed behind the cache's back.
+
+Run from anywhere with ``python dashboard/server.py`` (or
+``uvicorn --app-dir dashboard server:app``).
 """
 
+import hashlib
+import sys
+from pathlib import Path
+from typing import Optional
+
 import uvicorn
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from llm_guard.input_scanners import PromptInjection, Anonymize
 from llm_guard.input_scanners.prompt_injection import MatchType
 from llm_guard.vault import Vault
 
-# Global taint flag set when malicious prompt is detected
-IS_TAINTED = False
+# taint_store.py sits next to this file; make it importable from any working directory
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from taint_store import create_taint_store
+
+# Sessions in which a malicious prompt was detected
+taint_store = create_taint_store()
 
 MOCK_DB = {
     "Alice": "555-0199",
@@ -17,7 +40,8 @@ MOCK_DB = {
     "Caveman": "999-0000",
 }
 
-# Lazy-init scanners (they load models on first use)
+# Lazy-init scanners (they load models on first use; Anonymize's first use
+# is the bulk redaction of MOCK_DB at startup)
 _prompt_injection_scanner = None
 _anonymize_scanner = None
 _anonymize_vault = None
@@ -45,46 +69,105 @@ def _get_anonymize():
     return _anonymize_scanner
 
 
+# Redacted records: name -> (content version, redacted value)
+_redactions = {}
+
+
+def _content_version(raw: str) -> str:
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _redact(name: str, raw: str) -> str:
+    redacted, _valid, _score = _get_anonymize().scan(raw)
+    _redactions[name] = (_content_version(raw), redacted)
+    return redacted
+
+
+def put_records(records: dict) -> None:
+    """Insert or update records in MOCK_DB, redacting them in one pass."""
+    for name, raw in records.items():
+        MOCK_DB[name] = raw
+        _redact(name, raw)
+
+
+def delete_record(name: str) -> None:
+    MOCK_DB.pop(name, None)
+    _redactions.pop(name, None)
+
+
+def _redacted_record(name: str) -> str:
+    """Redacted value of a record; Anonymize only runs if its content changed."""
+    raw = MOCK_DB[name]
+    cached = _redactions.get(name)
+    if cached is not None and cached[0] == _content_version(raw):
+        return cached[1]
+    return _redact(name, raw)
+
+
+def _session_key(ctx: Context) -> Optional[str]:
+    """
+    Taint key of the caller: its MCP session id, else its client id.
+
+    None when neither is known. There is deliberately no shared fallback
+    key: one malicious prompt would then taint every such caller.
+    """
+    for attribute, prefix in (("session_id", "session:"), ("client_id", "client:")):
+        try:
+            value = getattr(ctx, attribute)
+        except Exception:  # No active request (direct call)
+            value = None
+        if value:
+            return prefix + value
+    return None
+
+
 mcp = FastMCP("Security MCP Server", json_response=True)
 
 
 @mcp.tool()
-def scan_content(text: str) -> str:
+def scan_content(text: str, ctx: Context) -> str:
     """
     Scan text for malicious prompt injection. Uses llm-guard PromptInjection.
-    If malicious, sets IS_TAINTED and returns a warning; otherwise returns safe.
+    If malicious, taints the caller's session and returns a warning; otherwise returns safe.
     """
-    global IS_TAINTED
     if not text or not text.strip():
         return "safe"
     scanner = _get_prompt_injection()
     _sanitized, is_valid, _risk_score = scanner.scan(text)
     if not is_valid:
-        IS_TAINTED = True
+        session = _session_key(ctx)
+        if session is not None:
+            taint_store.taint(session)
         return "Warning: Malicious prompt injection detected. Access to sensitive data is now restricted."
     return "safe"
 
 
 @mcp.tool()
-def get_sensitive_data(name: str) -> str:
+def get_sensitive_data(name: str, ctx: Context) -> str:
     """
-    Fetch sensitive data for a person by name. Checks IS_TAINTED; if tainted, denies access.
-    Otherwise fetches from the mock DB and redacts phone numbers using llm-guard Anonymize.
+    Fetch sensitive data for a person by name. Denies access if the caller's session is tainted.
+    Otherwise returns the record from the mock DB with phone numbers redacted
+    (llm-guard Anonymize, cached per record version).
     """
-    global IS_TAINTED
-    if IS_TAINTED:
+    session = _session_key(ctx)
+    if session is None:
+        # Without a session its taint cannot be tracked, so fail closed
+        return "Access denied: no MCP session to track taint for. Cannot return sensitive data."
+    if taint_store.is_tainted(session):
         return "Access denied: session is tainted due to prior malicious prompt. Cannot return sensitive data."
     if name not in MOCK_DB:
         return f"Unknown name: {name}"
-    raw = MOCK_DB[name]
-    scanner = _get_anonymize()
-    redacted, _valid, _score = scanner.scan(raw)
-    return redacted
+    return _redacted_record(name)
+
+
+# Redact the initial records at startup rather than on first read
+put_records(dict(MOCK_DB))
 
 
 # ASGI app for uvicorn (streamable HTTP at root)
 app = mcp.http_app(path="/")
 
 if __name__ == "__main__":
-    import server
-    uvicorn.run(server.app, host="0.0.0.0", port=8000)
+    # Serve this module's app: re-importing it as ``server`` would run the
+    # module a second time (scanners, MOCK_DB redaction, taint store)
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,158 @@
+"""
+Gateway Event Ingestion
+Copies security events from the gateway's event store (logs/events) into
+the security_events table so they can be queried and full-text searched.
+
+Events are read incrementally after the last ingested id and inserted in
+batches with executemany, one transaction per batch (the ingest cursor is
+advanced in the same transaction, so a crash never loses or duplicates
+a batch).
+"""
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+# Make the repository root importable (shared gateway utilities live in src/)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.utils.alerts import classify_threat_vector, event_severity
+from src.utils.event_store import EventStore
+from src.utils.logger import get_event_store
+
+from security_metrics_db import get_connection_manager
+
+INGEST_SOURCE = "gateway_event_store"
+INGEST_BATCH_SIZE = 500
+INGEST_INTERVAL_S = 2.0
+PROMPT_PREVIEW_CHARS = 1000
+
+
+def event_to_row(event: dict) -> tuple:
+    """Map a stored gateway event to a security_events row."""
+    details = event.get("details") or {}
+    reason = details.get("reason", "")
+    action = event.get("action", "UNKNOWN")
+    prompt = details.get("original") or details.get("sanitized") or ""
+    detected_at = datetime.fromtimestamp(event["timestamp"] / 1000.0)
+
+    return (
+        event["id"],
+        event.get("event_type", "UNKNOWN"),
+        action,
+        classify_threat_vector(reason) if reason else None,
+        event_severity(event),
+        action == "BLOCKED",
+        event.get("risk_score"),
+        prompt[:PROMPT_PREVIEW_CHARS],
+        reason,
+        event.get("source_ip"),
+        detected_at,
+    )
+
+
+class EventIngestor:
+    """Incrementally ingests the event store into SQLite."""
+
+    def __init__(self, store: EventStore, batch_size: int = INGEST_BATCH_SIZE,
+                 source: str = INGEST_SOURCE):
+        self.store = store
+        self.batch_size = batch_size
+        self.source = source
+        self._db = get_connection_manager()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def last_ingested_id(self) -> int:
+        row = self._db.execute(
+            "SELECT last_event_id FROM ingest_state WHERE source = ?", (self.source,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _write_batch(self, events: List[dict]) -> None:
+        with self._db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT OR IGNORE INTO security_events (
+                    event_id, event_type, action, threat_type, severity, blocked,
+                    risk_score, prompt_preview, reason, source_ip, detected_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [event_to_row(event) for event in events])
+            cursor.execute('''
+                INSERT INTO ingest_state (source, last_event_id, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    last_event_id = excluded.last_event_id,
+                    updated_at = excluded.updated_at
+            ''', (self.source, events[-1]["id"], datetime.now()))
+
+    def _batches(self, events: Iterable[dict]) -> Iterable[List[dict]]:
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def ingest_once(self) -> int:
+        """
+        Ingest every event appended since the last run.
+
+        Returns:
+            Number of events ingested
+        """
+        last_id = self.last_ingested_id()
+        if self.store.high_water_mark() <= last_id:
+            return 0
+        ingested = 0
+        for batch in self._batches(self.store.iter_events(after_id=last_id)):
+            self._write_batch(batch)
+            ingested += len(batch)
+        return ingested
+
+    def start(self, interval: float = INGEST_INTERVAL_S) -> None:
+        """Ingest continuously on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="event-ingest", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while True:
+            try:
+                count = self.ingest_once()
+                if count:
+                    print(f"📥 Ingested {count} gateway events")
+            except Exception as e:
+                print(f"⚠️ Event ingestion failed: {e}")
+            if self._stop.wait(interval):
+                return
+
+
+_ingestor: Optional[EventIngestor] = None
+
+
+def get_event_ingestor() -> EventIngestor:
+    """Get the global ingestor for the gateway event store."""
+    global _ingestor
+    if _ingestor is None:
+        _ingestor = EventIngestor(get_event_store())
+    return _ingestor
+
+
+if __name__ == "__main__":
+    # One-off backfill: python event_ingest.py
+    print(f"Ingested {get_event_ingestor().ingest_once()} events")
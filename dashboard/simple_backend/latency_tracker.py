@@ -1,37 +1,129 @@
 """
 Latency Measurement and Metrics Module
-Tracks security layer overhead with high-resolution timing
+Tracks security layer overhead with high-resolution timing.
+
+Samples are recorded into mergeable log-bucketed histograms (see
+src/utils/sketch.py) kept per sliding time window, so recording is O(1),
+memory is constant regardless of traffic and quantiles up to p99.9 are
+available over every sample in the window.
 """
+import sys
+import threading
 import time
-from collections import deque
-from typing import Dict, Optional
-from datetime import datetime
-import statistics
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Make the repository root importable (shared gateway utilities live in src/)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.utils.sketch import LogHistogram
+
+# Sliding windows tracked simultaneously (name -> seconds)
+DEFAULT_WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+DEFAULT_PRIMARY_WINDOW = "5m"
+SLOTS_PER_WINDOW = 60
+
+REPORTED_QUANTILES = {"p50": 0.50, "p90": 0.90, "p95": 0.95, "p99": 0.99, "p999": 0.999}
+
+
+class WindowedHistogram:
+    """
+    Sliding-window histogram built from a ring of per-slot histograms.
+    Recording touches only the current slot; reads merge the live slots.
+    """
+    
+    def __init__(self, window_seconds: float, slots: int = SLOTS_PER_WINDOW):
+        self.window_seconds = window_seconds
+        self.slot_seconds = window_seconds / slots
+        self._slots: List[Optional[list]] = [None] * slots  # [slot_index, LogHistogram]
+    
+    def add(self, value: float, now: float) -> None:
+        index = int(now // self.slot_seconds)
+        position = index % len(self._slots)
+        entry = self._slots[position]
+        if entry is None or entry[0] != index:
+            # Slot expired: reuse its position for the current interval
+            entry = self._slots[position] = [index, LogHistogram()]
+        entry[1].add(value)
+    
+    def snapshot(self, now: float) -> LogHistogram:
+        """Merged histogram of every sample inside the window."""
+        oldest = int(now // self.slot_seconds) - len(self._slots) + 1
+        return LogHistogram.merged(
+            entry[1] for entry in self._slots
+            if entry is not None and entry[0] >= oldest
+        )
+
+
+class _ThreadShard:
+    """Per-thread accumulator; only its owning thread ever writes to it."""
+    
+    __slots__ = ("windows", "lifetime", "total_requests", "sla_breaches")
+    
+    def __init__(self, windows: Dict[str, float]):
+        self.windows = {name: WindowedHistogram(seconds) for name, seconds in windows.items()}
+        self.lifetime = LogHistogram()
+        self.total_requests = 0
+        self.sla_breaches = 0
 
 
 class LatencyTracker:
     """
     Thread-safe latency tracker for security layer performance monitoring.
     Measures ONLY the overhead added by security checks, not LLM response time.
+    
+    Each thread records into its own shard without taking a lock; readers
+    merge all shards, so uvicorn worker threads never contend on the hot path.
     """
     
-    def __init__(self, window_size: int = 100, sla_threshold_ms: float = 50.0):
+    def __init__(
+        self,
+        sla_threshold_ms: float = 50.0,
+        windows: Dict[str, float] = DEFAULT_WINDOWS,
+        primary_window: str = DEFAULT_PRIMARY_WINDOW
+    ):
         """
         Initialize latency tracker.
         
         Args:
-            window_size: Number of recent measurements to use for rolling average
             sla_threshold_ms: SLA threshold in milliseconds
+            windows: Sliding windows to track, as name -> seconds
+            primary_window: Window used for the headline avg/median/p95 and SLA status
         """
-        self.window_size = window_size
-        self.sla_threshold_ms = sla_threshold_ms
+        if primary_window not in windows:
+            raise ValueError(f"primary_window '{primary_window}' is not one of {list(windows)}")
         
-        # Use deque for efficient rolling window (O(1) append/pop)
-        self._latencies_ms = deque(maxlen=window_size)
+        self.sla_threshold_ms = sla_threshold_ms
+        self.primary_window = primary_window
+        self._window_config = dict(windows)
         
-        # Counters for observability
-        self.total_requests = 0
-        self.sla_breaches = 0
+        # Shards are registered once per thread; the lock guards only the registry
+        self._registry_lock = threading.Lock()
+        self._shards: List[_ThreadShard] = []
+        self._local = threading.local()
+    
+    def _shard(self) -> _ThreadShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _ThreadShard(self._window_config)
+            with self._registry_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+    
+    def _all_shards(self) -> List[_ThreadShard]:
+        with self._registry_lock:
+            return list(self._shards)
+    
+    @property
+    def total_requests(self) -> int:
+        return sum(shard.total_requests for shard in self._all_shards())
+    
+    @property
+    def sla_breaches(self) -> int:
+        return sum(shard.sla_breaches for shard in self._all_shards())
         
     def measure_security_check(self, check_function, *args, **kwargs):
         """
@@ -64,82 +156,119 @@ class LatencyTracker:
     
     def record_latency(self, latency_ms: float) -> None:
         """
-        Record a latency measurement.
+        Record a latency measurement in O(1), lock-free.
         
         Args:
             latency_ms: Latency in milliseconds
         """
-        self._latencies_ms.append(latency_ms)
-        self.total_requests += 1
+        shard = self._shard()
+        now = time.monotonic()
+        for window in shard.windows.values():
+            window.add(latency_ms, now)
+        shard.lifetime.add(latency_ms)
+        shard.total_requests += 1
         
         # Check SLA breach
         if latency_ms > self.sla_threshold_ms:
-            self.sla_breaches += 1
+            shard.sla_breaches += 1
     
-    def get_avg_latency_ms(self) -> float:
+    def get_histogram(self, window: Optional[str] = None) -> LogHistogram:
         """
-        Calculate rolling average latency.
+        Histogram for a sliding window ("lifetime" for all samples).
+        
+        Args:
+            window: Window name (defaults to the primary window)
+        """
+        window = window or self.primary_window
+        shards = self._all_shards()
+        if window == "lifetime":
+            return LogHistogram.merged(shard.lifetime for shard in shards)
+        if window not in self._window_config:
+            raise ValueError(f"Unknown window '{window}'")
+        now = time.monotonic()
+        return LogHistogram.merged(shard.windows[window].snapshot(now) for shard in shards)
+    
+    def get_avg_latency_ms(self, window: Optional[str] = None) -> float:
+        """
+        Calculate average latency over a sliding window.
         
         Returns:
             Average latency in milliseconds (0.0 if no data)
         """
-        if not self._latencies_ms:
-            return 0.0
+        return self.get_histogram(window).mean
+    
+    def get_percentile_ms(self, quantile: float, window: Optional[str] = None) -> float:
+        """
+        Approximate a latency quantile (within 1% relative error).
         
-        return statistics.mean(self._latencies_ms)
+        Args:
+            quantile: Quantile between 0.0 and 1.0 (e.g. 0.99)
+            window: Window name (defaults to the primary window)
+            
+        Returns:
+            Latency in milliseconds (0.0 if no data)
+        """
+        return self.get_histogram(window).quantile(quantile)
     
-    def get_median_latency_ms(self) -> float:
+    def get_median_latency_ms(self, window: Optional[str] = None) -> float:
         """
         Calculate median latency (more robust to outliers).
         
         Returns:
             Median latency in milliseconds (0.0 if no data)
         """
-        if not self._latencies_ms:
-            return 0.0
-        
-        return statistics.median(self._latencies_ms)
+        return self.get_percentile_ms(0.5, window)
     
-    def get_p95_latency_ms(self) -> float:
+    def get_p95_latency_ms(self, window: Optional[str] = None) -> float:
         """
         Calculate 95th percentile latency.
         
         Returns:
             P95 latency in milliseconds (0.0 if no data)
         """
-        if not self._latencies_ms:
-            return 0.0
-        
-        sorted_latencies = sorted(self._latencies_ms)
-        index = int(len(sorted_latencies) * 0.95)
-        return sorted_latencies[index] if index < len(sorted_latencies) else sorted_latencies[-1]
+        return self.get_percentile_ms(0.95, window)
     
-    def get_sla_status(self) -> str:
+    def get_sla_status(self, avg_latency: Optional[float] = None) -> str:
         """
         Determine if current average latency is within SLA.
         
         Returns:
             "within_sla" or "sla_breached"
         """
-        avg_latency = self.get_avg_latency_ms()
+        if avg_latency is None:
+            avg_latency = self.get_avg_latency_ms()
         return "within_sla" if avg_latency <= self.sla_threshold_ms else "sla_breached"
     
-    def calculate_percentage_impact(self, baseline_llm_latency_ms: float = 2400.0) -> float:
+    def calculate_percentage_impact(
+        self,
+        baseline_llm_latency_ms: float = 2400.0,
+        avg_latency: Optional[float] = None
+    ) -> float:
         """
         Calculate percentage impact of security layer on total request time.
         
         Args:
             baseline_llm_latency_ms: Average LLM response time (default 2.4s)
+            avg_latency: Precomputed average latency (defaults to the primary window)
             
         Returns:
             Percentage impact (e.g., 1.0 means 1% overhead)
         """
-        avg_latency = self.get_avg_latency_ms()
+        if avg_latency is None:
+            avg_latency = self.get_avg_latency_ms()
         if baseline_llm_latency_ms <= 0:
             return 0.0
         
         return (avg_latency / baseline_llm_latency_ms) * 100.0
     
+    @staticmethod
+    def summarize(hist: LogHistogram) -> Dict[str, float]:
+        """Count, mean and reported quantiles of a histogram."""
+        summary = {"count": hist.count, "avg_ms": round(hist.mean, 2)}
+        for name, q in REPORTED_QUANTILES.items():
+            summary[f"{name}_ms"] = round(hist.quantile(q), 2)
+        return summary
+    
     def get_metrics(self) -> Dict[str, any]:
         """
         Get comprehensive latency metrics.
@@ -147,111 +276,137 @@ class LatencyTracker:
         Returns:
             Dictionary containing all metrics
         """
-        avg_latency = self.get_avg_latency_ms()
+        windows = {name: self.get_histogram(name) for name in self._window_config}
+        primary = windows[self.primary_window]
+        avg_latency = primary.mean
+        shards = self._all_shards()
+        total_requests = sum(shard.total_requests for shard in shards)
+        sla_breaches = sum(shard.sla_breaches for shard in shards)
         
         return {
             "avg_latency_ms": round(avg_latency, 2),
-            "median_latency_ms": round(self.get_median_latency_ms(), 2),
-            "p95_latency_ms": round(self.get_p95_latency_ms(), 2),
-            "percentage_impact": round(self.calculate_percentage_impact(), 2),
-            "sla_status": self.get_sla_status(),
+            "median_latency_ms": round(primary.quantile(0.5), 2),
+            "p95_latency_ms": round(primary.quantile(0.95), 2),
+            "p99_latency_ms": round(primary.quantile(0.99), 2),
+            "p999_latency_ms": round(primary.quantile(0.999), 2),
+            "percentage_impact": round(self.calculate_percentage_impact(avg_latency=avg_latency), 2),
+            "sla_status": self.get_sla_status(avg_latency),
             "sla_threshold_ms": self.sla_threshold_ms,
-            "total_requests": self.total_requests,
-            "sla_breaches": self.sla_breaches,
-            "breach_rate": round((self.sla_breaches / max(self.total_requests, 1)) * 100, 2),
-            "window_size": self.window_size,
-            "current_window_count": len(self._latencies_ms)
+            "total_requests": total_requests,
+            "sla_breaches": sla_breaches,
+            "breach_rate": round((sla_breaches / max(total_requests, 1)) * 100, 2),
+            "window": self.primary_window,
+            "current_window_count": primary.count,
+            "windows": {name: self.summarize(hist) for name, hist in windows.items()}
         }
     
     def reset(self) -> None:
         """Reset all metrics (useful for testing)."""
-        self._latencies_ms.clear()
-        self.total_requests = 0
-        self.sla_breaches = 0
+        # Threads pick up fresh shards on their next record
+        with self._registry_lock:
+            self._shards = []
+            self._local = threading.local()
 
 
-# Global tracker instance (singleton pattern)
-_latency_tracker: Optional[LatencyTracker] = None
+class LatencyTrackerRegistry:
+    """
+    Trackers labeled by (layer, tool), created on first use.
+    Lookups of existing trackers do not take a lock.
+    """
+    
+    def __init__(self, sla_threshold_ms: float = 50.0, windows: Dict[str, float] = DEFAULT_WINDOWS):
+        self.sla_threshold_ms = sla_threshold_ms
+        self.windows = windows
+        self._trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, layer: str, tool: str) -> LatencyTracker:
+        key = (layer, tool)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            with self._lock:
+                tracker = self._trackers.get(key)
+                if tracker is None:
+                    tracker = LatencyTracker(
+                        sla_threshold_ms=self.sla_threshold_ms,
+                        windows=self.windows
+                    )
+                    self._trackers[key] = tracker
+        return tracker
+    
+    def items(self) -> List[Tuple[Tuple[str, str], LatencyTracker]]:
+        """All (label, tracker) pairs, sorted by label."""
+        with self._lock:
+            return sorted(self._trackers.items())
+    
+    def reset(self) -> None:
+        for _, tracker in self.items():
+            tracker.reset()
+
+
+# Overall security-layer latency (all layers of a request combined)
+PIPELINE_LAYER = "pipeline"
+ALL_TOOLS = "all"
+
+# Global registry instance (singleton pattern)
+_registry = LatencyTrackerRegistry(
+    sla_threshold_ms=50.0,  # 50ms SLA
+    windows=DEFAULT_WINDOWS  # 1 min / 5 min / 1 h sliding windows
+)
 
 
-def get_latency_tracker() -> LatencyTracker:
+def get_tracker_registry() -> LatencyTrackerRegistry:
+    """Get the global registry of labeled latency trackers."""
+    return _registry
+
+
+def get_latency_tracker(layer: str = PIPELINE_LAYER, tool: str = ALL_TOOLS) -> LatencyTracker:
     """
-    Get or create the global latency tracker instance.
+    Get the latency tracker for a layer and tool.
+    
+    Args:
+        layer: Security layer (e.g. "injection", "pii"); defaults to the whole pipeline
+        tool: Tool or endpoint the layer ran for
     
     Returns:
         LatencyTracker instance
     """
-    global _latency_tracker
-    if _latency_tracker is None:
-        _latency_tracker = LatencyTracker(
-            window_size=100,  # Last 100 requests
-            sla_threshold_ms=50.0  # 50ms SLA
-        )
-    return _latency_tracker
+    return _registry.get(layer, tool)
 
 
-# Example security check functions (replace with your actual scanners)
-def scan_prompt_for_injection(prompt: str) -> dict:
-    """
-    Simulated prompt injection scanner.
-    In production, replace with actual ML model or rule-based scanner.
-    """
-    # Simulate processing time (5-30ms)
-    time.sleep(0.005 + (hash(prompt) % 25) / 1000.0)
-    
-    # Simple keyword detection (replace with actual logic)
-    dangerous_keywords = ['ignore', 'disregard', 'system', 'admin', 'override']
-    detected = any(keyword in prompt.lower() for keyword in dangerous_keywords)
-    
-    return {
-        "passed": not detected,
-        "threat_detected": detected,
-        "threat_type": "prompt_injection" if detected else None
-    }
+# Scans run through the production gateway pipeline (src/server.py)
+SCAN_TOOL = "metrics_scan"
 
-
-def scan_prompt_for_pii(prompt: str) -> dict:
-    """
-    Simulated PII scanner.
-    """
-    # Simulate processing time (3-15ms)
-    time.sleep(0.003 + (hash(prompt) % 12) / 1000.0)
-    
-    # Simple regex patterns (replace with actual PII detection)
-    import re
-    patterns = {
-        'ssn': r'\d{3}-\d{2}-\d{4}',
-        'email': r'[\w\.-]+@[\w\.-]+',
-        'phone': r'\d{3}-\d{3}-\d{4}'
-    }
-    
-    detected_pii = []
-    for pii_type, pattern in patterns.items():
-        if re.search(pattern, prompt):
-            detected_pii.append(pii_type)
-    
-    return {
-        "passed": len(detected_pii) == 0,
-        "pii_detected": detected_pii
-    }
+_gateway = None
+_gateway_lock = threading.Lock()
 
 
-def scan_prompt_for_policy_violations(prompt: str) -> dict:
-    """
-    Simulated policy violation scanner.
+def get_gateway():
     """
-    # Simulate processing time (2-10ms)
-    time.sleep(0.002 + (hash(prompt) % 8) / 1000.0)
+    Import the production scanner stack on first use.
     
-    return {
-        "passed": True,
-        "violations": []
-    }
+    Loading src.server builds the llm-guard models, so it happens lazily and
+    only once. Raises ImportError if the scanner dependencies are missing.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                stdout = sys.stdout
+                from src import server
+                # src.server points stdout at stderr to keep the MCP stream clean
+                sys.stdout = stdout
+                _gateway = server
+    return _gateway
 
 
 def run_all_security_checks(prompt: str) -> tuple[dict, float]:
     """
-    Run all security scanners and measure total latency.
+    Run the gateway's input pipeline and record its latency.
+    
+    Detection layers run concurrently inside the pipeline; each layer's
+    timing is recorded under its own tracker, the end-to-end overhead
+    under the pipeline tracker.
     
     Args:
         prompt: The user prompt to scan
@@ -259,34 +414,40 @@ def run_all_security_checks(prompt: str) -> tuple[dict, float]:
     Returns:
         Tuple of (combined_results, total_latency_ms)
     """
-    tracker = get_latency_tracker()
-    
-    # Start timing
-    start_time = time.perf_counter()
-    
-    # Run all scanners
-    injection_result = scan_prompt_for_injection(prompt)
-    pii_result = scan_prompt_for_pii(prompt)
-    policy_result = scan_prompt_for_policy_violations(prompt)
-    
-    # End timing
-    end_time = time.perf_counter()
-    latency_ms = (end_time - start_time) * 1000.0
+    verdict = get_gateway().run_input_scan(prompt)
+    timings = verdict["latency_ms"]
+    latency_ms = timings["total"]
     
     # Record latency
-    tracker.record_latency(latency_ms)
+    get_latency_tracker().record_latency(latency_ms)
+    for layer, layer_ms in timings.items():
+        if layer != "total":
+            get_latency_tracker(layer, SCAN_TOOL).record_latency(layer_ms)
+    
+    blocked = verdict["action"] == "BLOCKED"
+    is_safe_topic, topic_score = verdict["layers"]["topic"]
     
     # Combine results
     combined_results = {
-        "prompt_injection": injection_result,
-        "pii_leakage": pii_result,
-        "policy_violations": policy_result,
-        "all_passed": all([
-            injection_result["passed"],
-            pii_result["passed"],
-            policy_result["passed"]
-        ]),
-        "latency_ms": round(latency_ms, 2)
+        "prompt_injection": {
+            "passed": not blocked,
+            "threat_detected": blocked,
+            "threat_type": "prompt_injection" if blocked else None,
+            "risk_score": verdict["risk_score"],
+            "reasons": verdict["reasons"]
+        },
+        "pii_leakage": {
+            "passed": not verdict["pii_types"],
+            "pii_detected": verdict["pii_types"],
+            "scanned": "pii" in timings
+        },
+        "policy_violations": {
+            "passed": is_safe_topic,
+            "violations": [] if is_safe_topic else [f"Semantic Policy Violation ({topic_score})"]
+        },
+        "all_passed": verdict["action"] == "ALLOWED",
+        "latency_ms": round(latency_ms, 2),
+        "layer_latency_ms": {layer: ms for layer, ms in timings.items() if layer != "total"}
     }
     
     return combined_results, latency_ms
@@ -2,15 +2,41 @@
 GenAI Sentinel - Simple Login System + Metrics
 FastAPI backend with SQLite, bcrypt, and latency tracking
 """
+import os
 import sqlite3
+import sys
 import bcrypt
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from pathlib import Path
 
+# Make the repository root importable (shared gateway utilities live in src/)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.utils.http_encoding import CompressionMiddleware, FastJSONResponse
+from src.utils.rate_limit import RateLimiter, RateLimitMiddleware, client_ip, create_store, trusted_networks
+
+from password_hashing import HashingPoolFull, get_hashing_pool
+
 # Initialize FastAPI
-app = FastAPI(title="GenAI Sentinel")
+app = FastAPI(title="GenAI Sentinel", default_response_class=FastJSONResponse)
+
+# Per-client (IP) budget for the endpoints that run bcrypt or the scanner models;
+# added before CORS so its 429s still carry the CORS headers. X-Forwarded-For
+# is only believed from TRUSTED_PROXIES (comma-separated IPs/CIDRs).
+TRUSTED_PROXIES = trusted_networks(os.environ.get("TRUSTED_PROXIES", ""))
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=RateLimiter(
+        float(os.environ.get("RATE_LIMIT_PER_MINUTE", 60)),
+        store=create_store(os.environ.get("RATE_LIMIT_STORE", ""))
+    ),
+    key_func=lambda scope: client_ip(scope, TRUSTED_PROXIES),
+    paths=("/login", "/metrics/scan"),
+)
 
 # CORS Configuration (allow frontend access)
 app.add_middleware(
@@ -21,6 +47,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for larger JSON responses (e.g. event search results)
+app.add_middleware(CompressionMiddleware)
+
 # Database path
 DB_PATH = Path(__file__).parent / "users.db"
 
@@ -121,9 +150,13 @@ async def startup_event():
     from latency_tracker import get_latency_tracker
     tracker = get_latency_tracker()
     
+    # Copy gateway events into security_events for search
+    from event_ingest import get_event_ingestor
+    get_event_ingestor().start()
+    
     print("🚀 GenAI Sentinel System Started")
     print(f"📁 Database: {DB_PATH}")
-    print(f"📊 Latency Tracker: Initialized (window={tracker.window_size})")
+    print(f"📊 Latency Tracker: Initialized (window={tracker.primary_window})")
 
 
 @app.get("/")
@@ -135,7 +168,8 @@ async def root():
         "endpoints": {
             "login": "/login",
             "metrics": "/metrics/latency",
-            "scan": "/metrics/scan"
+            "scan": "/metrics/scan",
+            "login_metrics": "/metrics/login"
         }
     }
 
@@ -159,8 +193,19 @@ async def login(credentials: LoginRequest):
             message="Invalid username or password"
         )
     
-    # Verify password
-    if not verify_password(credentials.password, user["password_hash"]):
+    # Verify password on the bounded bcrypt pool (keeps the event loop free)
+    try:
+        password_ok = await get_hashing_pool().run(
+            "verify", verify_password, credentials.password, user["password_hash"]
+        )
+    except HashingPoolFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    
+    if not password_ok:
         return LoginResponse(
             success=False,
             message="Invalid username or password"
@@ -182,6 +227,11 @@ from security_metrics_routes import router as security_router
 app.include_router(security_router)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    get_hashing_pool().shutdown()
+
+
 # Run with: uvicorn main:app --reload --port 8000
 if __name__ == "__main__":
     import uvicorn
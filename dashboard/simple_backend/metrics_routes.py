@@ -4,24 +4,48 @@ Exposes latency and performance metrics
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any
-from latency_tracker import get_latency_tracker, run_all_security_checks
+from typing import Dict, Any, List
+from latency_tracker import (
+    PIPELINE_LAYER,
+    get_latency_tracker,
+    get_tracker_registry,
+    run_all_security_checks,
+)
+from password_hashing import get_hashing_pool
 
 # Create router for metrics endpoints
 router = APIRouter(prefix="/metrics", tags=["metrics"])
 
 
+class LayerLatency(BaseModel):
+    """Latency of a single security layer for one tool"""
+    layer: str
+    tool: str
+    count: int
+    avg_latency_ms: float
+    p50_latency_ms: float
+    p95_latency_ms: float
+    p99_latency_ms: float
+    total_requests: int
+    sla_breaches: int
+
+
 class LatencyMetrics(BaseModel):
     """Latency metrics response model"""
     avg_latency_ms: float
     median_latency_ms: float
     p95_latency_ms: float
+    p99_latency_ms: float
+    p999_latency_ms: float
     percentage_impact: float
     sla_status: str
     sla_threshold_ms: float
     total_requests: int
     sla_breaches: int
     breach_rate: float
+    window: str
+    windows: Dict[str, Dict[str, float]]
+    layers: List[LayerLatency]
 
 
 class SecurityCheckRequest(BaseModel):
@@ -36,6 +60,7 @@ class SecurityCheckResponse(BaseModel):
     prompt_injection: Dict[str, Any]
     pii_leakage: Dict[str, Any]
     policy_violations: Dict[str, Any]
+    layer_latency_ms: Dict[str, float]
 
 
 @router.get("/latency", response_model=LatencyMetrics)
@@ -44,12 +69,14 @@ async def get_latency_metrics():
     Get current latency metrics for the security layer.
     
     Returns comprehensive latency statistics including:
-    - Average latency (rolling window)
+    - Average latency (sliding 5-minute window)
     - Median latency
-    - 95th percentile latency
+    - 95th / 99th / 99.9th percentile latency
     - Percentage impact on total request time
     - SLA status
     - Breach statistics
+    - Per-window breakdown (1 min, 5 min, 1 h)
+    - Per-layer breakdown (each scanner, labeled by tool)
     
     Example response:
     ```json
@@ -57,42 +84,78 @@ async def get_latency_metrics():
       "avg_latency_ms": 24.5,
       "median_latency_ms": 23.1,
       "p95_latency_ms": 35.2,
+      "p99_latency_ms": 48.9,
+      "p999_latency_ms": 61.3,
       "percentage_impact": 1.02,
       "sla_status": "within_sla",
       "sla_threshold_ms": 50.0,
       "total_requests": 1247,
       "sla_breaches": 12,
-      "breach_rate": 0.96
+      "breach_rate": 0.96,
+      "window": "5m",
+      "windows": {
+        "1m": {"count": 58, "avg_ms": 23.9, "p50_ms": 22.8, "p90_ms": 31.0, "p95_ms": 34.1, "p99_ms": 44.7, "p999_ms": 44.7},
+        ...
+      },
+      "layers": [
+        {"layer": "injection", "tool": "metrics_scan", "count": 310, "avg_latency_ms": 12.1, ...},
+        ...
+      ]
     }
     ```
     """
     tracker = get_latency_tracker()
     metrics = tracker.get_metrics()
     
+    layers = []
+    for (layer, tool), layer_tracker in get_tracker_registry().items():
+        if layer == PIPELINE_LAYER:
+            continue
+        hist = layer_tracker.get_histogram()
+        summary = layer_tracker.summarize(hist)
+        layers.append(LayerLatency(
+            layer=layer,
+            tool=tool,
+            count=hist.count,
+            avg_latency_ms=summary["avg_ms"],
+            p50_latency_ms=summary["p50_ms"],
+            p95_latency_ms=summary["p95_ms"],
+            p99_latency_ms=summary["p99_ms"],
+            total_requests=layer_tracker.total_requests,
+            sla_breaches=layer_tracker.sla_breaches
+        ))
+    
     return LatencyMetrics(
         avg_latency_ms=metrics["avg_latency_ms"],
         median_latency_ms=metrics["median_latency_ms"],
         p95_latency_ms=metrics["p95_latency_ms"],
+        p99_latency_ms=metrics["p99_latency_ms"],
+        p999_latency_ms=metrics["p999_latency_ms"],
         percentage_impact=metrics["percentage_impact"],
         sla_status=metrics["sla_status"],
         sla_threshold_ms=metrics["sla_threshold_ms"],
         total_requests=metrics["total_requests"],
         sla_breaches=metrics["sla_breaches"],
-        breach_rate=metrics["breach_rate"]
+        breach_rate=metrics["breach_rate"],
+        window=metrics["window"],
+        windows=metrics["windows"],
+        layers=layers
     )
 
 
 @router.post("/scan", response_model=SecurityCheckResponse)
-async def scan_prompt(request: SecurityCheckRequest):
+def scan_prompt(request: SecurityCheckRequest):
     """
-    Scan a prompt through all security checks and measure latency.
+    Scan a prompt through the gateway's security pipeline and measure latency.
     
-    This endpoint demonstrates the security layer in action:
-    1. Measures start time
-    2. Runs all security scanners
-    3. Measures end time
-    4. Records latency
-    5. Returns results
+    Runs the same scanner stack as the MCP gateway (src/server.py):
+    1. Heuristic, topic and injection layers run concurrently
+    2. PII redaction runs if the prompt is not blocked
+    3. Per-layer and total latency are recorded
+    4. Returns results
+    
+    Declared sync so FastAPI runs the (blocking) model inference in its
+    worker threadpool instead of on the event loop.
     
     Args:
         request: SecurityCheckRequest with prompt text
@@ -112,9 +175,10 @@ async def scan_prompt(request: SecurityCheckRequest):
     {
       "all_passed": true,
       "latency_ms": 18.5,
-      "prompt_injection": {"passed": true, "threat_detected": false},
-      "pii_leakage": {"passed": true, "pii_detected": []},
-      "policy_violations": {"passed": true, "violations": []}
+      "prompt_injection": {"passed": true, "threat_detected": false, "risk_score": 3, ...},
+      "pii_leakage": {"passed": true, "pii_detected": [], "scanned": true},
+      "policy_violations": {"passed": true, "violations": []},
+      "layer_latency_ms": {"heuristic": 0.4, "topic": 14.2, "injection": 12.9, "pii": 3.1}
     }
     ```
     """
@@ -122,17 +186,30 @@ async def scan_prompt(request: SecurityCheckRequest):
         raise HTTPException(status_code=400, detail="Prompt cannot be empty")
     
     # Run security checks and measure latency
-    results, latency_ms = run_all_security_checks(request.prompt)
+    try:
+        results, latency_ms = run_all_security_checks(request.prompt)
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Scanner stack unavailable: {e}")
     
     return SecurityCheckResponse(
         all_passed=results["all_passed"],
         latency_ms=results["latency_ms"],
         prompt_injection=results["prompt_injection"],
         pii_leakage=results["pii_leakage"],
-        policy_violations=results["policy_violations"]
+        policy_violations=results["policy_violations"],
+        layer_latency_ms=results["layer_latency_ms"]
     )
 
 
+@router.get("/login")
+async def get_login_metrics():
+    """
+    Password verification pool: occupancy, rejected logins and verification
+    latency (queue wait + bcrypt) since start or the last reset.
+    """
+    return get_hashing_pool().stats()
+
+
 @router.get("/health")
 async def metrics_health():
     """
@@ -147,8 +224,8 @@ async def metrics_health():
         "status": "healthy",
         "tracker_initialized": tracker is not None,
         "total_requests_tracked": tracker.total_requests,
-        "window_size": tracker.window_size,
-        "current_data_points": len(tracker._latencies_ms)
+        "window": tracker.primary_window,
+        "current_data_points": tracker.get_histogram().count
     }
 
 
@@ -160,8 +237,8 @@ async def reset_metrics():
     ⚠️ WARNING: This clears all latency data!
     In production, this should be protected by authentication.
     """
-    tracker = get_latency_tracker()
-    tracker.reset()
+    get_tracker_registry().reset()
+    get_hashing_pool().reset_metrics()
     
     return {
         "status": "success",
@@ -0,0 +1,25 @@
+"""
+Password Hashing Pool
+The login endpoint's bcrypt checks run on the shared bounded pool
+(src/utils/hashing_pool.py), sized from the environment:
+
+    LOGIN_HASH_WORKERS      concurrent bcrypt checks
+    LOGIN_HASH_MAX_WAITING  checks allowed to wait for a worker
+"""
+import os
+from typing import Optional
+
+from src.utils.hashing_pool import HashingPool, HashingPoolFull
+
+HASH_WORKERS = int(os.environ.get("LOGIN_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_MAX_WAITING = int(os.environ.get("LOGIN_HASH_MAX_WAITING", 32))
+
+_pool: Optional[HashingPool] = None
+
+
+def get_hashing_pool() -> HashingPool:
+    """Get the global password hashing pool."""
+    global _pool
+    if _pool is None:
+        _pool = HashingPool(HASH_WORKERS, HASH_MAX_WAITING)
+    return _pool
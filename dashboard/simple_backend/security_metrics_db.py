@@ -1,15 +1,45 @@
 """
 Security Metrics Database
 Tracks total requests, threats blocked, and threat vectors
+
+Uses persistent per-thread connections in WAL mode (see sqlite_pool.py)
+instead of opening a connection per call. Increments are write-behind:
+they land in an in-memory buffer that a background thread flushes as a
+single transaction, and reads merge persisted and pending values.
 """
-import sqlite3
+import atexit
+import os
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 import json
 
-# Database path
-DB_PATH = Path(__file__).parent / "security_metrics.db"
+from sqlite_pool import ConnectionManager
+
+# Database path (override with SECURITY_METRICS_DB, e.g. for benchmarks)
+DB_PATH = Path(os.environ.get(
+    "SECURITY_METRICS_DB",
+    Path(__file__).parent / "security_metrics.db"
+))
+
+# Seconds between write-behind flushes
+FLUSH_INTERVAL_S = float(os.environ.get("SECURITY_METRICS_FLUSH_INTERVAL", "1.0"))
+
+# security_events columns added after the original schema (name -> DDL)
+SECURITY_EVENT_COLUMNS = {
+    "event_id": "INTEGER",
+    "action": "VARCHAR(20)",
+    "risk_score": "INTEGER",
+    "reason": "TEXT",
+}
+
+_db = ConnectionManager(DB_PATH)
+
+
+def get_connection_manager() -> ConnectionManager:
+    """Get the connection manager for the security metrics database."""
+    return _db
 
 
 def init_security_metrics_db():
@@ -17,9 +47,14 @@ def init_security_metrics_db():
     Initialize security metrics database with required tables.
     Creates empty tables ready to receive data.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    with _db.transaction() as cursor:
+        _create_schema(cursor)
     
+    print(f"✅ Security metrics database initialized: {DB_PATH}")
+
+
+def _create_schema(cursor):
+    """Create tables, seed row and indexes (idempotent)."""
     # Table for overall request metrics
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS request_metrics (
@@ -57,6 +92,46 @@ def init_security_metrics_db():
         )
     ''')
     
+    # Columns added for gateway event ingestion (see event_ingest.py)
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(security_events)")}
+    for column, ddl in SECURITY_EVENT_COLUMNS.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE security_events ADD COLUMN {column} {ddl}")
+    
+    # Full-text index over prompts and block reasons, kept in sync by triggers
+    fts_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'security_events_fts'"
+    ).fetchone()
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS security_events_fts USING fts5(
+            prompt_preview, reason,
+            content='security_events', content_rowid='id'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS security_events_fts_insert AFTER INSERT ON security_events BEGIN
+            INSERT INTO security_events_fts(rowid, prompt_preview, reason)
+            VALUES (new.id, new.prompt_preview, new.reason);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS security_events_fts_delete AFTER DELETE ON security_events BEGIN
+            INSERT INTO security_events_fts(security_events_fts, rowid, prompt_preview, reason)
+            VALUES ('delete', old.id, old.prompt_preview, old.reason);
+        END
+    ''')
+    if not fts_exists:
+        cursor.execute("INSERT INTO security_events_fts(security_events_fts) VALUES ('rebuild')")
+    
+    # Ingestion cursors (last event id copied from each source)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_state (
+            source VARCHAR(50) PRIMARY KEY,
+            last_event_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL
+        )
+    ''')
+    
     # Initialize request_metrics with zero values if empty
     cursor.execute("SELECT COUNT(*) FROM request_metrics")
     if cursor.fetchone()[0] == 0:
@@ -68,31 +143,205 @@ def init_security_metrics_db():
     # Create indexes for performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_threat_vectors_count ON threat_vectors(count DESC)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_security_events_detected_at ON security_events(detected_at DESC)')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_security_events_event_id ON security_events(event_id)')
+
+
+class MetricsWriteBuffer:
+    """
+    In-memory counter deltas awaiting a flush.
     
-    conn.commit()
-    conn.close()
+    Recording only takes the buffer lock. ``flush_lock`` is held from the
+    moment a flush takes the pending deltas until its transaction commits,
+    and readers hold it while combining the database with the buffer, so
+    every increment is counted exactly once.
+    """
     
-    print(f"✅ Security metrics database initialized: {DB_PATH}")
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self._clear()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def _clear(self):
+        self.total_requests = 0
+        self.threats_blocked = 0
+        # threat_type -> [count, severity, last_detected]
+        self.vectors: Dict[str, list] = {}
+        self.last_updated: Optional[datetime] = None
+    
+    def add(self, requests: int = 0, blocked: int = 0,
+            threat_type: Optional[str] = None, severity: str = "medium"):
+        now = datetime.now()
+        with self.lock:
+            self.total_requests += requests
+            self.threats_blocked += blocked
+            if threat_type is not None:
+                entry = self.vectors.get(threat_type)
+                if entry is None:
+                    self.vectors[threat_type] = [1, severity, now]
+                else:
+                    entry[0] += 1
+                    entry[1] = severity
+                    entry[2] = now
+            self.last_updated = now
+        if self._flusher is None:
+            self._start()
+    
+    def take(self) -> Optional[dict]:
+        """Swap out the pending deltas (None when there are none)."""
+        with self.lock:
+            if self.last_updated is None:
+                return None
+            pending = {
+                "total_requests": self.total_requests,
+                "threats_blocked": self.threats_blocked,
+                "vectors": self.vectors,
+                "last_updated": self.last_updated
+            }
+            self._clear()
+            return pending
+    
+    def restore(self, pending: dict):
+        """Put deltas back after a failed flush."""
+        with self.lock:
+            self.total_requests += pending["total_requests"]
+            self.threats_blocked += pending["threats_blocked"]
+            for threat_type, (count, severity, detected) in pending["vectors"].items():
+                entry = self.vectors.get(threat_type)
+                if entry is None:
+                    self.vectors[threat_type] = [count, severity, detected]
+                else:
+                    entry[0] += count
+            if self.last_updated is None:
+                self.last_updated = pending["last_updated"]
+    
+    def peek(self) -> dict:
+        """Copy of the pending deltas."""
+        with self.lock:
+            return {
+                "total_requests": self.total_requests,
+                "threats_blocked": self.threats_blocked,
+                "vectors": {t: list(entry) for t, entry in self.vectors.items()},
+                "last_updated": self.last_updated
+            }
+    
+    def discard(self):
+        with self.lock:
+            self._clear()
+    
+    def _start(self):
+        with self.lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._run, name="security-metrics-flush", daemon=True
+            )
+        self._flusher.start()
+    
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL_S):
+            try:
+                flush_pending_metrics()
+            except Exception as e:
+                print(f"⚠️ Security metrics flush failed: {e}")
+
+
+_buffer = MetricsWriteBuffer()
+
+
+def flush_pending_metrics() -> int:
+    """
+    Write buffered increments to the database in one transaction.
+    
+    Returns:
+        Number of threat vectors written
+    """
+    with _buffer.flush_lock:
+        pending = _buffer.take()
+        if pending is None:
+            return 0
+        try:
+            with _db.transaction() as cursor:
+                cursor.executemany('''
+                    INSERT INTO threat_vectors (threat_type, count, severity, last_detected)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(threat_type) DO UPDATE SET
+                        count = count + excluded.count,
+                        last_detected = excluded.last_detected,
+                        severity = excluded.severity
+                ''', [
+                    (threat_type, count, severity, detected)
+                    for threat_type, (count, severity, detected) in pending["vectors"].items()
+                ])
+                cursor.execute('''
+                    UPDATE request_metrics
+                    SET total_requests = total_requests + ?,
+                        threats_blocked = threats_blocked + ?,
+                        last_updated = ?
+                    WHERE id = (SELECT id FROM request_metrics ORDER BY id DESC LIMIT 1)
+                ''', (pending["total_requests"], pending["threats_blocked"], pending["last_updated"]))
+        except Exception:
+            _buffer.restore(pending)
+            raise
+        return len(pending["vectors"])
+
+
+def _read_totals() -> tuple:
+    """(total_requests, threats_blocked, threats_flagged, last_updated) including pending."""
+    with _buffer.flush_lock:
+        row = _db.execute(
+            "SELECT total_requests, threats_blocked, threats_flagged, last_updated "
+            "FROM request_metrics ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        pending = _buffer.peek()
+    total_requests, threats_blocked, threats_flagged, last_updated = row or (0, 0, 0, None)
+    if pending["last_updated"] is not None:
+        last_updated = str(pending["last_updated"])
+    return (
+        total_requests + pending["total_requests"],
+        threats_blocked + pending["threats_blocked"],
+        threats_flagged,
+        last_updated
+    )
+
+
+def _read_threat_vectors(limit: Optional[int] = None) -> List[Dict[str, any]]:
+    """Threat vectors including pending increments, sorted by count."""
+    with _buffer.flush_lock:
+        rows = _db.execute('''
+            SELECT threat_type, count, severity, last_detected
+            FROM threat_vectors
+        ''').fetchall()
+        pending = _buffer.peek()
+    
+    vectors = {
+        row[0]: {
+            "threat_type": row[0],
+            "count": row[1],
+            "severity": row[2],
+            "last_detected": row[3]
+        }
+        for row in rows
+    }
+    for threat_type, (count, severity, detected) in pending["vectors"].items():
+        vector = vectors.setdefault(threat_type, {"threat_type": threat_type, "count": 0})
+        vector["count"] += count
+        vector["severity"] = severity
+        vector["last_detected"] = str(detected)
+    
+    ranked = sorted(vectors.values(), key=lambda v: v["count"], reverse=True)
+    return ranked[:limit] if limit is not None else ranked
 
 
 def get_total_requests() -> int:
     """Get total number of requests processed"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT total_requests FROM request_metrics ORDER BY id DESC LIMIT 1")
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else 0
+    return _read_totals()[0]
 
 
 def get_threats_blocked() -> int:
     """Get total number of threats blocked"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT threats_blocked FROM request_metrics ORDER BY id DESC LIMIT 1")
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else 0
+    return _read_totals()[1]
 
 
 def get_top_threat_vector() -> Dict[str, any]:
@@ -102,24 +351,9 @@ def get_top_threat_vector() -> Dict[str, any]:
     Returns:
         Dictionary with threat_type and count, or None if no data
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT threat_type, count, severity, last_detected
-        FROM threat_vectors
-        ORDER BY count DESC
-        LIMIT 1
-    ''')
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return {
-            "threat_type": result[0],
-            "count": result[1],
-            "severity": result[2],
-            "last_detected": result[3]
-        }
+    top = _read_threat_vectors(limit=1)
+    if top:
+        return top[0]
     return {
         "threat_type": "None",
         "count": 0,
@@ -130,84 +364,33 @@ def get_top_threat_vector() -> Dict[str, any]:
 
 def get_all_threat_vectors() -> List[Dict[str, any]]:
     """Get all threat vectors sorted by count"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT threat_type, count, severity, last_detected
-        FROM threat_vectors
-        ORDER BY count DESC
-    ''')
-    results = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            "threat_type": row[0],
-            "count": row[1],
-            "severity": row[2],
-            "last_detected": row[3]
-        }
-        for row in results
-    ]
+    return _read_threat_vectors()
 
 
 def increment_total_requests():
-    """Increment the total request counter"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE request_metrics
-        SET total_requests = total_requests + 1,
-            last_updated = ?
-        WHERE id = (SELECT id FROM request_metrics ORDER BY id DESC LIMIT 1)
-    ''', (datetime.now(),))
-    conn.commit()
-    conn.close()
+    """Increment the total request counter (buffered)"""
+    _buffer.add(requests=1)
 
 
 def increment_threats_blocked():
-    """Increment the threats blocked counter"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE request_metrics
-        SET threats_blocked = threats_blocked + 1,
-            last_updated = ?
-        WHERE id = (SELECT id FROM request_metrics ORDER BY id DESC LIMIT 1)
-    ''', (datetime.now(),))
-    conn.commit()
-    conn.close()
+    """Increment the threats blocked counter (buffered)"""
+    _buffer.add(blocked=1)
 
 
 def record_threat_detection(threat_type: str, severity: str = "medium", blocked: bool = True):
     """
     Record a threat detection event.
     
+    Only updates the in-memory buffer; the background flusher persists it
+    within FLUSH_INTERVAL_S.
+    
     Args:
         threat_type: Type of threat detected (e.g., "DAN Attacks", "Jailbreak")
         severity: Severity level (low, medium, high, critical)
         blocked: Whether the threat was blocked
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Update or insert threat vector count
-    cursor.execute('''
-        INSERT INTO threat_vectors (threat_type, count, severity, last_detected)
-        VALUES (?, 1, ?, ?)
-        ON CONFLICT(threat_type) DO UPDATE SET
-            count = count + 1,
-            last_detected = ?,
-            severity = ?
-    ''', (threat_type, severity, datetime.now(), datetime.now(), severity))
-    
-    conn.commit()
-    conn.close()
-    
-    # Increment counters
-    increment_total_requests()
-    if blocked:
-        increment_threats_blocked()
+    _buffer.add(requests=1, blocked=1 if blocked else 0,
+                threat_type=threat_type, severity=severity)
 
 
 def get_security_metrics_summary() -> Dict[str, any]:
@@ -217,61 +400,18 @@ def get_security_metrics_summary() -> Dict[str, any]:
     Returns:
         Dictionary with all metrics
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Get request metrics
-    cursor.execute("SELECT total_requests, threats_blocked, threats_flagged, last_updated FROM request_metrics ORDER BY id DESC LIMIT 1")
-    metrics_row = cursor.fetchone()
-    
-    if metrics_row:
-        total_requests = metrics_row[0]
-        threats_blocked = metrics_row[1]
-        threats_flagged = metrics_row[2]
-        last_updated = metrics_row[3]
-    else:
-        total_requests = 0
-        threats_blocked = 0
-        threats_flagged = 0
-        last_updated = None
-    
-    # Get top threat vector
-    cursor.execute('''
-        SELECT threat_type, count, severity
-        FROM threat_vectors
-        ORDER BY count DESC
-        LIMIT 1
-    ''')
-    top_threat_row = cursor.fetchone()
+    total_requests, threats_blocked, threats_flagged, last_updated = _read_totals()
+    threat_vectors = _read_threat_vectors(limit=10)
     
-    if top_threat_row:
-        top_threat_vector = top_threat_row[0]
-        top_threat_count = top_threat_row[1]
-        top_threat_severity = top_threat_row[2]
+    if threat_vectors:
+        top_threat_vector = threat_vectors[0]["threat_type"]
+        top_threat_count = threat_vectors[0]["count"]
+        top_threat_severity = threat_vectors[0]["severity"]
     else:
         top_threat_vector = "None detected"
         top_threat_count = 0
         top_threat_severity = "low"
     
-    # Get all threat vectors
-    cursor.execute('''
-        SELECT threat_type, count, severity, last_detected
-        FROM threat_vectors
-        ORDER BY count DESC
-        LIMIT 10
-    ''')
-    threat_vectors = [
-        {
-            "threat_type": row[0],
-            "count": row[1],
-            "severity": row[2],
-            "last_detected": row[3]
-        }
-        for row in cursor.fetchall()
-    ]
-    
-    conn.close()
-    
     # Calculate block rate
     block_rate = (threats_blocked / max(total_requests, 1)) * 100 if total_requests > 0 else 0
     
@@ -290,27 +430,85 @@ def get_security_metrics_summary() -> Dict[str, any]:
     }
 
 
-def reset_metrics():
-    """Reset all metrics to zero (for testing)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every term must match (as a phrase token)."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def search_security_events(
+    query: str,
+    since: Optional[datetime] = None,
+    limit: int = 50
+) -> List[Dict[str, any]]:
+    """
+    Full-text search over ingested prompts and block reasons.
     
-    cursor.execute('''
-        UPDATE request_metrics
-        SET total_requests = 0,
-            threats_blocked = 0,
-            threats_flagged = 0,
-            last_updated = ?
-    ''', (datetime.now(),))
+    Args:
+        query: Free text; every whitespace-separated term must match
+        since: Only events detected at or after this time
+        limit: Maximum number of results (newest first)
     
-    cursor.execute('DELETE FROM threat_vectors')
-    cursor.execute('DELETE FROM security_events')
+    Returns:
+        List of matching events with a highlighted snippet
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
     
-    conn.commit()
-    conn.close()
+    sql = '''
+        SELECT e.event_id, e.event_type, e.action, e.threat_type, e.severity,
+               e.risk_score, e.prompt_preview, e.reason, e.detected_at,
+               snippet(security_events_fts, 0, '[', ']', '…', 12)
+        FROM security_events_fts
+        JOIN security_events e ON e.id = security_events_fts.rowid
+        WHERE security_events_fts MATCH ?
+    '''
+    params: list = [match]
+    if since is not None:
+        sql += " AND e.detected_at >= ?"
+        params.append(since)
+    sql += " ORDER BY e.detected_at DESC LIMIT ?"
+    params.append(limit)
+    
+    return [
+        {
+            "event_id": row[0],
+            "event_type": row[1],
+            "action": row[2],
+            "threat_type": row[3],
+            "severity": row[4],
+            "risk_score": row[5],
+            "prompt_preview": row[6],
+            "reason": row[7],
+            "detected_at": row[8],
+            "snippet": row[9]
+        }
+        for row in _db.execute(sql, tuple(params)).fetchall()
+    ]
+
+
+def reset_metrics():
+    """Reset all metrics to zero (for testing)"""
+    with _buffer.flush_lock:
+        _buffer.discard()
+        with _db.transaction() as cursor:
+            cursor.execute('''
+                UPDATE request_metrics
+                SET total_requests = 0,
+                    threats_blocked = 0,
+                    threats_flagged = 0,
+                    last_updated = ?
+            ''', (datetime.now(),))
+            
+            cursor.execute('DELETE FROM threat_vectors')
+            cursor.execute('DELETE FROM security_events')
     
     print("✅ All security metrics reset to zero")
 
 
 # Initialize database on module import
 init_security_metrics_db()
+
+# Persist anything still buffered when the process exits
+atexit.register(flush_pending_metrics)
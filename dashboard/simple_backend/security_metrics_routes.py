@@ -1,26 +1,19 @@
 """
 Security Metrics API Endpoints
 """
-from fastapi import APIRouter
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from security_metrics_db import (
     get_security_metrics_summary,
-    record_threat_detection,
     reset_metrics,
-    increment_total_requests
+    search_security_events
 )
 
 router = APIRouter(prefix="/api/security", tags=["security"])
 
 
-class ThreatDetectionRequest(BaseModel):
-    """Request model for recording threat detection"""
-    threat_type: str
-    severity: str = "medium"
-    blocked: bool = True
-
-
 class SecurityMetricsResponse(BaseModel):
     """Response model for security metrics"""
     total_requests: int
@@ -77,56 +70,25 @@ async def get_security_metrics():
     )
 
 
-@router.post("/record-threat")
-async def record_threat(request: ThreatDetectionRequest):
-    """
-    Record a threat detection event.
-    
-    This endpoint is called when a threat is detected to:
-    - Increment total requests counter
-    - Increment threats blocked counter (if blocked=true)
-    - Update threat vector statistics
-    
-    Args:
-        threat_type: Type of threat (e.g., "DAN Attacks", "Jailbreak")
-        severity: Severity level (low, medium, high, critical)
-        blocked: Whether the threat was blocked
-    
-    Example request:
-    ```json
-    {
-      "threat_type": "DAN Attacks",
-      "severity": "critical",
-      "blocked": true
-    }
-    ```
-    """
-    record_threat_detection(
-        threat_type=request.threat_type,
-        severity=request.severity,
-        blocked=request.blocked
-    )
-    
-    return {
-        "status": "success",
-        "message": f"Threat recorded: {request.threat_type}",
-        "metrics": get_security_metrics_summary()
-    }
+# Counters and threat vectors are written by the gateway's event bus
+# (SQLiteMetricsSink); accepting client-reported events as well would count
+# real traffic twice
+METRICS_READ_ONLY_DETAIL = (
+    "Security metrics are recorded from gateway events; "
+    "send traffic through /metrics/scan instead"
+)
 
 
-@router.post("/record-request")
+@router.post("/record-threat", status_code=410)
+async def record_threat():
+    """Retired: threats are counted from the gateway's security events."""
+    raise HTTPException(status_code=410, detail=METRICS_READ_ONLY_DETAIL)
+
+
+@router.post("/record-request", status_code=410)
 async def record_clean_request():
-    """
-    Record a clean request (no threats detected).
-    
-    Increments the total requests counter without incrementing threats blocked.
-    """
-    increment_total_requests()
-    
-    return {
-        "status": "success",
-        "message": "Clean request recorded"
-    }
+    """Retired: requests are counted from the gateway's security events."""
+    raise HTTPException(status_code=410, detail=METRICS_READ_ONLY_DETAIL)
 
 
 @router.post("/reset")
@@ -146,6 +108,29 @@ async def reset_all_metrics():
     }
 
 
+@router.get("/events/search")
+def search_events(
+    q: str = Query(..., min_length=1, description="Words that must all appear in the prompt or reason"),
+    since_hours: Optional[float] = Query(None, gt=0, description="Look back this many hours (omit for all time)"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Full-text search over ingested gateway events (FTS5 index lookup).
+    
+    Example: /api/security/events/search?q=password+reset&since_hours=24
+    
+    Returns newest matches first, each with a highlighted snippet.
+    """
+    since = datetime.now() - timedelta(hours=since_hours) if since_hours is not None else None
+    results = search_security_events(q, since=since, limit=limit)
+    
+    return {
+        "query": q,
+        "count": len(results),
+        "results": results
+    }
+
+
 @router.get("/health")
 async def security_metrics_health():
     """Health check for security metrics system"""
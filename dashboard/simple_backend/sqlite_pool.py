@@ -0,0 +1,89 @@
+"""
+Persistent SQLite Connections
+One long-lived connection per thread, tuned for a read-heavy dashboard
+with a steady trickle of writes.
+
+- WAL journal: readers never block behind the writer (and vice versa)
+- synchronous=NORMAL: fsync at checkpoints instead of every commit (safe in WAL mode)
+- Statement cache: repeated SQL is prepared once per connection
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+# Wait this long for a competing writer before raising "database is locked"
+BUSY_TIMEOUT_MS = 5000
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionManager:
+    """
+    Thread-local pool of persistent connections to one SQLite database.
+
+    sqlite3 connections must not be shared across threads, so each thread
+    lazily opens its own and keeps it for its lifetime.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            # Only the owning thread uses it; close_all() may run elsewhere
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Cursor inside a transaction: commits on success, rolls back on error.
+        """
+        conn = self.connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run a read-only statement on the calling thread's connection."""
+        return self.connection().execute(sql, params)
+
+    def close_all(self) -> None:
+        """
+        Close every connection (e.g. at shutdown).
+        Threads that use the manager again afterwards reconnect.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
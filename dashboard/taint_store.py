@@ -0,0 +1,126 @@
+"""
+Session taint store for the demo MCP server.
+
+A prompt injection caught by scan_content taints the MCP session it came
+from, not the whole server. Taint decays: a session is clean again
+TAINT_TTL_SECONDS after its last detection. Lookups are O(1) and memory is
+bounded however many sessions come and go.
+
+Stores (TAINT_STORE):
+    ""                   in-process LRU of at most TAINT_MAX_SESSIONS sessions
+    sqlite:///path.db    a SQLite file shared by every worker that opens it
+                         (stand-in for a shared store such as Redis)
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Union
+
+TAINT_TTL_SECONDS = float(os.environ.get("TAINT_TTL_SECONDS", 3600))
+TAINT_MAX_SESSIONS = int(os.environ.get("TAINT_MAX_SESSIONS", 100_000))
+TAINT_STORE = os.environ.get("TAINT_STORE", "")
+
+SQLITE_PRUNE_EVERY = 1000  # taints between deletions of expired rows
+
+
+class MemoryTaintStore:
+    """Tainted session ids -> expiry, evicting the least recently tainted first."""
+
+    def __init__(self, ttl_seconds: float = TAINT_TTL_SECONDS, max_sessions: int = TAINT_MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def taint(self, session_id: str) -> None:
+        with self._lock:
+            self._expiry[session_id] = time.monotonic() + self.ttl_seconds
+            self._expiry.move_to_end(session_id)
+            while len(self._expiry) > self.max_sessions:
+                self._expiry.popitem(last=False)
+                self.evictions += 1
+
+    def is_tainted(self, session_id: str) -> bool:
+        with self._lock:
+            expires_at = self._expiry.get(session_id)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._expiry[session_id]
+                return False
+            return True
+
+    def stats(self) -> Dict[str, Union[int, str]]:
+        with self._lock:
+            return {"backend": "memory", "tainted_sessions": len(self._expiry), "evictions": self.evictions}
+
+
+class SQLiteTaintStore:
+    """
+    Tainted sessions in a SQLite file, so every worker sees the same taint.
+
+    Expiry uses wall-clock time so it compares across processes. Expired
+    rows are dropped, and the table trimmed to ``max_sessions``, every
+    SQLITE_PRUNE_EVERY taints.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = TAINT_TTL_SECONDS, max_sessions: int = TAINT_MAX_SESSIONS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+        self._taints = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS tainted_sessions "
+            "(session_id TEXT PRIMARY KEY, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def taint(self, session_id: str) -> None:
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT INTO tainted_sessions (session_id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET expires_at = excluded.expires_at",
+            (session_id, now + self.ttl_seconds)
+        )
+        self._taints += 1
+        if self._taints % SQLITE_PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM tainted_sessions WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM tainted_sessions WHERE session_id IN ("
+                "SELECT session_id FROM tainted_sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+
+    def is_tainted(self, session_id: str) -> bool:
+        row = self._connection().execute(
+            "SELECT expires_at FROM tainted_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def stats(self) -> Dict[str, Union[int, str]]:
+        count = self._connection().execute(
+            "SELECT COUNT(*) FROM tainted_sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "tainted_sessions": count}
+
+
+def create_taint_store(spec: str = TAINT_STORE):
+    """Build the store named by ``spec`` ("" for in-process, "sqlite:///path" to share)."""
+    if not spec:
+        return MemoryTaintStore()
+    if spec.startswith("sqlite:///"):
+        return SQLiteTaintStore(spec[len("sqlite:///"):])
+    raise ValueError(f"Unsupported TAINT_STORE '{spec}' (use '' or 'sqlite:///path')")
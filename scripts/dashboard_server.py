@@ -1,18 +1,49 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from pathlib import Path
-import json
+from typing import Optional
+import asyncio
+import sys
+import threading
+import time
+import zlib
 import logging
 
 # Configuration
 BASE_DIR = Path(__file__).resolve().parent.parent
-LOG_FILE = BASE_DIR / "logs/security_events.json"
 DASHBOARD_DIR = BASE_DIR / "dashboard"
 
-app = FastAPI(title="AegisSentinel Dashboard")
+sys.path.insert(0, str(BASE_DIR))
+from src.utils.alerts import classify_threat_vector, event_severity
+from src.utils.event_store import migrate_legacy_log
+from src.utils.http_encoding import CompressionMiddleware, FastJSONResponse, dumps
+from src.utils.logger import LEGACY_LOG_FILE, get_event_bus, get_event_store
+from src.utils.rollups import RollupEngine
+from src.utils.sketch import LogHistogram
+
+store = get_event_store()
+ROLLUP_FILE = store.root / "rollups.json"
+ROLLUP_SAVE_INTERVAL_S = 30
+
+# Latency reporting
+SLA_THRESHOLD_MS = 50.0
+BASELINE_LLM_LATENCY_MS = 2400.0  # Average LLM response time used for impact %
+LATENCY_WINDOW_SECONDS = 3600  # Headline latency stats cover the last hour
+
+# Chart ranges: name -> (range seconds, bucket seconds)
+HISTORY_RANGES = {
+    "1h": (3600, 600),
+    "6h": (6 * 3600, 3600),
+    "24h": (24 * 3600, 4 * 3600),
+    "7d": (7 * 86400, 86400),
+    "30d": (30 * 86400, 5 * 86400),
+}
+
+app = FastAPI(title="AegisSentinel Dashboard", default_response_class=FastJSONResponse)
 
 # Enable CORS
 app.add_middleware(
@@ -21,48 +52,161 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip/brotli for JSON and static assets (the SSE stream is left alone)
+app.add_middleware(CompressionMiddleware)
 
-def get_logs():
-    """Reads security events from the log file."""
-    if not LOG_FILE.exists():
-        return []
-    
-    events = []
+@app.on_event("startup")
+async def migrate_legacy_events():
+    """Import the pre-event-store JSONL log on first start."""
     try:
-        with open(LOG_FILE, "r") as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        events.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+        migrate_legacy_log(LEGACY_LOG_FILE, store)
     except Exception as e:
-        logging.error(f"Error reading logs: {e}")
-    return events
+        logging.error(f"Legacy log migration failed: {e}")
 
-@app.get("/api/security/metrics")
-async def get_metrics():
-    events = get_logs()
-    
-    total_requests = len(events)
-    blocked_events = [e for e in events if e.get("action") == "BLOCKED"]
-    threats_blocked = len(blocked_events)
-    
-    # Calculate Threat Vectors
-    threat_counts = {}
-    for e in blocked_events:
-        # Extract reason/vector
-        details = e.get("details", {})
-        reason = details.get("reason", "Unknown")
-        
-        # Simplified vector mapping
-        vector = "Generic"
-        if "Heuristic" in reason: vector = "Known Jailbreak"
-        elif "Prompt Injection" in reason: vector = "Prompt Injection"
-        elif "Semantic" in reason: vector = "Social Engineering"
-        elif "PII" in reason: vector = "PII Data Leak"
-        
-        threat_counts[vector] = threat_counts.get(vector, 0) + 1
+def make_etag(*parts) -> str:
+    """
+    Weak ETag: the event store version (changes on every append or reset)
+    plus whatever else the response depends on (query, time bucket).
+    """
+    return 'W/"' + "-".join(str(p) for p in (store.version(), *parts)) + '"'
+
+def conditional_json(request: Request, etag: str, build) -> Response:
+    """
+    304 if the client already holds ``etag``; otherwise ``build()`` the
+    payload. The check happens before any aggregation or serialization.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(build(), headers=headers)
+
+def query_fingerprint(request: Request) -> str:
+    return format(zlib.crc32(str(request.query_params).encode()), "x")
+
+def alert_prompt(details: dict) -> str:
+    return details.get("original") or details.get("sanitized") or "N/A"
+
+def format_alert(e: dict) -> dict:
+    """
+    Builds the dashboard alert object for a stored event. List views only
+    carry a short prompt preview; see format_alert_detail.
+    """
+    risk_score = e.get("risk_score", 0)
+    action = e.get("action", "UNKNOWN")
+    severity = event_severity(e)
+    
+    details = e.get("details", {})
+    prompt_preview = alert_prompt(details)
+    
+    return {
+        "id": f"ALT-{e['id']:04d}",
+        "timestamp": e.get("timestamp"),
+        "attackType": details.get("reason", "Anomaly"),
+        "severity": severity,
+        "prompt": prompt_preview[:50] + "..." if len(prompt_preview) > 50 else prompt_preview,
+        "sourceIp": "127.0.0.1", # Mock IP
+        "status": action.lower(),
+        "confidence": f"{risk_score}%"
+    }
+
+def format_alert_detail(e: dict) -> dict:
+    """Full alert for the detail view (served one at a time)."""
+    details = e.get("details", {})
+    return {
+        **format_alert(e),
+        "fullPrompt": alert_prompt(details),
+        "userAgent": "Antigravity Agent",
+        "riskScore": e.get("risk_score", 0),
+        "details": details,
+    }
+
+class EventLogState:
+    """
+    Incrementally tails the event store and keeps running aggregates.
+    Each refresh parses only events appended since the previous one, so
+    endpoint cost no longer grows with the size of the log.
+    
+    Time-bucketed rollups are persisted next to the event store and resumed
+    on restart; events already folded in are skipped by id.
+    """
+    
+    def __init__(self, event_store, rollups: RollupEngine):
+        self.store = event_store
+        self.rollups = rollups
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._last_rollup_save = time.monotonic()
+        self.total_requests = 0
+        self.threats_blocked = 0
+        self.threat_counts = {}
+        self._listeners = []
+    
+    def add_listener(self, callback) -> None:
+        """Registers callback(events), called after each refresh that applied new events."""
+        self._listeners.append(callback)
+    
+    def refresh(self) -> None:
+        """Applies newly appended events to the aggregates."""
+        with self._lock:
+            previous = self._cursor
+            try:
+                events, self._cursor = self.store.tail(self._cursor)
+            except Exception as e:
+                logging.error(f"Error reading logs: {e}")
+                return
+            if previous is not None and self._cursor.resets != previous.resets:
+                # The store was reset behind our back (another process)
+                self._clear()
+            for e in events:
+                self._apply(e)
+            if events:
+                for callback in self._listeners:
+                    try:
+                        callback(events)
+                    except Exception as e:
+                        logging.error(f"Event listener failed: {e}")
+            if time.monotonic() - self._last_rollup_save >= ROLLUP_SAVE_INTERVAL_S:
+                self.save_rollups()
+    
+    def save_rollups(self) -> None:
+        """Persists rollups alongside the event store."""
+        try:
+            self.rollups.save(ROLLUP_FILE)
+        except OSError as e:
+            logging.error(f"Error saving rollups: {e}")
+        self._last_rollup_save = time.monotonic()
+    
+    def _apply(self, e: dict) -> None:
+        self.rollups.add(e)
+        self.total_requests += 1
+        if e.get("action") == "BLOCKED":
+            self.threats_blocked += 1
+            vector = classify_threat_vector(e.get("details", {}).get("reason", "Unknown"))
+            self.threat_counts[vector] = self.threat_counts.get(vector, 0) + 1
+    
+    def _clear(self) -> None:
+        self.rollups.reset()
+        self.total_requests = 0
+        self.threats_blocked = 0
+        self.threat_counts = {}
+    
+    def reset(self) -> None:
+        """
+        Clears aggregates and the cursor. The store starts new segments from
+        byte 0 after a reset, so the old offset must not be resumed.
+        """
+        with self._lock:
+            self._cursor = None
+            self._clear()
+
+state = EventLogState(store, RollupEngine.load(ROLLUP_FILE))
+
+def security_metrics_snapshot() -> dict:
+    """Headline counters and threat vectors from the running aggregates."""
+    total_requests = state.total_requests
+    threats_blocked = state.threats_blocked
+    threat_counts = dict(state.threat_counts)
         
     # Top Threat
     top_threat_vector = {"name": "None detected", "count": 0, "severity": "low"}
@@ -87,6 +231,16 @@ async def get_metrics():
         "all_threat_vectors": all_threat_vectors
     }
 
+# Endpoints that read the store are plain functions, so FastAPI runs them in
+# its threadpool instead of blocking the event loop (and every SSE client)
+
+@app.get("/api/security/metrics")
+def get_metrics(request: Request):
+    def build():
+        state.refresh()
+        return security_metrics_snapshot()
+    return conditional_json(request, make_etag(), build)
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -100,87 +254,307 @@ async def login(request: LoginRequest):
 class ScanRequest(BaseModel):
     prompt: str
 
+def summarize_latency(hist: LogHistogram) -> dict:
+    """Avg / median / p95 (ms) from a latency histogram."""
+    return {
+        "avg_latency_ms": round(hist.mean, 1),
+        "median_latency_ms": round(hist.quantile(0.5), 1),
+        "p95_latency_ms": round(hist.quantile(0.95), 1),
+        "count": hist.count
+    }
+
+def latency_snapshot() -> dict:
+    """Security-layer latency over the last hour, from the rollups."""
+    window = state.rollups.window(LATENCY_WINDOW_SECONDS)
+    total = window.latency.get("total") or LogHistogram()
+    summary = summarize_latency(total)
+    sla_breaches = total.count_above(SLA_THRESHOLD_MS)
+    
+    return {
+        "avg_latency_ms": summary["avg_latency_ms"],
+        "median_latency_ms": summary["median_latency_ms"],
+        "p95_latency_ms": summary["p95_latency_ms"],
+        "percentage_impact": round(total.mean / BASELINE_LLM_LATENCY_MS * 100.0, 2),
+        "sla_status": "within_sla" if total.mean <= SLA_THRESHOLD_MS else "sla_breached",
+        "sla_threshold_ms": SLA_THRESHOLD_MS,
+        "total_requests": state.total_requests,
+        "sla_breaches": sla_breaches,
+        "breach_rate": round(sla_breaches / total.count * 100, 2) if total.count else 0.0,
+        "layers": {
+            layer: summarize_latency(hist)
+            for layer, hist in window.latency.items() if layer != "total"
+        }
+    }
+
+def format_bucket_label(start: int, step: int) -> str:
+    return time.strftime("%H:%M" if step < 86400 else "%m-%d", time.localtime(start))
+
 @app.get("/metrics/latency")
-async def get_latency_metrics():
-    # In a real scenario, we would parse start/end times from logs.
-    # For this dashboard/demo, we return calculated mock values based on request count.
-    events = get_logs()
-    count = len(events)
-    
-    # Simulate realistic variability
-    avg_latency = 120 + (count % 10) * 5
-    p95 = avg_latency * 1.5
-    
-    # Generate mock history for the bar graph (last 6 4-hour buckets)
-    # In a real app, this would be aggregated from timestamps
-    import random
-    history_native = [random.randint(20, 50) for _ in range(6)]
-    history_secured = [random.randint(100, 150) for _ in range(6)]
+def get_latency_metrics(request: Request, range_name: str = Query("24h", alias="range")):
+    """
+    Security-layer latency over the last hour plus a bucketed history.
+    All values come from the rollups, so cost is O(buckets), not O(events).
+    """
+    if range_name not in HISTORY_RANGES:
+        raise HTTPException(status_code=400, detail=f"range must be one of {list(HISTORY_RANGES)}")
+    # Windows slide even without new events, so the tag also rolls every minute
+    etag = make_etag(range_name, int(time.time() // 60))
+    return conditional_json(request, etag, lambda: build_latency_metrics(range_name))
+
+def build_latency_metrics(range_name: str) -> dict:
+    state.refresh()
+    
+    range_seconds, step = HISTORY_RANGES[range_name]
+    buckets = state.rollups.series(range_seconds, step)
+    bucket_latency = [b.latency.get("total") or LogHistogram() for b in buckets]
     
     return {
-        "avg_latency_ms": round(avg_latency, 1),
-        "median_latency_ms": round(avg_latency * 0.9, 1),
-        "p95_latency_ms": round(p95, 1),
-        "percentage_impact": 15.2, # Mock overhead
-        "sla_status": "within_sla",
-        "total_requests": count,
-        "sla_breaches": 0,
-        "breach_rate": 0.0,
+        **latency_snapshot(),
         "history": {
-            "labels": ['00:00', '04:00', '08:00', '12:00', '16:00', '20:00'],
-            "native": history_native,
-            "secured": history_secured
+            "range": range_name,
+            "labels": [format_bucket_label(b.start, step) for b in buckets],
+            "requests": [b.total for b in buckets],
+            "blocked": [b.actions.get("BLOCKED", 0) for b in buckets],
+            "rpm": [round(b.total / (step / 60), 2) for b in buckets],
+            "avg_latency_ms": [round(h.mean, 1) for h in bucket_latency],
+            "p95_latency_ms": [round(h.quantile(0.95), 1) for h in bucket_latency]
         }
     }
 
+@app.get("/metrics/traffic")
+def get_traffic(request: Request, minutes: int = Query(60, ge=1, le=24 * 60)):
+    """Per-minute request counts by action (requests per minute)."""
+    etag = make_etag(minutes, int(time.time() // 60))
+    return conditional_json(request, etag, lambda: build_traffic(minutes))
+
+def build_traffic(minutes: int) -> dict:
+    state.refresh()
+    buckets = state.rollups.series(minutes * 60, 60)
+    return {
+        "labels": [format_bucket_label(b.start, 60) for b in buckets],
+        "rpm": [b.total for b in buckets],
+        "by_action": {
+            action: [b.actions.get(action, 0) for b in buckets]
+            for action in sorted({a for b in buckets for a in b.actions})
+        }
+    }
+
+ALERT_EVENT_TYPES = ["LLM_INPUT_SCAN", "LLM_OUTPUT_SCAN"]
+MAX_ALERTS_PAGE = 500
+
+def parse_alert_id(value: Optional[str]) -> Optional[int]:
+    """Accepts either a raw event id ("42") or an alert id ("ALT-0042")."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value.upper().removeprefix("ALT-"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid alert id: {value}")
+
+def split_filter(value: Optional[str]) -> Optional[set]:
+    """Comma-separated filter values, lower-cased."""
+    if not value:
+        return None
+    return {v.strip().lower() for v in value.split(",") if v.strip()}
+
 @app.get("/api/security/alerts")
-async def get_alerts():
-    """Returns formatted alerts for the dashboard."""
-    events = get_logs()
-    alerts = []
+def get_alerts(
+    request: Request,
+    limit: int = Query(50, ge=1, le=MAX_ALERTS_PAGE),
+    before_id: Optional[str] = None,
+    since_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    action: Optional[str] = None,
+    start: Optional[int] = Query(None, description="Earliest timestamp (epoch ms)"),
+    end: Optional[int] = Query(None, description="Latest timestamp (epoch ms)"),
+):
+    """
+    Returns formatted alerts for the dashboard, latest first.
+    
+    Cursors:
+        before_id: page backwards through history (older than this alert)
+        since_id: fetch only alerts newer than this alert (polling deltas)
     
-    # Iterate backwards to get latest first
-    for i, e in enumerate(reversed(events)):
+    The newest-first scan reads the event store backwards from the end and
+    stops as soon as the page is full, so cost is proportional to the page
+    size rather than to the length of the history.
+    """
+    etag = make_etag(query_fingerprint(request))
+    return conditional_json(
+        request, etag,
+        lambda: build_alerts(limit, before_id, since_id, severity, action, start, end),
+    )
+
+def build_alerts(limit, before_id, since_id, severity, action, start, end) -> dict:
+    before = parse_alert_id(before_id)
+    since = parse_alert_id(since_id)
+    severities = split_filter(severity)
+    actions = split_filter(action)
+    
+    alerts = []
+    has_more = False
+    for e in store.iter_events_reverse(start_ms=start, end_ms=end, before_id=before):
+        if since is not None and e["id"] <= since:
+            break
         # Only show relevant security events
-        if e.get("event_type") not in ["LLM_INPUT_SCAN", "LLM_OUTPUT_SCAN"]:
+        if e.get("event_type") not in ALERT_EVENT_TYPES:
             continue
-            
-        risk_score = e.get("risk_score", 0)
-        action = e.get("action", "UNKNOWN")
-        
-        # Determine Severity based on risk/action
-        severity = "low"
-        if risk_score >= 80 or action == "BLOCKED": severity = "critical"
-        elif risk_score >= 50: severity = "high"
-        elif action == "REDACTED": severity = "medium"
-        
-        details = e.get("details", {})
-        prompt_preview = details.get("original") or details.get("sanitized") or "N/A"
-        
-        alerts.append({
-            "id": f"ALT-{len(events)-i:04d}",
-            "timestamp": e.get("timestamp"),
-            "attackType": details.get("reason", "Anomaly"),
-            "severity": severity,
-            "prompt": prompt_preview[:50] + "..." if len(prompt_preview) > 50 else prompt_preview,
-            "fullPrompt": prompt_preview,
-            "sourceIp": "127.0.0.1", # Mock IP
-            "status": action.lower(),
-            "userAgent": "Antigravity Agent",
-            "confidence": f"{risk_score}%"
-        })
-        
-    return alerts
+        if actions and e.get("action", "UNKNOWN").lower() not in actions:
+            continue
+        alert = format_alert(e)
+        if severities and alert["severity"] not in severities:
+            continue
+        if len(alerts) == limit:
+            has_more = True
+            break
+        alerts.append(alert)
+    
+    return {
+        "alerts": alerts,
+        "next_before_id": alerts[-1]["id"] if has_more else None,
+        "latest_id": store.high_water_mark()
+    }
+
+@app.get("/api/security/alerts/{alert_id}")
+def get_alert(alert_id: str):
+    """Full detail (complete prompt, raw details) for a single alert."""
+    event_id = parse_alert_id(alert_id)
+    event = store.get(event_id) if event_id is not None else None
+    if event is None or event.get("event_type") not in ALERT_EVENT_TYPES:
+        raise HTTPException(status_code=404, detail=f"Alert not found: {alert_id}")
+    return format_alert_detail(event)
+
+# Live stream (server-sent events)
+LIVE_POLL_INTERVAL_S = 1.0
+LIVE_HEARTBEAT_S = 15.0
+LIVE_QUEUE_SIZE = 64
+LIVE_REPLAY_LIMIT = 100
+
+def encode_sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    frame = f"id: {event_id}\n" if event_id is not None else ""
+    return frame + f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+class LiveFeed:
+    """
+    Fans new alerts and metric deltas out to every connected dashboard.
+    
+    A single producer task tails the store (through EventLogState) while
+    anyone is subscribed; each delta is formatted and encoded once and the
+    same frame is queued for every subscriber, so per-client cost is a
+    queue put regardless of how many dashboards are open.
+    """
+    
+    def __init__(self, event_state: EventLogState):
+        self.state = event_state
+        self._subscribers = set()
+        self._producer = None
+        self._loop = None
+        event_state.add_listener(self._on_events)
+    
+    def _on_events(self, events) -> None:
+        # Runs inside EventLogState.refresh, on whichever thread refreshed
+        if not self._subscribers or self._loop is None:
+            return
+        latest_id = events[-1]["id"]
+        alerts = [e for e in reversed(events) if e.get("event_type") in ALERT_EVENT_TYPES]
+        frame = encode_sse("delta", {
+            "alerts": [format_alert(e) for e in alerts[:LIVE_REPLAY_LIMIT]],
+            "metrics": security_metrics_snapshot(),
+            "latency": latency_snapshot(),
+            "latest_id": latest_id
+        }, latest_id)
+        self._loop.call_soon_threadsafe(self.publish, frame)
+    
+    def publish(self, frame: str) -> None:
+        """Queues a frame for every subscriber (call on the event loop)."""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and have it refetch a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(encode_sse("resync", {}))
+    
+    async def _produce(self) -> None:
+        while self._subscribers:
+            await asyncio.to_thread(self.state.refresh)
+            await asyncio.sleep(LIVE_POLL_INTERVAL_S)
+        self._producer = None
+    
+    def snapshot(self, last_event_id: Optional[int] = None) -> str:
+        """
+        Initial frame: current metrics, plus alerts missed since a reconnect.
+        Reads the store, so call it off the event loop.
+        """
+        self.state.refresh()
+        missed = []
+        if last_event_id is not None:
+            for e in store.iter_events_reverse():
+                if e["id"] <= last_event_id or len(missed) == LIVE_REPLAY_LIMIT:
+                    break
+                if e.get("event_type") in ALERT_EVENT_TYPES:
+                    missed.append(format_alert(e))
+        latest_id = store.high_water_mark()
+        return encode_sse("snapshot", {
+            "alerts": missed,
+            "metrics": security_metrics_snapshot(),
+            "latency": latency_snapshot(),
+            "latest_id": latest_id
+        }, latest_id)
+    
+    async def stream(self, request: Request, last_event_id: Optional[int] = None):
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(LIVE_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce())
+        try:
+            yield await asyncio.to_thread(self.snapshot, last_event_id)
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self._subscribers.discard(queue)
+
+live_feed = LiveFeed(state)
+
+# Events published in this process wake the feed immediately instead of
+# waiting for the next poll (the poll still picks up other processes' writes)
+get_event_bus().sink("live_stream").subscribe(lambda events: state.refresh())
+
+@app.on_event("startup")
+async def prime_event_state():
+    """Catch up on the existing history before any stream subscribes."""
+    await asyncio.to_thread(state.refresh)
+
+@app.get("/api/stream")
+async def live_stream(request: Request):
+    """
+    Server-sent event stream for the SOC dashboard.
+    
+    Events:
+        snapshot: sent on connect (metrics, latency, alerts missed since Last-Event-ID)
+        delta: new alerts (newest first) plus updated metrics and latency
+        reset: counters were reset
+        resync: the client fell behind and should refetch
+    """
+    header = request.headers.get("last-event-id")
+    last_event_id = int(header) if header and header.isdigit() else None
+    return StreamingResponse(
+        live_feed.stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/metrics/scan")
 async def simulate_scan(request: ScanRequest):
     # Simulate a scan event for the dashboard demo
     # This allows the "Generate Sample Scans" JS to work and populate the graphs
-    import random
-    import time
     
     # Basic logic to generate variety
-    is_safe = True
     risk_score = 0
     reason = "None"
     action = "ALLOWED"
@@ -191,30 +565,36 @@ async def simulate_scan(request: ScanRequest):
         reason = "PII Data Leak"
         
     if "ignore" in request.prompt.lower():
-        is_safe = False
         risk_score = 100
         reason = "Prompt Injection"
         action = "BLOCKED"
 
     event = {
-        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
         "event_type": "LLM_INPUT_SCAN",
         "action": action,
         "risk_score": risk_score,
         "details": {"reason": reason, "original": request.prompt}
     }
     
-    # Append to log
-    with open(LOG_FILE, "a") as f:
-        f.write(json.dumps(event) + "\n")
+    # Publish through the event bus (stored, then fanned out to the metrics DB and live stream)
+    get_event_bus().publish(event)
         
     return {"status": "scanned", "risk_score": risk_score}
 
+@app.on_event("shutdown")
+async def persist_rollups():
+    state.save_rollups()
+
 @app.post("/api/security/reset")
 async def reset_metrics():
-    # In a real app, we might archive logs. Here we just wipe/truncate.
-    with open(LOG_FILE, "w") as f:
-        f.write("")
+    # In a real app, we might archive logs. Here we just wipe the store.
+    await asyncio.to_thread(store.reset)
+    await asyncio.to_thread(state.reset)
+    live_feed.publish(encode_sse("reset", {
+        "metrics": security_metrics_snapshot(),
+        "latency": latency_snapshot(),
+        "latest_id": store.high_water_mark()
+    }))
     return {"status": "success"}
 
 # Serve Static Files (Dashboard UI)
@@ -1,7 +1,16 @@
 import sys
 import os
 import logging
-from src.server import process_secure_prompt, process_secure_output
+from pathlib import Path
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Bodies of the secure_prompt_gateway / secure_output_scanner tools
+from src.server import (
+    _execute_output_scan as process_secure_output,
+    _execute_security_pipeline as process_secure_prompt,
+)
 
 # Configure logging to stderr to match server setup
 logging.basicConfig(stream=sys.stderr, level=logging.INFO)
@@ -0,0 +1,25 @@
+"""
+Alert Classification
+Shared mapping from stored security events to the threat vector and
+severity shown on the SOC dashboards.
+"""
+
+
+def classify_threat_vector(reason: str) -> str:
+    """Simplified vector mapping from a block reason."""
+    if "Heuristic" in reason: return "Known Jailbreak"
+    if "Prompt Injection" in reason: return "Prompt Injection"
+    if "Semantic" in reason: return "Social Engineering"
+    if "PII" in reason: return "PII Data Leak"
+    return "Generic"
+
+
+def event_severity(event: dict) -> str:
+    """Severity of a stored event based on its risk score and action."""
+    risk_score = event.get("risk_score", 0) or 0
+    action = event.get("action", "UNKNOWN")
+    
+    if risk_score >= 80 or action == "BLOCKED": return "critical"
+    if risk_score >= 50: return "high"
+    if action == "REDACTED": return "medium"
+    return "low"
@@ -0,0 +1,335 @@
+"""
+In-Process Security Event Bus
+
+The gateway publishes each security event once; sinks consume them on their
+own worker threads. Every sink has a bounded queue, a batch size and a flush
+interval, so a slow sink (disk, SQLite, a stalled dashboard) only ever backs
+up its own queue and can never add latency to the request path. When a
+queue is full, new events for that sink are dropped and counted.
+
+An optional *source* sink (the event store) runs first: it assigns ids, and
+the records it stores are what the other sinks receive, so every sink sees
+the same ids as the log.
+"""
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.alerts import classify_threat_vector, event_severity
+from src.utils.event_store import EventStore, normalize_timestamp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL_S = 0.2
+
+
+class Sink:
+    """
+    Base class for bus consumers.
+
+    Subclasses implement ``write(batch)``; it runs on the sink's own worker
+    thread and may return the records it produced (only used for the source).
+    """
+
+    name = "sink"
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_S,
+    ):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def write(self, events: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources after the final batch."""
+
+
+class _SinkWorker:
+    """Bounded queue plus the thread draining it into one sink."""
+
+    def __init__(self, sink: Sink, downstream: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.sink = sink
+        self.downstream = downstream
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(sink.queue_size)
+        # Updated from publisher threads (offer) and the worker thread (_run)
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "dropped": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"event-sink-{sink.name}", daemon=True
+        )
+        self._thread.start()
+
+    def _count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for key, n in increments.items():
+                self._stats[key] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self._count(dropped=1)
+            return False
+        self._count(queued=1)
+        return True
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self.queue.get(timeout=self.sink.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.sink.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                produced = self.sink.write(batch)
+                self._count(written=len(batch), batches=1)
+                if self.downstream is not None:
+                    self.downstream(produced if produced is not None else batch)
+            except Exception as e:
+                self._count(errors=1)
+                self.last_error = str(e)
+                logger.error(f"Event sink '{self.sink.name}' failed on {len(batch)} events: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def pending(self) -> int:
+        return self.queue.unfinished_tasks
+
+    def close(self, timeout: float) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+        try:
+            self.sink.close()
+        except Exception as e:
+            logger.error(f"Closing event sink '{self.sink.name}' failed: {e}")
+
+
+class EventBus:
+    """
+    Publish/subscribe fan-out of security events to pluggable sinks.
+
+    Args:
+        source: Sink that persists events first and returns stored records
+            (e.g. EventStoreSink); None publishes straight to ``sinks``
+        sinks: Sinks fed with the source's output (or the raw events)
+    """
+
+    def __init__(self, source: Optional[Sink] = None, sinks: Iterable[Sink] = ()):
+        self._lock = threading.Lock()
+        self._workers: List[_SinkWorker] = []
+        self._closed = False
+        self._source = _SinkWorker(source, downstream=self._fan_out) if source else None
+        for sink in sinks:
+            self.add_sink(sink)
+
+    def add_sink(self, sink: Sink) -> None:
+        with self._lock:
+            self._workers = self._workers + [_SinkWorker(sink)]
+
+    def sink(self, name: str) -> Optional[Sink]:
+        """The registered sink called ``name``."""
+        for worker in self._all_workers():
+            if worker.sink.name == name:
+                return worker.sink
+        return None
+
+    def _all_workers(self) -> List[_SinkWorker]:
+        return ([self._source] if self._source else []) + self._workers
+
+    def _fan_out(self, events: List[Dict[str, Any]]) -> None:
+        for worker in self._workers:
+            for event in events:
+                worker.offer(event)
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue an event for every sink without blocking.
+
+        The timestamp is fixed at publish time so batching delays never
+        shift when an event happened.
+
+        Returns:
+            False if the event was dropped by a full queue
+        """
+        if self._closed:
+            return False
+        event = dict(event)
+        event["timestamp"] = normalize_timestamp(event.get("timestamp"))
+        if self._source is not None:
+            return self._source.offer(event)
+        accepted = True
+        for worker in self._workers:
+            accepted = worker.offer(event) and accepted
+        return accepted
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been written (True on success)."""
+        deadline = time.monotonic() + timeout
+        while any(worker.pending() for worker in self._all_workers()):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain the queues and stop the workers."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        for worker in self._all_workers():
+            worker.close(timeout)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-sink queue depth and counters."""
+        return {
+            worker.sink.name: {
+                **worker.stats(),
+                "pending": worker.pending(),
+                "queue_size": worker.sink.queue_size,
+                "last_error": worker.last_error,
+            }
+            for worker in self._all_workers()
+        }
+
+
+# ----------------------------------------------------------------------
+# Built-in sinks
+# ----------------------------------------------------------------------
+
+class EventStoreSink(Sink):
+    """Appends batches to the segmented event store (one locked write per batch)."""
+
+    name = "event_store"
+
+    def __init__(self, store: EventStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def write(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.store.append_many(events)
+
+
+class SQLiteMetricsSink(Sink):
+    """
+    Folds batches into the dashboard's security metrics database
+    (request counters and threat vectors) in a single transaction.
+
+    The schema is owned by dashboard/simple_backend/security_metrics_db.py.
+    """
+
+    name = "sqlite_metrics"
+
+    def __init__(self, db_path: Path, **kwargs):
+        kwargs.setdefault("batch_size", 1000)
+        kwargs.setdefault("flush_interval", 1.0)
+        super().__init__(**kwargs)
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Only ever used from this sink's worker thread (close() runs after it stops)
+            self._conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        blocked = 0
+        vectors: Dict[str, list] = {}  # threat_type -> [count, severity, last_detected]
+        for event in events:
+            if event.get("action") != "BLOCKED":
+                continue
+            blocked += 1
+            reason = (event.get("details") or {}).get("reason", "Unknown")
+            detected = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["timestamp"] / 1000))
+            entry = vectors.setdefault(classify_threat_vector(reason), [0, "", ""])
+            entry[0] += 1
+            entry[1] = event_severity(event)
+            entry[2] = detected
+
+        conn = self._connection()
+        with conn:
+            conn.executemany('''
+                INSERT INTO threat_vectors (threat_type, count, severity, last_detected)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(threat_type) DO UPDATE SET
+                    count = count + excluded.count,
+                    last_detected = excluded.last_detected,
+                    severity = excluded.severity
+            ''', [(name, n, severity, detected) for name, (n, severity, detected) in vectors.items()])
+            conn.execute('''
+                UPDATE request_metrics
+                SET total_requests = total_requests + ?,
+                    threats_blocked = threats_blocked + ?,
+                    last_updated = ?
+                WHERE id = (SELECT id FROM request_metrics ORDER BY id DESC LIMIT 1)
+            ''', (len(events), blocked, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class LiveStreamSink(Sink):
+    """
+    Hands batches to in-process subscribers (e.g. a dashboard's SSE feed).
+
+    Subscribers run on this sink's worker thread and should return quickly.
+    """
+
+    name = "live_stream"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queue_size", 1000)
+        kwargs.setdefault("flush_interval", 0.05)
+        super().__init__(**kwargs)
+        self._subscribers: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+    def subscribe(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        self._subscribers = self._subscribers + [callback]
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(events)
+            except Exception as e:
+                logger.error(f"Live stream subscriber failed: {e}")
+
+
+def close_on_exit(bus: EventBus, timeout: float = 5.0) -> EventBus:
+    """Drain ``bus`` when the interpreter exits so buffered events are not lost."""
+    atexit.register(bus.close, timeout)
+    return bus
@@ -0,0 +1,658 @@
+"""
+Segmented Security Event Store
+
+Security events are appended to time-partitioned JSONL segments under
+``logs/events``. When a partition rolls over, the finished segment is sealed:
+it is rewritten as a sequence of independently gzip-compressed blocks and
+recorded in the sidecar ``index.json`` together with its time range, id range,
+per-action counts and the byte offset of every block.
+
+Readers use the index to skip segments (and blocks) outside the requested
+window instead of re-parsing the whole history.
+
+Every stored event carries:
+  - id:        monotonically increasing integer (never reused, even after reset)
+  - timestamp: epoch milliseconds (legacy string / float seconds are normalized)
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+LOCK_FILE = ".lock"
+SEGMENT_PREFIX = "events-"
+RAW_SUFFIX = ".jsonl"
+SEALED_SUFFIX = ".jsonl.gz"
+
+DEFAULT_SEGMENT_SECONDS = 3600  # One segment per hour
+DEFAULT_BLOCK_RECORDS = 512  # Records per compressed block in sealed segments
+
+_REVERSE_CHUNK_BYTES = 64 * 1024
+
+
+def normalize_timestamp(value: Any = None) -> int:
+    """
+    Normalize a timestamp to epoch milliseconds.
+
+    Accepts epoch seconds (int/float), epoch milliseconds, numeric strings,
+    and "YYYY-MM-DD HH:MM:SS" / ISO-8601 strings (naive values are local time,
+    matching what ``time.strftime`` wrote in older logs).
+    """
+    if value is None or value == "":
+        return int(time.time() * 1000)
+
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                return int(datetime.fromisoformat(value.strip()).timestamp() * 1000)
+            except ValueError:
+                logger.warning(f"Unparseable event timestamp {value!r}, using current time")
+                return int(time.time() * 1000)
+
+    value = float(value)
+    # Anything past ~1973 in milliseconds is far beyond any plausible seconds value
+    if value > 1e11:
+        return int(value)
+    return int(value * 1000)
+
+
+def normalize_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of ``event`` with a normalized ``timestamp`` and no ``id``."""
+    record = {k: v for k, v in event.items() if k != "id"}
+    record["timestamp"] = normalize_timestamp(event.get("timestamp"))
+    return record
+
+
+@dataclass
+class TailCursor:
+    """Position of an incremental reader within the store."""
+    last_id: int = 0
+    segment: Optional[str] = None
+    offset: int = 0
+    resets: int = 0  # Store reset generation the offset belongs to
+
+
+class EventStore:
+    """
+    Append-only, time-partitioned event store.
+
+    Safe for concurrent writers: appends are serialized with a thread lock
+    and, on POSIX, an advisory file lock shared with other processes writing
+    to the same directory (e.g. the gateway and the dashboard server).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_seconds: int = DEFAULT_SEGMENT_SECONDS,
+        block_records: int = DEFAULT_BLOCK_RECORDS,
+    ):
+        """
+        Args:
+            root: Directory holding segments and the index
+            segment_seconds: Width of each time partition
+            block_records: Number of events per compressed block when sealing
+        """
+        self.root = Path(root)
+        self.segment_seconds = segment_seconds
+        self.block_records = block_records
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._index_cache: Optional[Dict[str, Any]] = None
+        self._index_stamp: Optional[Tuple[int, int]] = None
+
+        # Writer state, re-synchronized whenever another process appended
+        self._next_id: Optional[int] = None
+        self._written: Optional[Tuple[str, int]] = None
+
+    # ------------------------------------------------------------------
+    # Paths and index
+    # ------------------------------------------------------------------
+
+    def _partition_of(self, ts_ms: int) -> int:
+        seconds = ts_ms // 1000
+        return seconds - (seconds % self.segment_seconds)
+
+    @staticmethod
+    def _segment_stem(partition: int) -> str:
+        return SEGMENT_PREFIX + time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(partition))
+
+    @staticmethod
+    def _partition_from_name(name: str) -> int:
+        stem = name[len(SEGMENT_PREFIX):].split(".", 1)[0]
+        return int(datetime.strptime(stem + "+0000", "%Y%m%dT%H%M%SZ%z").timestamp())
+
+    def _raw_segments(self) -> List[Path]:
+        """Unsealed segments, oldest partition first."""
+        return sorted(self.root.glob(f"{SEGMENT_PREFIX}*{RAW_SUFFIX}"))
+
+    def _load_index(self) -> Dict[str, Any]:
+        path = self.root / INDEX_FILE
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._index_cache, self._index_stamp = None, None
+            return {"version": 1, "last_id": 0, "segments": []}
+
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._index_cache is None or self._index_stamp != stamp:
+            with open(path, "r") as f:
+                self._index_cache = json.load(f)
+            self._index_stamp = stamp
+        return self._index_cache
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        path = self.root / INDEX_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._index_cache, self._index_stamp = None, None
+
+    def index(self) -> Dict[str, Any]:
+        """Return the sidecar index (sealed segments only)."""
+        with self._lock:
+            return self._load_index()
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.root / LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _sync_writer_state(self) -> None:
+        """Recover the next id if this is the first write or another process appended."""
+        raws = self._raw_segments()
+        current = (raws[-1].name, raws[-1].stat().st_size) if raws else None
+        if self._next_id is not None and current == self._written:
+            return
+        self._next_id = self._read_high_water_mark(raws) + 1
+        self._written = current
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Append a single event.
+
+        Returns:
+            The stored record, including its assigned ``id`` and normalized ``timestamp``
+        """
+        return self.append_many([event])[0]
+
+    def append_many(self, events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append several events in one locked write per segment."""
+        records = [normalize_event(e) for e in events]
+        if not records:
+            return []
+
+        with self._write_lock():
+            self._sync_writer_state()
+            raws = self._raw_segments()
+            floor = self._partition_from_name(raws[-1].name) if raws else 0
+            index = self._load_index()
+            if index["segments"]:
+                floor = max(floor, index["segments"][-1]["partition"])
+
+            # Group by target partition. Partitions never move backwards so
+            # segment order always matches id order.
+            stored = []
+            pending: List[Tuple[int, List[str]]] = []
+            for record in records:
+                partition = max(self._partition_of(record["timestamp"]), floor)
+                floor = partition
+                record = {"id": self._next_id, **record}
+                self._next_id += 1
+                stored.append(record)
+                line = json.dumps(record)
+                if pending and pending[-1][0] == partition:
+                    pending[-1][1].append(line)
+                else:
+                    pending.append((partition, [line]))
+
+            for partition, lines in pending:
+                self._seal_before(partition)
+                path = self.root / (self._segment_stem(partition) + RAW_SUFFIX)
+                with open(path, "a") as f:
+                    f.write("\n".join(lines) + "\n")
+
+            raws = self._raw_segments()
+            self._written = (raws[-1].name, raws[-1].stat().st_size) if raws else None
+
+        return stored
+
+    def _seal_before(self, partition: int) -> None:
+        """Seal every raw segment belonging to an earlier partition."""
+        for path in self._raw_segments():
+            if self._partition_from_name(path.name) < partition:
+                self._seal(path)
+
+    def _seal(self, raw_path: Path) -> None:
+        """Compress a finished raw segment into blocks and register it in the index."""
+        partition = self._partition_from_name(raw_path.name)
+        index = dict(self._load_index())
+        segments = list(index["segments"])
+
+        if any(s["partition"] == partition for s in segments):
+            # Sealed already (crash between index write and unlink)
+            raw_path.unlink(missing_ok=True)
+            return
+
+        records = [r for _, r in _iter_raw_records(raw_path)]
+        if not records:
+            raw_path.unlink(missing_ok=True)
+            return
+
+        sealed_path = raw_path.with_name(self._segment_stem(partition) + SEALED_SUFFIX)
+        tmp_path = sealed_path.with_suffix(".tmp")
+        blocks = []
+        actions: Dict[str, int] = {}
+        offset = 0
+        with open(tmp_path, "wb") as out:
+            for start in range(0, len(records), self.block_records):
+                chunk = records[start:start + self.block_records]
+                payload = ("\n".join(json.dumps(r) for r in chunk) + "\n").encode("utf-8")
+                data = gzip.compress(payload, mtime=0)
+                out.write(data)
+                timestamps = [r["timestamp"] for r in chunk]
+                blocks.append([offset, chunk[0]["id"], min(timestamps), max(timestamps)])
+                offset += len(data)
+                for r in chunk:
+                    action = r.get("action", "UNKNOWN")
+                    actions[action] = actions.get(action, 0) + 1
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, sealed_path)
+
+        all_ts = [r["timestamp"] for r in records]
+        segments.append({
+            "name": sealed_path.name,
+            "partition": partition,
+            "first_id": records[0]["id"],
+            "last_id": records[-1]["id"],
+            "start_ms": min(all_ts),
+            "end_ms": max(all_ts),
+            "count": len(records),
+            "actions": actions,
+            "bytes": offset,
+            "blocks": blocks,
+        })
+        segments.sort(key=lambda s: s["partition"])
+        index["segments"] = segments
+        index["last_id"] = max(index.get("last_id", 0), records[-1]["id"])
+        self._write_index(index)
+        raw_path.unlink(missing_ok=True)
+
+    def seal_stale(self, now_ms: Optional[int] = None) -> None:
+        """Seal raw segments whose partition has ended (e.g. after a quiet period)."""
+        with self._write_lock():
+            self._seal_before(self._partition_of(normalize_timestamp(now_ms)))
+            raws = self._raw_segments()
+            self._written = (raws[-1].name, raws[-1].stat().st_size) if raws else None
+
+    def reset(self) -> None:
+        """
+        Delete all stored events.
+
+        Ids keep increasing afterwards so cursors held by readers stay valid.
+        """
+        with self._write_lock():
+            last_id = self.high_water_mark()
+            for path in self.root.glob(f"{SEGMENT_PREFIX}*"):
+                path.unlink(missing_ok=True)
+            resets = self._load_index().get("resets", 0) + 1
+            self._write_index({"version": 1, "last_id": last_id, "resets": resets, "segments": []})
+            self._next_id = last_id + 1
+            self._written = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _read_high_water_mark(self, raws: List[Path]) -> int:
+        for path in reversed(raws):
+            for record in _iter_raw_records_reverse(path):
+                return record["id"]
+        return self._load_index().get("last_id", 0)
+
+    def high_water_mark(self) -> int:
+        """Id of the newest stored event (0 if nothing was ever stored)."""
+        with self._lock:
+            return self._read_high_water_mark(self._raw_segments())
+
+    def version(self) -> str:
+        """
+        Opaque token that changes whenever the stored events change (an
+        append or a reset). Cheap enough to check on every request, e.g. as
+        an HTTP ETag.
+        """
+        with self._lock:
+            hwm = self._read_high_water_mark(self._raw_segments())
+            return f"{self._load_index().get('resets', 0)}-{hwm}"
+
+    def _sealed_segments(
+        self,
+        start_ms: Optional[int],
+        end_ms: Optional[int],
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        selected = []
+        for seg in self._load_index()["segments"]:
+            if start_ms is not None and seg["end_ms"] < start_ms:
+                continue
+            if end_ms is not None and seg["start_ms"] > end_ms:
+                continue
+            if after_id is not None and seg["last_id"] <= after_id:
+                continue
+            if before_id is not None and seg["first_id"] >= before_id:
+                continue
+            selected.append(seg)
+        return selected
+
+    def _iter_sealed(
+        self,
+        seg: Dict[str, Any],
+        start_ms: Optional[int],
+        end_ms: Optional[int],
+        after_id: Optional[int],
+        before_id: Optional[int],
+        reverse: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        blocks = seg["blocks"]
+        spans = []
+        for i, (offset, first_id, lo, hi) in enumerate(blocks):
+            next_first = blocks[i + 1][1] if i + 1 < len(blocks) else seg["last_id"] + 1
+            end_offset = blocks[i + 1][0] if i + 1 < len(blocks) else seg["bytes"]
+            if start_ms is not None and hi < start_ms:
+                continue
+            if end_ms is not None and lo > end_ms:
+                continue
+            if after_id is not None and next_first - 1 <= after_id:
+                continue
+            if before_id is not None and first_id >= before_id:
+                continue
+            spans.append((offset, end_offset))
+        if reverse:
+            spans.reverse()
+
+        try:
+            f = open(self.root / seg["name"], "rb")
+        except FileNotFoundError:
+            return  # Removed by a concurrent reset
+        with f:
+            for offset, end_offset in spans:
+                f.seek(offset)
+                lines = gzip.decompress(f.read(end_offset - offset)).decode("utf-8").splitlines()
+                if reverse:
+                    lines.reverse()
+                for line in lines:
+                    record = json.loads(line)
+                    if _matches(record, start_ms, end_ms, after_id, before_id):
+                        yield record
+
+    def iter_events(
+        self,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate events oldest first.
+
+        Args:
+            start_ms: Inclusive lower bound on event timestamp
+            end_ms: Inclusive upper bound on event timestamp
+            after_id: Only yield events with a larger id
+        """
+        with self._lock:
+            sealed = self._sealed_segments(start_ms, end_ms, after_id=after_id)
+            raws = self._raw_segments()
+        for seg in sealed:
+            yield from self._iter_sealed(seg, start_ms, end_ms, after_id, None)
+        for path in raws:
+            for _, record in _iter_raw_records(path):
+                if _matches(record, start_ms, end_ms, after_id, None):
+                    yield record
+
+    def iter_events_reverse(
+        self,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate events newest first without materializing the history.
+
+        Raw segments are read backwards from EOF; sealed segments block by block.
+        """
+        with self._lock:
+            sealed = self._sealed_segments(start_ms, end_ms, before_id=before_id)
+            raws = self._raw_segments()
+        for path in reversed(raws):
+            for record in _iter_raw_records_reverse(path):
+                if _matches(record, start_ms, end_ms, None, before_id):
+                    yield record
+        for seg in reversed(sealed):
+            yield from self._iter_sealed(seg, start_ms, end_ms, None, before_id, reverse=True)
+
+    def tail(self, cursor: Optional[TailCursor] = None) -> Tuple[List[Dict[str, Any]], TailCursor]:
+        """
+        Read events appended since ``cursor``.
+
+        Unsealed segments are resumed from the saved byte offset, so a poll
+        only parses newly appended lines. If the segment was sealed in the
+        meantime the reader falls back to the block index. After a reset the
+        segment of the same name is a new file, so it is read from the start
+        again; readers keeping aggregates can compare ``resets`` between the
+        old and new cursor to notice.
+
+        Returns:
+            Tuple of (new_events, new_cursor)
+        """
+        cursor = cursor or TailCursor()
+        # Under the file lock, so a segment sealed by another process shows
+        # up in exactly one of the two listings
+        with self._write_lock():
+            resets = self._load_index().get("resets", 0)
+            sealed = self._sealed_segments(None, None, after_id=cursor.last_id)
+            raws = self._raw_segments()
+
+        events: List[Dict[str, Any]] = []
+        for seg in sealed:
+            events.extend(self._iter_sealed(seg, None, None, cursor.last_id, None))
+
+        same_generation = resets == cursor.resets
+        segment, offset = (cursor.segment, cursor.offset) if same_generation else (None, 0)
+        for path in raws:
+            start = 0
+            if path.name == segment:
+                try:
+                    # Shorter than the saved offset: rewritten since, start over
+                    start = offset if path.stat().st_size >= offset else 0
+                except FileNotFoundError:
+                    continue
+            end = start
+            for end, record in _iter_raw_records(path, start):
+                if record["id"] > cursor.last_id:
+                    events.append(record)
+            segment, offset = path.name, end
+
+        last_id = events[-1]["id"] if events else cursor.last_id
+        return events, TailCursor(last_id=last_id, segment=segment, offset=offset, resets=resets)
+
+    def get(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch a single event by id."""
+        with self._lock:
+            sealed = [
+                s for s in self._load_index()["segments"]
+                if s["first_id"] <= event_id <= s["last_id"]
+            ]
+            raws = self._raw_segments()
+        for seg in sealed:
+            for record in self._iter_sealed(seg, None, None, event_id - 1, event_id + 1):
+                return record
+        for path in raws:
+            for _, record in _iter_raw_records(path):
+                if record["id"] == event_id:
+                    return record
+                if record["id"] > event_id:
+                    break
+        return None
+
+
+def _matches(
+    record: Dict[str, Any],
+    start_ms: Optional[int],
+    end_ms: Optional[int],
+    after_id: Optional[int],
+    before_id: Optional[int],
+) -> bool:
+    if start_ms is not None and record["timestamp"] < start_ms:
+        return False
+    if end_ms is not None and record["timestamp"] > end_ms:
+        return False
+    if after_id is not None and record["id"] <= after_id:
+        return False
+    if before_id is not None and record["id"] >= before_id:
+        return False
+    return True
+
+
+def _iter_raw_records(path: Path, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (end_offset, record) for each complete line from ``offset``.
+
+    A trailing line without a newline is a write in progress and is left for
+    the next read.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield offset, json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _iter_raw_records_reverse(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield complete records newest first, reading backwards from EOF in chunks."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        position = f.seek(0, os.SEEK_END)
+        buffer = b""
+        while position > 0:
+            size = min(_REVERSE_CHUNK_BYTES, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + buffer).split(b"\n")
+            # The first piece may be the tail of a line in an earlier chunk
+            buffer = lines.pop(0) if position > 0 else b""
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial write in progress or corrupt line
+                    continue
+
+
+def migrate_legacy_log(legacy_path: Path, store: EventStore, archive: bool = True) -> int:
+    """
+    Import a legacy ``security_events.json`` JSONL file into the store.
+
+    Timestamps are normalized to epoch milliseconds and events are ordered by
+    time before being appended. The legacy file is renamed to
+    ``<name>.migrated`` afterwards so the migration runs only once.
+
+    Returns:
+        Number of events migrated
+    """
+    legacy_path = Path(legacy_path)
+    if not legacy_path.exists():
+        return 0
+
+    events = []
+    with open(legacy_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                events.append(normalize_event(json.loads(line)))
+            except json.JSONDecodeError:
+                continue
+
+    events.sort(key=lambda e: e["timestamp"])
+    for start in range(0, len(events), 10_000):
+        store.append_many(events[start:start + 10_000])
+    store.seal_stale()
+
+    if archive:
+        legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+    logger.info(f"Migrated {len(events)} legacy events from {legacy_path}")
+    return len(events)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AegisSentinel event store utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="Import a legacy JSONL log")
+    migrate.add_argument("legacy", type=Path)
+    migrate.add_argument("--store", type=Path, default=Path("logs/events"))
+    migrate.add_argument("--keep", action="store_true", help="Do not rename the legacy file")
+
+    info = sub.add_parser("info", help="Print the segment index")
+    info.add_argument("--store", type=Path, default=Path("logs/events"))
+
+    args = parser.parse_args()
+    if args.command == "migrate":
+        count = migrate_legacy_log(args.legacy, EventStore(args.store), archive=not args.keep)
+        print(f"Migrated {count} events into {args.store}")
+    else:
+        store = EventStore(args.store)
+        print(json.dumps({**store.index(), "high_water_mark": store.high_water_mark()}, indent=2))
@@ -0,0 +1,110 @@
+"""
+Password Hashing Pool
+bcrypt work on a dedicated, bounded thread pool, shared by both dashboard
+backends.
+
+At cost 12 a single bcrypt check takes about 250 ms of CPU. Run inline in
+an async handler it blocks the event loop, so one login burst stalls every
+other request. bcrypt releases the GIL, so the pool's workers run in
+parallel. Beyond ``workers + max_waiting`` operations in flight, new ones
+are rejected with HashingPoolFull rather than queued without bound.
+
+Latency (queue wait + bcrypt) is recorded per operation in a LogHistogram,
+so memory stays constant however many logins are served.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from src.utils.sketch import LogHistogram
+
+REPORTED_QUANTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+class HashingPoolFull(Exception):
+    """Raised when the pool already has its maximum number of operations in flight."""
+
+
+class HashingPool:
+    """
+    Bounded worker pool for bcrypt operations.
+
+    Args:
+        workers: Concurrent bcrypt operations
+        max_waiting: Operations allowed to queue for a free worker
+    """
+
+    def __init__(self, workers: int, max_waiting: int):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._latency: Dict[str, LogHistogram] = {}
+
+    def _release(self, operation: str, submitted: float, future: Future) -> None:
+        # Runs when the work really finishes, even if the awaiting request was cancelled
+        elapsed_ms = (time.perf_counter() - submitted) * 1000.0
+        with self._lock:
+            self._in_flight -= 1
+            self._latency.setdefault(operation, LogHistogram()).add(elapsed_ms)
+
+    async def run(self, operation: str, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run ``fn(*args)`` on the pool and await its result.
+
+        Args:
+            operation: Label its latency is recorded under (e.g. "verify")
+
+        Raises:
+            HashingPoolFull: If ``workers + max_waiting`` operations are in flight
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_waiting:
+                self._rejected += 1
+                raise HashingPoolFull(f"{self._in_flight} bcrypt operations in flight")
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+        try:
+            future = self._executor.submit(fn, *args)
+        except RuntimeError:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(lambda f: self._release(operation, submitted, f))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy, rejections and latency per operation since start (or reset)."""
+        with self._lock:
+            in_flight, rejected = self._in_flight, self._rejected
+            histograms = {op: LogHistogram.merged([h]) for op, h in self._latency.items()}
+
+        latency = {}
+        for op, hist in histograms.items():
+            summary = {"count": hist.count, "avg_ms": round(hist.mean, 2)}
+            for name, q in REPORTED_QUANTILES.items():
+                summary[f"{name}_ms"] = round(hist.quantile(q), 2)
+            summary["max_ms"] = round(hist.max, 2)
+            latency[op] = summary
+
+        return {
+            "workers": self.workers,
+            "max_waiting": self.max_waiting,
+            "in_flight": in_flight,
+            "waiting": max(in_flight - self.workers, 0),
+            "rejected": rejected,
+            "latency": latency,
+        }
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._rejected = 0
+            self._latency = {}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,156 @@
+"""
+HTTP Payload Encoding
+JSON serialization and response compression shared by the dashboard apps.
+
+orjson is used when installed (several times faster than the stdlib
+encoder on large alert pages); otherwise responses fall back to compact
+stdlib JSON. Compression negotiates brotli (when the ``brotli`` package is
+installed) or gzip from Accept-Encoding.
+"""
+import json
+import zlib
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # Favours speed; dynamic payloads are compressed on every request
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+NON_STREAMABLE_TYPES = ("text/event-stream",)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fastest available encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick "br", "gzip" or "" (identity) from an Accept-Encoding header."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return ""
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress, self._finish = self._impl.process, self._impl.finish
+        else:
+            self._impl = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+            self._compress, self._finish = self._impl.compress, self._impl.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip.
+
+    Small bodies, already-encoded responses and server-sent event streams
+    (which must be flushed frame by frame) are passed through unchanged.
+    Streamed bodies (e.g. static files) are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                compress = (
+                    "content-encoding" not in headers
+                    and content_type.startswith(COMPRESSIBLE_TYPES)
+                    and not content_type.startswith(NON_STREAMABLE_TYPES)
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if compress:
+                    compressor = _Compressor(encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    del headers["content-length"]
+                    if not more_body:
+                        body = compressor.compress(body) + compressor.finish()
+                        headers["Content-Length"] = str(len(body))
+                        compressor = None
+                        await send(start_message)
+                        start_message = None
+                        await send({"type": "http.response.body", "body": body})
+                        return
+                await send(start_message)
+                start_message = None
+
+            if compressor is not None:
+                body = compressor.compress(body)
+                if not more_body:
+                    body += compressor.finish()
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_compressed)
+        if start_message is not None:
+            # Response without a body (e.g. 304)
+            await send(start_message)
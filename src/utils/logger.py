@@ -1,23 +1,71 @@
-import json
+import logging
+import os
 import threading
-import time
 from pathlib import Path
+from typing import Optional
+
+from src.utils.event_bus import (
+    EventBus,
+    EventStoreSink,
+    LiveStreamSink,
+    SQLiteMetricsSink,
+    close_on_exit,
+)
+from src.utils.event_store import EventStore
+
+# Resolve paths relative to the repository root to avoid CWD issues
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+EVENT_STORE_DIR = BASE_DIR / "logs/events"
+LEGACY_LOG_FILE = BASE_DIR / "logs/security_events.json"
+# Dashboard metrics database (same override as the simple backend)
+SECURITY_METRICS_DB = Path(os.environ.get(
+    "SECURITY_METRICS_DB",
+    BASE_DIR / "dashboard/simple_backend/security_metrics.db"
+))
+
+_event_store: Optional[EventStore] = None
+_event_bus: Optional[EventBus] = None
+# Separate locks: building the bus takes the store lock while holding its own
+_event_store_lock = threading.Lock()
+_event_bus_lock = threading.Lock()
+
+
+def get_event_store() -> EventStore:
+    """Get or create the shared security event store."""
+    global _event_store
+    if _event_store is None:
+        with _event_store_lock:
+            if _event_store is None:
+                _event_store = EventStore(EVENT_STORE_DIR)
+    return _event_store
+
+
+def get_event_bus() -> EventBus:
+    """
+    Get or create the process-wide event bus.
+
+    Events are stored first (ids assigned), then fanned out to the live
+    stream and, when the dashboard database exists, the SQLite metrics.
+    """
+    global _event_bus
+    if _event_bus is None:
+        with _event_bus_lock:
+            if _event_bus is None:
+                sinks = [LiveStreamSink()]
+                if SECURITY_METRICS_DB.exists():
+                    sinks.append(SQLiteMetricsSink(SECURITY_METRICS_DB))
+                _event_bus = close_on_exit(EventBus(source=EventStoreSink(get_event_store()), sinks=sinks))
+    return _event_bus
 
-# Use absolute path for logs to avoid CWD issues
-LOG_FILE = Path("/home/socks/Documents/AegisSentinal/logs/security_events.json")
-LOG_LOCK = threading.Lock()
 
 def log_security_event(event_data: dict):
     """
-    Logs a security event to the JSONL log file (Line-delimited JSON).
+    Publishes a security event to the event bus.
+    Returns immediately: the timestamp (epoch ms) is fixed now and the id is
+    assigned when the event store writes the batch.
     """
-    # Ensure timestamp exists
-    if "timestamp" not in event_data:
-        event_data["timestamp"] = time.strftime('%Y-%m-%d %H:%M:%S')
-
-    with LOG_LOCK:
-        try:
-            with open(LOG_FILE, "a") as f:
-                f.write(json.dumps(event_data) + "\n")
-        except Exception as e:
-            print(f"Error logging security event: {e}")
+    try:
+        if not get_event_bus().publish(event_data):
+            logging.getLogger(__name__).warning("Security event dropped: event store queue full")
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error logging security event: {e}")
@@ -0,0 +1,358 @@
+"""
+Token Bucket Rate Limiting
+Per-client request budgets for the HTTP backends and the MCP gateway tools.
+
+Each client has a bucket of ``burst`` tokens that refills at
+``rate_per_minute``; a request spends one token and is rejected when none
+are left. Buckets are stored in their GCRA form: a single "theoretical
+arrival time" per client, from which the token count follows. A check is
+O(1), updates the bucket lazily (no refill timers), and a full bucket is
+indistinguishable from no entry, so idle clients can be evicted freely.
+
+Stores:
+    MemoryBucketStore  - in-process LRU holding at most ``max_clients``
+                         buckets (one float each)
+    SQLiteBucketStore  - a shared SQLite file, so several workers or
+                         processes enforce one budget; a stand-in for a
+                         shared store such as Redis, which only needs the
+                         same ``acquire`` method
+
+Rejections are decided before the request body is read, so limited
+callers never reach password hashing or the scanner models.
+
+Clients are keyed by the socket peer address. X-Forwarded-For is only
+believed when that peer is a configured trusted proxy; otherwise any caller
+could claim a new address per request and get a fresh bucket each time.
+"""
+import ipaddress
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from starlette.datastructures import Headers
+
+DEFAULT_MAX_CLIENTS = 100_000
+SQLITE_PRUNE_EVERY = 1000  # acquires between deletions of refilled buckets
+
+
+def _gcra(tat: Optional[float], now: float, interval: float, tolerance: float) -> Tuple[float, float]:
+    """
+    One token-bucket step in GCRA form.
+
+    Returns:
+        (new arrival time, retry_after); retry_after is 0.0 when allowed and
+        the arrival time is then unchanged on rejection
+    """
+    tat = now if tat is None or tat < now else tat
+    wait = tat - tolerance - now
+    if wait > 0:
+        return tat, wait
+    return tat + interval, 0.0
+
+
+class MemoryBucketStore:
+    """Bounded in-process buckets; least recently seen clients are evicted first."""
+
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def acquire(self, key: str, interval: float, tolerance: float) -> float:
+        """Spend one token from ``key``'s bucket; returns seconds to wait (0.0 if allowed)."""
+        now = time.monotonic()
+        with self._lock:
+            tat, retry_after = _gcra(self._tats.get(key), now, interval, tolerance)
+            self._tats[key] = tat
+            self._tats.move_to_end(key)
+            if len(self._tats) > self.max_clients:
+                # The oldest entry is usually refilled already; if not, that
+                # client just gets a fresh bucket
+                self._tats.popitem(last=False)
+                self.evictions += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "clients": len(self._tats), "evictions": self.evictions}
+
+
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file shared by every process that opens it.
+
+    Each acquire is one short IMMEDIATE transaction, so concurrent workers
+    serialize on the file. Arrival times use wall-clock time so they compare
+    across processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._acquires = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str, interval: float, tolerance: float) -> float:
+        """Spend one token from ``key``'s bucket; returns seconds to wait (0.0 if allowed)."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tat, retry_after = _gcra(row[0] if row else None, now, interval, tolerance)
+            if not retry_after:
+                conn.execute(
+                    "INSERT INTO rate_buckets (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, tat)
+                )
+            self._acquires += 1
+            if self._acquires % SQLITE_PRUNE_EVERY == 0:
+                # Refilled buckets carry no state
+                conn.execute("DELETE FROM rate_buckets WHERE tat < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        clients = self._connection().execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "clients": clients}
+
+
+def create_store(spec: str = "", max_clients: int = DEFAULT_MAX_CLIENTS):
+    """
+    Build a bucket store from a setting value.
+
+    Args:
+        spec: "" or "memory" for in-process buckets, "sqlite:///path/to/file.db"
+            for buckets shared through a SQLite file
+        max_clients: Bucket limit of the in-process store
+    """
+    if not spec or spec == "memory":
+        return MemoryBucketStore(max_clients)
+    if spec.startswith("sqlite:///"):
+        return SQLiteBucketStore(spec[len("sqlite:///"):])
+    raise ValueError(f"Unsupported rate limit store '{spec}' (use 'memory' or 'sqlite:///path')")
+
+
+class RateLimiter:
+    """
+    Per-client token buckets.
+
+    Args:
+        rate_per_minute: Sustained requests per client per minute (0 disables)
+        burst: Bucket size, i.e. requests allowed back to back (defaults to
+            ``rate_per_minute``)
+        store: Bucket store (defaults to a MemoryBucketStore)
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None, store=None):
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(int(burst or rate_per_minute), 1)
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.tolerance = self.interval * (self.burst - 1)
+        self.store = store if store is not None else MemoryBucketStore()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_minute > 0
+
+    def check(self, key: str) -> float:
+        """
+        Spend one token for ``key``.
+
+        Returns:
+            0.0 if the request may proceed, otherwise seconds until it may retry
+        """
+        if not self.enabled:
+            return 0.0
+        retry_after = self.store.acquire(key, self.interval, self.tolerance)
+        with self._lock:
+            if retry_after:
+                self._rejected += 1
+            else:
+                self._allowed += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            allowed, rejected = self._allowed, self._rejected
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "burst": self.burst,
+            "allowed": allowed,
+            "rejected": rejected,
+            "store": self.store.stats(),
+        }
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def trusted_networks(spec: Union[str, Iterable[str]]) -> Tuple[Network, ...]:
+    """
+    Parse trusted proxy addresses.
+
+    Args:
+        spec: Comma-separated (or iterable of) IPs and CIDR ranges,
+            e.g. "10.0.0.0/8, 127.0.0.1"
+    """
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in spec if item.strip())
+
+
+def _is_trusted(address: str, trusted: Sequence[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def resolve_client_ip(
+    peer: Optional[str],
+    forwarded_for: Optional[str],
+    trusted_proxies: Sequence[Network] = ()
+) -> str:
+    """
+    Address of the client behind any trusted proxies.
+
+    X-Forwarded-For is only consulted when ``peer`` (the socket address) is a
+    trusted proxy. Hops are then walked from the right, skipping trusted
+    proxies; the first untrusted hop is the client. Hops left of it were
+    supplied by the client and are ignored.
+    """
+    if not peer:
+        return "unknown"
+    if not forwarded_for or not _is_trusted(peer, trusted_proxies):
+        return peer
+    for hop in reversed(forwarded_for.split(",")):
+        hop = hop.strip()
+        if hop and not _is_trusted(hop, trusted_proxies):
+            return hop
+    return peer  # Every hop is a trusted proxy
+
+
+def client_ip(scope, trusted_proxies: Sequence[Network] = ()) -> str:
+    """Client address of an ASGI request (see resolve_client_ip)."""
+    client = scope.get("client")
+    return resolve_client_ip(
+        client[0] if client else None,
+        ", ".join(Headers(scope=scope).getlist("x-forwarded-for")),
+        trusted_proxies
+    )
+
+
+STDIO_CLIENT_KEY = "stdio"
+
+
+def _context_value(ctx, attribute: str) -> Optional[str]:
+    try:
+        return getattr(ctx, attribute, None)
+    except Exception:  # fastmcp raises outside an active request
+        return None
+
+
+def mcp_client_key(ctx) -> str:
+    """
+    Bucket key of an MCP tool call.
+
+    The MCP session id, else the client id (clients rarely send one), else
+    the HTTP peer address. Only a call with none of these, i.e. over stdio
+    or a direct call, uses the shared STDIO_CLIENT_KEY bucket: a stdio
+    server process serves exactly one client, so that bucket is still per
+    client.
+    """
+    if ctx is None:
+        return STDIO_CLIENT_KEY
+    session_id = _context_value(ctx, "session_id")
+    if session_id:
+        return f"session:{session_id}"
+    client_id = _context_value(ctx, "client_id")
+    if client_id:
+        return f"client:{client_id}"
+    request_context = _context_value(ctx, "request_context")
+    request = getattr(request_context, "request", None)
+    client = getattr(request, "client", None)
+    if client is not None and getattr(client, "host", None):
+        return f"ip:{client.host}"
+    return STDIO_CLIENT_KEY
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware answering 429 (with Retry-After) once a client's bucket is empty.
+
+    Args:
+        limiter: RateLimiter to charge
+        key_func: Maps the ASGI scope to a client key (socket peer IP by
+            default; bind ``trusted_proxies`` into client_ip when behind a proxy)
+        paths: Only requests under these path prefixes are limited (all when None)
+        exempt_paths: Path prefixes never limited (health checks, docs)
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter,
+        key_func: Callable[[dict], str] = client_ip,
+        paths: Optional[Iterable[str]] = None,
+        exempt_paths: Iterable[str] = ()
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.key_func = key_func
+        self.paths = tuple(paths) if paths is not None else None
+        self.exempt_paths = tuple(exempt_paths)
+
+    def _limited(self, path: str) -> bool:
+        if self.exempt_paths and path.startswith(self.exempt_paths):
+            return False
+        return self.paths is None or path.startswith(self.paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.limiter.enabled
+            or scope["method"] == "OPTIONS"  # CORS preflight
+            or not self._limited(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.limiter.check(self.key_func(scope))
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        body = b'{"detail":"Rate limit exceeded"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(int(retry_after) + 1).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,242 @@
+"""
+Time-Bucketed Traffic and Latency Rollups
+
+Aggregates security events into fixed-width buckets: event counts by action
+and a latency histogram per pipeline layer. The same stream is rolled up at
+several resolutions (per minute, per hour) with independent retention, so a
+chart over the last hour reads minute buckets while a chart over the last
+month reads hourly ones. Query cost is proportional to the number of
+buckets in the range, never to the number of events.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.sketch import LogHistogram
+
+# (bucket width in seconds, number of buckets retained)
+DEFAULT_RESOLUTIONS: Tuple[Tuple[int, int], ...] = (
+    (60, 24 * 60),     # 1-minute buckets for 24 hours
+    (3600, 30 * 24),   # 1-hour buckets for 30 days
+)
+
+ROLLUP_FILE_VERSION = 1
+
+
+class Bucket:
+    """Aggregates for one time slot."""
+
+    __slots__ = ("start", "actions", "latency")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.actions: Dict[str, int] = {}
+        self.latency: Dict[str, LogHistogram] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.actions.values())
+
+    def merge(self, other: "Bucket") -> None:
+        for action, n in other.actions.items():
+            self.actions[action] = self.actions.get(action, 0) + n
+        for layer, hist in other.latency.items():
+            self.latency.setdefault(layer, LogHistogram()).merge(hist)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start,
+            "actions": self.actions,
+            "latency": {layer: h.to_dict() for layer, h in self.latency.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Bucket":
+        bucket = cls(data["start"])
+        bucket.actions = dict(data.get("actions", {}))
+        bucket.latency = {
+            layer: LogHistogram.from_dict(h) for layer, h in data.get("latency", {}).items()
+        }
+        return bucket
+
+
+class RollupLevel:
+    """Buckets of a single width with bounded retention."""
+
+    def __init__(self, width: int, retention: int):
+        self.width = width
+        self.retention = retention
+        self.buckets: Dict[int, Bucket] = {}
+        self._newest = 0
+
+    def bucket_for(self, ts_seconds: int) -> Optional[Bucket]:
+        start = ts_seconds - (ts_seconds % self.width)
+        if start <= self._newest - self.retention * self.width:
+            return None  # Older than retention
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            bucket = self.buckets[start] = Bucket(start)
+            if start > self._newest:
+                self._newest = start
+                self._evict()
+        return bucket
+
+    def _evict(self) -> None:
+        if len(self.buckets) <= self.retention:
+            return
+        cutoff = self._newest - self.retention * self.width
+        for start in [s for s in self.buckets if s <= cutoff]:
+            del self.buckets[start]
+
+    def covers(self, seconds: int) -> bool:
+        return seconds <= self.retention * self.width
+
+
+class RollupEngine:
+    """
+    Incrementally maintained multi-resolution rollups.
+
+    Thread-safe. ``last_id`` records the newest event folded in so the engine
+    can be persisted and resumed from the event store without double counting.
+    """
+
+    def __init__(self, resolutions: Tuple[Tuple[int, int], ...] = DEFAULT_RESOLUTIONS):
+        self.resolutions = resolutions
+        self.levels = [RollupLevel(width, retention) for width, retention in resolutions]
+        self.last_id = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """
+        Fold a stored event into every resolution.
+
+        Expects the event store format: ``id``, ``timestamp`` (epoch ms),
+        ``action`` and an optional ``latency_ms`` mapping of layer -> ms.
+        """
+        event_id = event.get("id", 0)
+        if event_id and event_id <= self.last_id:
+            return  # Already counted (e.g. replay after a restart)
+
+        ts_seconds = int(event["timestamp"]) // 1000
+        action = event.get("action", "UNKNOWN")
+        latency = event.get("latency_ms") or {}
+
+        with self._lock:
+            for level in self.levels:
+                bucket = level.bucket_for(ts_seconds)
+                if bucket is None:
+                    continue
+                bucket.actions[action] = bucket.actions.get(action, 0) + 1
+                for layer, ms in latency.items():
+                    bucket.latency.setdefault(layer, LogHistogram()).add(float(ms))
+            self.last_id = max(self.last_id, event_id)
+            self._dirty = True
+
+    def _level_for(self, range_seconds: int, step_seconds: int) -> RollupLevel:
+        """Coarsest level that still resolves ``step_seconds`` and covers the range."""
+        candidates = [
+            level for level in self.levels
+            if level.width <= step_seconds and step_seconds % level.width == 0
+            and level.covers(range_seconds)
+        ]
+        if candidates:
+            return max(candidates, key=lambda level: level.width)
+        # Fall back to the level with the longest retention
+        return max(self.levels, key=lambda level: level.width * level.retention)
+
+    def series(
+        self,
+        range_seconds: int,
+        step_seconds: int,
+        now: Optional[float] = None,
+    ) -> List[Bucket]:
+        """
+        Aggregate the last ``range_seconds`` into consecutive ``step_seconds`` slots.
+
+        Returns:
+            One merged Bucket per slot, oldest first (empty slots included)
+        """
+        now_s = int(now if now is not None else time.time())
+        step_seconds = max(step_seconds, self.levels[0].width)
+        end = now_s - (now_s % step_seconds) + step_seconds
+        start = end - ((range_seconds + step_seconds - 1) // step_seconds) * step_seconds
+
+        slots = [Bucket(s) for s in range(start, end, step_seconds)]
+        with self._lock:
+            level = self._level_for(range_seconds, step_seconds)
+            for bucket_start, bucket in level.buckets.items():
+                if start <= bucket_start < end:
+                    slots[(bucket_start - start) // step_seconds].merge(bucket)
+        return slots
+
+    def window(self, seconds: int, now: Optional[float] = None) -> Bucket:
+        """Single merged bucket covering the last ``seconds``."""
+        slots = self.series(seconds, self.levels[0].width, now)
+        total = Bucket(slots[0].start if slots else 0)
+        for slot in slots:
+            total.merge(slot)
+        return total
+
+    def reset(self) -> None:
+        """Clear all buckets; ``last_id`` is kept since event ids are never reused."""
+        with self._lock:
+            self.levels = [RollupLevel(width, retention) for width, retention in self.resolutions]
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Atomically persist the rollups (no-op when nothing changed)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": ROLLUP_FILE_VERSION,
+                "last_id": self.last_id,
+                "levels": [
+                    {
+                        "width": level.width,
+                        "retention": level.retention,
+                        "buckets": [b.to_dict() for b in level.buckets.values()],
+                    }
+                    for level in self.levels
+                ],
+            }
+            self._dirty = False
+
+        path = Path(path)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path,
+             resolutions: Tuple[Tuple[int, int], ...] = DEFAULT_RESOLUTIONS) -> "RollupEngine":
+        """Load persisted rollups, or return an empty engine if none/incompatible."""
+        engine = cls(resolutions)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return engine
+        if data.get("version") != ROLLUP_FILE_VERSION:
+            return engine
+
+        saved = {(lvl["width"], lvl["retention"]): lvl for lvl in data.get("levels", [])}
+        if set(saved) != set(resolutions):
+            return engine  # Resolution config changed; rebuild from the store
+
+        for level in engine.levels:
+            for raw in saved[(level.width, level.retention)]["buckets"]:
+                bucket = Bucket.from_dict(raw)
+                level.buckets[bucket.start] = bucket
+                level._newest = max(level._newest, bucket.start)
+        engine.last_id = data.get("last_id", 0)
+        return engine
@@ -0,0 +1,140 @@
+"""
+Log-Bucketed Latency Histogram
+
+A mergeable streaming quantile sketch in the spirit of HDR histograms /
+DDSketch. Values are mapped to logarithmically spaced buckets so every
+quantile is reported within a fixed relative error, recording is O(1) and
+memory depends only on the dynamic range of the data, not on the number of
+samples.
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01  # 1% relative error on reported quantiles
+MIN_TRACKED_VALUE = 1e-3  # Values below this (ms) collapse into the zero bucket
+
+
+class LogHistogram:
+    """
+    Mergeable log-bucketed histogram.
+
+    Tracks exact count, sum, min and max alongside the buckets so means are
+    exact and only quantiles are approximated.
+    """
+
+    __slots__ = ("relative_accuracy", "_gamma_log", "buckets", "zero_count",
+                 "count", "sum", "min", "max")
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            relative_accuracy: Maximum relative error of reported quantiles
+        """
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._gamma_log = math.log(gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._gamma_log)
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket (in relative terms) keeps the error symmetric
+        return 2 * math.exp(key * self._gamma_log) / (1 + math.exp(self._gamma_log))
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Record ``count`` occurrences of ``value``."""
+        if value < MIN_TRACKED_VALUE:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        """Fold ``other`` into this histogram (both must share the same accuracy)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge histograms with different relative accuracy")
+        # Snapshot the items: ``other`` may still be recording on another thread
+        for key, n in list(other.buckets.items()):
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LogHistogram"],
+               relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> "LogHistogram":
+        """Return a new histogram combining ``histograms``."""
+        result = cls(relative_accuracy)
+        for h in histograms:
+            result.merge(h)
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate the ``q`` quantile (0.0-1.0).
+
+        Returns:
+            Value in the same unit as recorded (0.0 if empty)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def count_above(self, threshold: float) -> int:
+        """Approximate number of recorded values strictly greater than ``threshold``."""
+        if threshold < MIN_TRACKED_VALUE:
+            return self.count - self.zero_count
+        limit = self._key(threshold)
+        return sum(n for key, n in self.buckets.items() if key > limit)
+
+    def to_dict(self) -> Dict:
+        """Compact JSON-serializable form."""
+        return {
+            "a": self.relative_accuracy,
+            "b": {str(k): v for k, v in self.buckets.items()},
+            "z": self.zero_count,
+            "n": self.count,
+            "s": self.sum,
+            "lo": self.min if self.count else None,
+            "hi": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LogHistogram":
+        h = cls(data.get("a", DEFAULT_RELATIVE_ACCURACY))
+        h.buckets = {int(k): v for k, v in data.get("b", {}).items()}
+        h.zero_count = data.get("z", 0)
+        h.count = data.get("n", 0)
+        h.sum = data.get("s", 0.0)
+        lo: Optional[float] = data.get("lo")
+        hi: Optional[float] = data.get("hi")
+        h.min = lo if lo is not None else math.inf
+        h.max = hi if hi is not None else -math.inf
+        return h
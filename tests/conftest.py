@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# The repository is not an installed package; make src/ importable, plus the
+# auth backend, which is its own application rooted at dashboard/backend
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "dashboard" / "backend"))
+
+# Backend settings for tests. Never point them at a configured database:
+# the revocation tests drop and recreate revoked_tokens
+os.environ["DEBUG"] = "true"
+os.environ["DATABASE_URL"] = "sqlite:///" + str(Path(tempfile.mkdtemp()) / "backend-test.db")
+os.environ["ASYNC_DATABASE_URL"] = ""
+
+# Manual end-to-end check that loads the scanner models, not a pytest module
+collect_ignore = ["verify_defense.py"]
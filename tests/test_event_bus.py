@@ -0,0 +1,62 @@
+import threading
+
+from src.utils.event_bus import EventBus, EventStoreSink, Sink
+from src.utils.event_store import EventStore
+
+
+class ListSink(Sink):
+    name = "list"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.events = []
+
+    def write(self, events):
+        self.events.extend(events)
+
+
+def test_sinks_receive_ids_assigned_by_the_source(tmp_path):
+    sink = ListSink(flush_interval=0.01)
+    bus = EventBus(source=EventStoreSink(EventStore(tmp_path), flush_interval=0.01), sinks=[sink])
+    for _ in range(3):
+        bus.publish({"action": "ALLOWED"})
+    assert bus.flush()
+    bus.close()
+    assert [e["id"] for e in sink.events] == [1, 2, 3]
+
+
+def test_stats_are_exact_under_concurrent_publishers():
+    sink = ListSink(queue_size=100_000, flush_interval=0.01)
+    bus = EventBus(sinks=[sink])
+    threads = [
+        threading.Thread(target=lambda: [bus.publish({"action": "ALLOWED"}) for _ in range(2000)])
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert bus.flush()
+    stats = bus.stats()["list"]
+    bus.close()
+    assert stats["queued"] == stats["written"] == len(sink.events) == 16_000
+    assert stats["dropped"] == 0
+
+
+def test_full_queue_drops_and_counts():
+    release = threading.Event()
+
+    class BlockedSink(ListSink):
+        def write(self, events):
+            release.wait()
+            super().write(events)
+
+    sink = BlockedSink(queue_size=2, batch_size=1, flush_interval=0.01)
+    bus = EventBus(sinks=[sink])
+    accepted = [bus.publish({"n": i}) for i in range(10)]
+    release.set()
+    assert bus.flush()
+    stats = bus.stats()["list"]
+    bus.close()
+    assert accepted.count(False) == stats["dropped"] > 0
+    assert stats["written"] == accepted.count(True)
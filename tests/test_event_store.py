@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from src.utils.event_store import EventStore, TailCursor
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EventStore(tmp_path / "events")
+
+
+def append(store, count, action="ALLOWED"):
+    now = int(time.time() * 1000)
+    return store.append_many([{"action": action, "timestamp": now}] * count)
+
+
+def test_tail_returns_only_new_events(store):
+    append(store, 5)
+    events, cursor = store.tail()
+    assert [e["id"] for e in events] == [1, 2, 3, 4, 5]
+
+    append(store, 2)
+    events, cursor = store.tail(cursor)
+    assert [e["id"] for e in events] == [6, 7]
+    assert store.tail(cursor)[0] == []
+
+
+def test_tail_resumes_after_reset(store):
+    append(store, 20)
+    _, cursor = store.tail()
+
+    store.reset()
+    append(store, 3)
+    events, new_cursor = store.tail(cursor)
+    assert [e["id"] for e in events] == [21, 22, 23]
+    assert new_cursor.resets == cursor.resets + 1
+
+    append(store, 60)
+    events, _ = store.tail(new_cursor)
+    assert [e["id"] for e in events] == list(range(24, 84))
+
+
+def test_tail_restarts_a_segment_shorter_than_the_cursor(store):
+    append(store, 3)
+    _, cursor = store.tail()
+    stale = TailCursor(last_id=cursor.last_id, segment=cursor.segment, offset=cursor.offset * 10,
+                       resets=cursor.resets)
+    append(store, 1)
+    assert [e["id"] for e in store.tail(stale)[0]] == [4]
+
+
+def test_tail_reads_segments_sealed_since_the_last_poll(store):
+    hour_ms = 3600 * 1000
+    start = (int(time.time() * 1000) // hour_ms - 2) * hour_ms
+    store.append_many([{"action": "ALLOWED", "timestamp": start}] * 3)
+    _, cursor = store.tail()
+
+    store.append_many([{"action": "BLOCKED", "timestamp": start + 1}] * 2)
+    store.append_many([{"action": "ALLOWED", "timestamp": start + hour_ms}])  # Seals the first hour
+    assert len(store.index()["segments"]) == 1
+
+    events, _ = store.tail(cursor)
+    assert [(e["id"], e["action"]) for e in events] == [(4, "BLOCKED"), (5, "BLOCKED"), (6, "ALLOWED")]
+
+
+def test_ids_keep_increasing_after_reset(store):
+    append(store, 4)
+    store.reset()
+    assert list(store.iter_events()) == []
+    assert append(store, 1)[0]["id"] == 5
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.utils.hashing_pool import HashingPool, HashingPoolFull
+
+
+def test_rejects_beyond_workers_plus_waiting():
+    pool = HashingPool(workers=1, max_waiting=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run("verify", release.wait))
+        second = asyncio.ensure_future(pool.run("verify", release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingPoolFull):
+            await pool.run("verify", release.wait)
+        assert pool.stats()["waiting"] == 1
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == [True, True]
+    stats = pool.stats()
+    pool.shutdown()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["latency"]["verify"]["count"] == 2
+
+
+def test_latency_is_tracked_per_operation_and_reset():
+    pool = HashingPool(workers=2, max_waiting=0)
+
+    async def scenario():
+        await pool.run("verify", lambda: None)
+        await pool.run("hash", lambda: None)
+
+    asyncio.run(scenario())
+    assert set(pool.stats()["latency"]) == {"verify", "hash"}
+    pool.reset_metrics()
+    assert pool.stats()["latency"] == {}
+    pool.shutdown()
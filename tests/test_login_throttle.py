@@ -0,0 +1,68 @@
+import pytest
+
+from app import login_throttle
+from app.login_throttle import LoginThrottle, SlidingWindowCounter
+
+
+def test_counts_are_exact_for_few_keys():
+    counter = SlidingWindowCounter(window_seconds=60)
+    for _ in range(3):
+        counter.add("alice", now=0)
+    counter.add("bob", now=0)
+    assert counter.estimate("alice", now=1) == 3
+    assert counter.estimate("bob", now=1) == 1
+    assert counter.estimate("carol", now=1) == 0
+
+
+def test_estimates_never_undercount_under_collisions():
+    counter = SlidingWindowCounter(window_seconds=60, width=64, depth=2)
+    truth = {}
+    for i in range(2000):
+        key = f"user-{i % 500}"
+        truth[key] = truth.get(key, 0) + 1
+        counter.add(key, now=0)
+    assert all(counter.estimate(key, now=0) >= n for key, n in truth.items())
+
+
+def test_failures_slide_out_of_the_window():
+    counter = SlidingWindowCounter(window_seconds=60, slots=5)  # 12 s slots
+    counter.add("alice", now=0)
+    counter.add("alice", now=30)
+    assert counter.estimate("alice", now=59) == 2
+    assert counter.estimate("alice", now=60) == 1  # First slot expired
+    assert counter.estimate("alice", now=90) == 0
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(login_throttle.time, "monotonic", clock)
+    return clock
+
+
+def test_username_locked_out_at_limit_until_lockout_ends(clock):
+    throttle = LoginThrottle(window_seconds=900, max_user_failures=3, max_ip_failures=100, lockout_seconds=60)
+    results = [throttle.record_failure("alice", f"10.0.0.{i}") for i in range(3)]
+    assert [r["locked_out"] for r in results] == [False, False, True]
+    assert throttle.locked_for("alice", "192.0.2.1") == pytest.approx(60)
+    assert throttle.locked_for("bob", "192.0.2.1") == 0.0
+
+    clock.now += 60
+    assert throttle.locked_for("alice", "192.0.2.1") == 0.0
+    assert throttle.stats()["active_lockouts"] == 0
+
+
+def test_ip_locked_out_across_usernames(clock):
+    throttle = LoginThrottle(window_seconds=900, max_user_failures=100, max_ip_failures=5, lockout_seconds=60)
+    for i in range(5):
+        throttle.record_failure(f"user-{i}", "203.0.113.9")
+    assert throttle.locked_for("someone-else", "203.0.113.9") > 0
+    assert throttle.stats()["rejected"] == 1
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import rate_limit
+from src.utils.rate_limit import (
+    MemoryBucketStore,
+    STDIO_CLIENT_KEY,
+    RateLimiter,
+    SQLiteBucketStore,
+    client_ip,
+    mcp_client_key,
+    resolve_client_ip,
+    trusted_networks,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    monkeypatch.setattr(rate_limit.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBucketStore()
+    return SQLiteBucketStore(str(tmp_path / "buckets.db"))
+
+
+def test_burst_then_sustained_rate(clock, store):
+    limiter = RateLimiter(60, burst=3, store=store)  # One token per second
+    assert [limiter.check("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.check("a") == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert limiter.check("a") == 0.0
+    assert limiter.check("a") == pytest.approx(1.0)
+
+
+def test_rejections_do_not_drain_the_bucket(clock, store):
+    limiter = RateLimiter(60, burst=1, store=store)
+    assert limiter.check("a") == 0.0
+    for _ in range(5):
+        assert limiter.check("a") > 0
+    clock.now += 1.0
+    assert limiter.check("a") == 0.0
+
+
+def test_bucket_refills_to_burst_only(clock, store):
+    limiter = RateLimiter(60, burst=2, store=store)
+    clock.now += 3600
+    assert [limiter.check("a") > 0 for _ in range(3)] == [False, False, True]
+
+
+def test_clients_have_separate_buckets(clock, store):
+    limiter = RateLimiter(60, burst=1, store=store)
+    assert limiter.check("a") == 0.0
+    assert limiter.check("a") > 0
+    assert limiter.check("b") == 0.0
+    assert limiter.stats()["allowed"] == 2
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_disabled_limiter_allows_everything(store):
+    limiter = RateLimiter(0, store=store)
+    assert not limiter.enabled
+    assert all(limiter.check("a") == 0.0 for _ in range(100))
+
+
+def test_memory_store_evicts_least_recent_client(clock):
+    store = MemoryBucketStore(max_clients=2)
+    limiter = RateLimiter(60, burst=1, store=store)
+    for key in ("a", "b", "c"):
+        limiter.check(key)
+    assert store.stats() == {"backend": "memory", "clients": 2, "evictions": 1}
+    assert limiter.check("a") == 0.0  # Evicted, so a fresh bucket
+
+
+PROXIES = trusted_networks("10.0.0.0/8, 127.0.0.1")
+
+
+def scope(peer, *forwarded_for):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return {"type": "http", "client": (peer, 50000), "headers": headers}
+
+
+def test_forwarded_for_ignored_without_trusted_proxies():
+    assert client_ip(scope("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_forwarded_for_ignored_from_untrusted_peer():
+    assert client_ip(scope("203.0.113.7", "198.51.100.1"), PROXIES) == "203.0.113.7"
+
+
+def test_rightmost_untrusted_hop_is_the_client():
+    # The client prepended a spoofed hop; the proxies appended the real one
+    request = scope("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.1")
+    assert client_ip(request, PROXIES) == "198.51.100.1"
+
+
+def test_repeated_forwarded_for_headers_are_joined():
+    request = scope("127.0.0.1", "1.2.3.4", "198.51.100.1")
+    assert client_ip(request, PROXIES) == "198.51.100.1"
+
+
+def test_all_hops_trusted_falls_back_to_peer():
+    assert resolve_client_ip("10.0.0.2", "10.0.0.1", PROXIES) == "10.0.0.2"
+    assert resolve_client_ip(None, "198.51.100.1", PROXIES) == "unknown"
+
+
+def mcp_context(session_id=None, client_id=None, host=None):
+    request = SimpleNamespace(client=SimpleNamespace(host=host)) if host else None
+    return SimpleNamespace(
+        session_id=session_id,
+        client_id=client_id,
+        request_context=SimpleNamespace(request=request),
+    )
+
+
+def test_sessions_without_client_id_have_separate_buckets(clock):
+    limiter = RateLimiter(60, burst=1)
+    first, second = mcp_context(session_id="s1"), mcp_context(session_id="s2")
+    assert limiter.check(mcp_client_key(first)) == 0.0
+    assert limiter.check(mcp_client_key(first)) > 0
+    assert limiter.check(mcp_client_key(second)) == 0.0
+
+
+def test_session_id_takes_precedence_over_client_id():
+    assert mcp_client_key(mcp_context("s1", "claude")) == "session:s1"
+    assert mcp_client_key(mcp_context(client_id="claude")) == "client:claude"
+    assert mcp_client_key(mcp_context(host="198.51.100.1")) == "ip:198.51.100.1"
+
+
+def test_only_stdio_shares_a_bucket():
+    class OutsideRequest:
+        @property
+        def session_id(self):
+            raise RuntimeError("no active request")
+
+    assert mcp_client_key(mcp_context()) == STDIO_CLIENT_KEY
+    assert mcp_client_key(OutsideRequest()) == STDIO_CLIENT_KEY
+    assert mcp_client_key(None) == STDIO_CLIENT_KEY
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from src.utils.sketch import LogHistogram
+
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99, 0.999])
+def test_quantiles_within_relative_accuracy(q):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1.2) for _ in range(20_000)]
+    hist = LogHistogram(relative_accuracy=0.01)
+    for v in values:
+        hist.add(v)
+    assert hist.quantile(q) == pytest.approx(exact_quantile(values, q), rel=0.01)
+
+
+def test_count_sum_min_max_are_exact():
+    hist = LogHistogram()
+    for v in (0.0, 2.5, 10.0, 40.0):
+        hist.add(v)
+    assert (hist.count, hist.sum, hist.min, hist.max) == (4, 52.5, 0.0, 40.0)
+    assert hist.mean == 13.125
+    assert hist.quantile(0.0) == 0.0  # Below MIN_TRACKED_VALUE: zero bucket
+    assert hist.quantile(1.0) == pytest.approx(40.0, rel=0.01)
+
+
+def test_merge_equals_recording_everything_in_one():
+    rng = random.Random(11)
+    values = [rng.uniform(0.5, 500) for _ in range(5000)]
+    whole = LogHistogram()
+    parts = [LogHistogram() for _ in range(4)]
+    for i, v in enumerate(values):
+        whole.add(v)
+        parts[i % 4].add(v)
+    merged = LogHistogram.merged(parts)
+    assert merged.count == whole.count
+    assert merged.buckets == whole.buckets
+    assert merged.quantile(0.95) == whole.quantile(0.95)
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        LogHistogram(0.01).merge(LogHistogram(0.02))
+
+
+def test_round_trips_through_dict():
+    hist = LogHistogram()
+    for v in (1.0, 3.0, 9.0, 0.0001):
+        hist.add(v)
+    restored = LogHistogram.from_dict(hist.to_dict())
+    assert restored.to_dict() == hist.to_dict()
+    assert LogHistogram.from_dict(LogHistogram().to_dict()).quantile(0.5) == 0.0
+
+
+def test_count_above_threshold():
+    hist = LogHistogram()
+    for v in range(1, 101):
+        hist.add(float(v))
+    assert 48 <= hist.count_above(50.0) <= 52
+    assert hist.count_above(0.0) == 100
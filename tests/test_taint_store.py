@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# taint_store.py belongs to the demo MCP server in dashboard/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard"))
+
+import taint_store
+from taint_store import MemoryTaintStore, SQLiteTaintStore, create_taint_store
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(taint_store.time, "monotonic", clock)
+    monkeypatch.setattr(taint_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemoryTaintStore(**kwargs)
+        return SQLiteTaintStore(str(tmp_path / "taint.db"), **kwargs)
+    return make
+
+
+def test_taint_is_per_session(clock, make_store):
+    store = make_store(ttl_seconds=60)
+    store.taint("session:a")
+    assert store.is_tainted("session:a")
+    assert not store.is_tainted("session:b")
+
+
+def test_taint_decays_after_ttl(clock, make_store):
+    store = make_store(ttl_seconds=60)
+    store.taint("session:a")
+    clock.now += 59
+    assert store.is_tainted("session:a")
+    clock.now += 1
+    assert not store.is_tainted("session:a")
+    assert store.stats()["tainted_sessions"] == 0
+
+
+def test_new_detection_extends_the_taint(clock, make_store):
+    store = make_store(ttl_seconds=60)
+    store.taint("session:a")
+    clock.now += 50
+    store.taint("session:a")
+    clock.now += 50
+    assert store.is_tainted("session:a")
+
+
+def test_memory_store_is_bounded(clock):
+    store = MemoryTaintStore(ttl_seconds=60, max_sessions=2)
+    for session in ("a", "b", "c"):
+        store.taint(session)
+    assert not store.is_tainted("a")
+    assert store.is_tainted("b") and store.is_tainted("c")
+    assert store.stats() == {"backend": "memory", "tainted_sessions": 2, "evictions": 1}
+
+
+def test_create_taint_store_rejects_unknown_specs():
+    assert isinstance(create_taint_store(""), MemoryTaintStore)
+    with pytest.raises(ValueError):
+        create_taint_store("redis://localhost")
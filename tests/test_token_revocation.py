@@ -0,0 +1,90 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import token_revocation
+from app.database import Base, async_engine
+from app.models import RevokedToken
+from app.token_revocation import BloomFilter, TokenRevocationList, sync_revocations
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300  # ~1% expected at capacity
+
+
+def test_revoked_until_expiry():
+    revocations = TokenRevocationList()
+    now = time.time()
+    revocations.revoke("a", now + 60)
+    revocations.revoke("expired", now - 1)
+    assert revocations.is_revoked("a")
+    assert not revocations.is_revoked("b")
+    assert not revocations.is_revoked(None)
+    assert not revocations.is_revoked("expired")
+
+
+def test_prune_drops_expired_entries_and_rebuilds(monkeypatch):
+    revocations = TokenRevocationList(min_capacity=4)
+    now = time.time()
+    for i in range(10):  # Past capacity: the filter is rebuilt larger
+        revocations.revoke(f"jti-{i}", now + 10)
+    assert all(revocations.is_revoked(f"jti-{i}") for i in range(10))
+    assert revocations.stats()["bloom_capacity"] >= 10
+
+    monkeypatch.setattr(token_revocation.time, "time", lambda: now + 11)
+    assert revocations.prune() == 10
+    assert revocations.stats()["revoked"] == 0
+    assert not revocations.is_revoked("jti-0")
+
+
+@pytest.fixture
+def database(monkeypatch):
+    async def create():
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=[RevokedToken.__table__])
+            await conn.run_sync(Base.metadata.create_all, tables=[RevokedToken.__table__])
+    asyncio.run(create())
+    monkeypatch.setattr(token_revocation, "token_revocations", TokenRevocationList())
+    yield
+    asyncio.run(async_engine.dispose())
+
+
+async def insert(row_id, jti, revoked_at):
+    async with token_revocation.AsyncSessionLocal() as db:
+        db.add(RevokedToken(
+            id=row_id,
+            jti=jti,
+            token_type="access",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            revoked_at=revoked_at
+        ))
+        await db.commit()
+
+
+def test_sync_picks_up_rows_that_commit_out_of_order(database):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    async def scenario():
+        await insert(10, "newer", now)
+        await sync_revocations()
+        # Ids and revoked_at handed out before "newer", committed after it
+        await insert(5, "late", now - timedelta(seconds=5))
+        await insert(4, "very-late", now - timedelta(hours=1))
+        await sync_revocations()
+        late_seen = token_revocation.token_revocations.is_revoked("late")
+        very_late_seen = token_revocation.token_revocations.is_revoked("very-late")
+        await sync_revocations(full=True)
+        return late_seen, very_late_seen
+
+    late_seen, very_late_seen = asyncio.run(scenario())
+    assert late_seen
+    assert not very_late_seen  # Beyond the overlap window: left to the full sync
+    assert token_revocation.token_revocations.is_revoked("very-late")
+    assert token_revocation.token_revocations.is_revoked("newer")
@@ -1,7 +1,12 @@
 
 import requests
 import json
+import sys
 import time
+from pathlib import Path
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Create tests directory if it doesn't exist (handled by tool usually, but ensures parent existence)
 # We assume the user runs this.
@@ -19,10 +24,11 @@ def test_prompt(name, prompt, expected_status, expected_risk_threshold=None):
     # Since we have the code, we can also unit test it by importing the function.
     # PRO TIP: importing the function is easier for "Verification" than mocking a client.
     
-    from src.server import process_secure_prompt
+    # The body of the secure_prompt_gateway tool (the tool object itself is not callable)
+    from src.server import _execute_security_pipeline
     
     try:
-        result = process_secure_prompt(prompt)
+        result = _execute_security_pipeline(prompt)
         print(f"Result: {json.dumps(result, indent=2)}")
         
         status = result["status"]